@@ -1,8 +1,13 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from src.config.settings import settings
+from src.utils.pagination import NEXT_CURSOR_HEADER
+from src.utils.serialization import JSONResponse
+from src.utils.storage_factory import close_storages
 from src.routes.cms_routes import router as cms_router
 from src.routes.driver_routes import router as driver_router
 from src.routes.client_routes import router as client_router
@@ -10,13 +15,24 @@ from src.routes.admin_routes import router as admin_router
 from src.routes.order_routes import router as order_router
 from src.routes.contract_routes import router as contract_router
 from src.routes.billing_routes import router as billing_router
+from src.dependencies import registry
+from src.services.admin_service import AdminService
+from src.services.billing_service import BillingService
+from src.services.client_service import ClientService
 from src.services.cms_service import CMSService
+from src.services.contract_service import ContractService
 from src.services.driver_service import DriverService
-from src.services.client_service import ClientService
-from src.services.admin_service import AdminService
 from src.services.order_service import OrderService
-from src.services.contract_service import ContractService
-from src.services.billing_service import BillingService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build and warm every service before serving, release them on shutdown"""
+    registry.start()
+    yield
+    registry.close()
+    close_storages()
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -24,6 +40,8 @@ app = FastAPI(
     description="Client Management System Mock Service for Swift Logistics - Legacy SOAP-based system (REST simulation)",
     version="2.0.0",
     redoc_url=None,  # Disable ReDoc, use Swagger UI only
+    lifespan=lifespan,
+    default_response_class=JSONResponse,
 )
 
 # Configure CORS
@@ -33,6 +51,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -65,32 +84,35 @@ async def root():
 
 @app.get("/health")
 async def health():
-    """Health check endpoint with entity counts"""
-    customer_service = CMSService()
-    driver_service = DriverService()
-    client_service = ClientService()
-    admin_service = AdminService()
-    order_service = OrderService()
-    contract_service = ContractService()
-    billing_service = BillingService()
+    """Health check endpoint with entity counts
 
+    Uses the services the routers share; counts come from the storage
+    layer without reading the datasets.
+    """
+    services = {
+        "customers": registry.get(CMSService),
+        "drivers": registry.get(DriverService),
+        "clients": registry.get(ClientService),
+        "admins": registry.get(AdminService),
+        "orders": registry.get(OrderService),
+        "contracts": registry.get(ContractService),
+        "invoices": registry.get(BillingService),
+    }
     return {
         "status": "healthy",
         "service": settings.app_name,
         "version": "2.0.0",
         "entity_counts": {
-            "customers": len(customer_service.storage.get_all()),
-            "drivers": len(driver_service.storage.get_all()),
-            "clients": len(client_service.storage.get_all()),
-            "admins": len(admin_service.storage.get_all()),
-            "orders": len(order_service.storage.get_all()),
-            "contracts": len(contract_service.storage.get_all()),
-            "invoices": len(billing_service.storage.get_all()),
+            name: await service.storage.acount() for name, service in services.items()
         }
     }
 
 
 if __name__ == "__main__":
     uvicorn.run(
-        "app:app", host=settings.host, port=settings.port, reload=settings.debug
+        "app:app",
+        host=settings.host,
+        port=settings.port,
+        reload=settings.debug and settings.workers == 1,
+        workers=settings.workers,
     )
@@ -0,0 +1,95 @@
+"""Measure read latency while orders are being written
+
+Usage:
+    python benchmark_latency.py [--records 20000] [--readers 16] [--seconds 8]
+
+Seeds a throwaway data directory through POST /api/orders/bulk, then runs
+one client creating orders back to back next to concurrent clients reading
+single orders, and prints the read latency percentiles. Client and app
+share one event loop, so a write that holds up the loop shows up directly
+in the read latencies.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(latencies: List[float], fraction: float) -> float:
+    """Return a percentile of sorted latencies, in milliseconds"""
+    return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000
+
+
+async def run(args: argparse.Namespace) -> None:
+    import httpx
+
+    from app import app
+    from src.config.settings import settings
+
+    order = {
+        "client_id": "client-001",
+        "delivery_address": {"street": "45 Galle Road", "city": "Colombo"},
+        "items": [{"sku": "PROD-001", "name": "Laptop Computer", "quantity": 1}],
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark"
+    ) as client:
+        remaining = args.records
+        while remaining > 0:
+            batch = min(remaining, settings.bulk_max_items)
+            await client.post("/api/orders/bulk", json=[order] * batch)
+            remaining -= batch
+        page = await client.get("/api/orders/", params={"limit": 100})
+        order_ids = [o["id"] for o in page.json()]
+
+        deadline = time.perf_counter() + args.seconds
+        latencies: List[float] = []
+
+        async def write() -> int:
+            writes = 0
+            while time.perf_counter() < deadline:
+                await client.post("/api/orders/", json=order)
+                writes += 1
+            return writes
+
+        async def read(reader: int) -> None:
+            while time.perf_counter() < deadline:
+                order_id = order_ids[(reader + len(latencies)) % len(order_ids)]
+                started = time.perf_counter()
+                await client.get(f"/api/orders/{order_id}")
+                latencies.append(time.perf_counter() - started)
+
+        writes, *_ = await asyncio.gather(
+            write(), *(read(reader) for reader in range(args.readers))
+        )
+
+    latencies.sort()
+    print(f"writes: {writes:8d}")
+    print(f"reads:  {len(latencies):8d}")
+    print(f"p50:    {percentile(latencies, 0.50):8.1f} ms")
+    print(f"p99:    {percentile(latencies, 0.99):8.1f} ms")
+    print(f"max:    {latencies[-1] * 1000:8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000, help="Orders to seed")
+    parser.add_argument("--readers", type=int, default=16, help="Concurrent readers")
+    parser.add_argument("--seconds", type=float, default=8, help="Test duration")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Services keep their data in ./data
+        os.chdir(tmp)
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Measure the per-record cost of large order list responses
+
+Usage:
+    python benchmark_reads.py [--records 5000] [--page-size 1000] [--rounds 20]
+
+Seeds a throwaway data directory through POST /api/orders/bulk, then times
+GET /api/orders/ pages with FAST_READS off (a validated model per record,
+checked again against the response model) and on (stored records
+serialized directly).
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_pages(client, page_size: int, rounds: int) -> float:
+    """Return the mean cost per record of fetching one page, in seconds"""
+    records = len(client.get("/api/orders/", params={"limit": page_size}).json())
+    started = time.perf_counter()
+    for _ in range(rounds):
+        client.get("/api/orders/", params={"limit": page_size})
+    return (time.perf_counter() - started) / (rounds * records)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=5000, help="Orders to seed")
+    parser.add_argument("--page-size", type=int, default=1000, help="Orders per page")
+    parser.add_argument("--rounds", type=int, default=20, help="Pages per mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Services keep their data in ./data
+        os.chdir(tmp)
+        from fastapi.testclient import TestClient
+
+        from app import app
+        from src.config.settings import settings
+
+        order = {
+            "client_id": "client-001",
+            "delivery_address": {"street": "45 Galle Road", "city": "Colombo"},
+            "items": [{"sku": "PROD-001", "name": "Laptop Computer", "quantity": 1}],
+        }
+        with TestClient(app) as client:
+            remaining = args.records
+            while remaining > 0:
+                batch = min(remaining, settings.bulk_max_items)
+                client.post("/api/orders/bulk", json=[order] * batch)
+                remaining -= batch
+
+            results = {}
+            for fast_reads in (False, True):
+                settings.fast_reads = fast_reads
+                results[fast_reads] = time_pages(client, args.page_size, args.rounds)
+
+    validated, fast = results[False], results[True]
+    print(f"validated reads: {validated * 1e6:8.1f} us/record")
+    print(f"fast reads:      {fast * 1e6:8.1f} us/record")
+    print(f"speedup:         {validated / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
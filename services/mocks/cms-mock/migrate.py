@@ -0,0 +1,35 @@
+"""Import the JSON data files into the SQLite storage database
+
+Usage:
+    python migrate.py [--data-dir data] [--db data/<service>.db]
+
+Run it once before switching STORAGE_BACKEND to "sqlite". Re-running it
+replaces rows that share a key with the JSON records.
+"""
+
+import argparse
+import os
+
+from src.config.settings import settings
+from src.utils.sqlite_storage import import_json_files
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default="data", help="Directory holding *.json files")
+    parser.add_argument(
+        "--db",
+        default=None,
+        help="SQLite database path (defaults to <data-dir>/<sqlite_filename>)",
+    )
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(args.data_dir, settings.sqlite_filename)
+    imported = import_json_files(args.data_dir, db_path)
+    for table, count in imported.items():
+        print(f"Imported {count} records into {table}")
+    print(f"Migration complete: {db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,26 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 3001
     debug: bool = True
+    workers: int = 1  # Uvicorn worker processes; more than 1 disables reload
 
     # CORS settings
     cors_origins: list = ["*"]
 
+    # Storage settings
+    storage_backend: str = "file"  # "file", "journal" or "sqlite"
+    storage_cache: bool = True  # Serve reads from memory, re-read on file change
+    storage_pretty_json: bool = False  # Indent data files for reading by hand
+    storage_fsync: str = "batched"  # "always", "batched" or "never"
+    storage_fsync_interval: float = 1.0  # Seconds between batched fsyncs
+    journal_compact_interval: float = 30.0  # Seconds between journal compactions
+    sqlite_filename: str = "cms.db"  # Database file in the data directory
+    sequence_block_size: int = 100  # Numbers a worker reserves per sequence write
+    storage_io_threads: int = 8  # Threads running blocking storage calls for routes
+    fast_reads: bool = True  # List endpoints send stored records without re-validating
+
+    # Bulk intake settings
+    bulk_max_items: int = 10000  # Largest accepted POST /api/orders/bulk batch
+
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -0,0 +1,47 @@
+"""Shared service instances and the FastAPI dependencies that provide them"""
+
+from .services.admin_service import AdminService
+from .services.billing_service import BillingService
+from .services.client_service import ClientService
+from .services.cms_service import CMSService
+from .services.contract_service import ContractService
+from .services.driver_service import DriverService
+from .services.order_service import OrderService
+from .utils.service_registry import ServiceRegistry
+
+registry = ServiceRegistry()
+registry.register(CMSService, CMSService)
+registry.register(DriverService, DriverService)
+registry.register(ClientService, ClientService)
+registry.register(AdminService, AdminService)
+registry.register(OrderService, OrderService)
+registry.register(ContractService, ContractService)
+registry.register(BillingService, BillingService)
+
+
+async def get_cms_service() -> CMSService:
+    return registry.get(CMSService)
+
+
+async def get_driver_service() -> DriverService:
+    return registry.get(DriverService)
+
+
+async def get_client_service() -> ClientService:
+    return registry.get(ClientService)
+
+
+async def get_admin_service() -> AdminService:
+    return registry.get(AdminService)
+
+
+async def get_order_service() -> OrderService:
+    return registry.get(OrderService)
+
+
+async def get_contract_service() -> ContractService:
+    return registry.get(ContractService)
+
+
+async def get_billing_service() -> BillingService:
+    return registry.get(BillingService)
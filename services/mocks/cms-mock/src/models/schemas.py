@@ -227,6 +227,20 @@ class Order(BaseModel):
         from_attributes = True
 
 
+class BulkOrderResult(BaseModel):
+    index: int  # Position of the item in the request body
+    success: bool
+    order: Optional[Order] = None
+    error: Optional[str] = None
+
+
+class BulkOrderResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    results: List[BulkOrderResult]
+
+
 # Contract Models
 class ContractStatus(str, Enum):
     DRAFT = "draft"
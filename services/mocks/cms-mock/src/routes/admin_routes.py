@@ -1,27 +1,31 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Optional
 
 from ..models.schemas import Admin, AdminCreate, AdminUpdate, AdminRole, ErrorResponse
 from ..services.admin_service import AdminService
+from ..dependencies import get_admin_service
 
 router = APIRouter(prefix="/admins", tags=["admins"])
-admin_service = AdminService()
 
 
 @router.get("/", response_model=List[Admin])
 async def get_all_admins(
-    role: Optional[AdminRole] = Query(None, description="Filter admins by role")
+    role: Optional[AdminRole] = Query(None, description="Filter admins by role"),
+    admin_service: AdminService = Depends(get_admin_service),
 ):
     """Get all admins, optionally filtered by role"""
     if role:
-        return admin_service.get_admins_by_role(role)
-    return admin_service.get_all_admins()
+        return await admin_service.get_admins_by_role(role)
+    return await admin_service.get_all_admins()
 
 
 @router.get("/{admin_id}", response_model=Admin, responses={404: {"model": ErrorResponse}})
-async def get_admin(admin_id: str):
+async def get_admin(
+    admin_id: str,
+    admin_service: AdminService = Depends(get_admin_service),
+):
     """Get a specific admin by ID"""
-    admin = admin_service.get_admin_by_id(admin_id)
+    admin = await admin_service.get_admin_by_id(admin_id)
     if not admin:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -31,15 +35,22 @@ async def get_admin(admin_id: str):
 
 
 @router.post("/", response_model=Admin, status_code=status.HTTP_201_CREATED)
-async def create_admin(admin: AdminCreate):
+async def create_admin(
+    admin: AdminCreate,
+    admin_service: AdminService = Depends(get_admin_service),
+):
     """Create a new admin"""
-    return admin_service.create_admin(admin)
+    return await admin_service.create_admin(admin)
 
 
 @router.put("/{admin_id}", response_model=Admin, responses={404: {"model": ErrorResponse}})
-async def update_admin(admin_id: str, admin: AdminUpdate):
+async def update_admin(
+    admin_id: str,
+    admin: AdminUpdate,
+    admin_service: AdminService = Depends(get_admin_service),
+):
     """Update an admin"""
-    updated_admin = admin_service.update_admin(admin_id, admin)
+    updated_admin = await admin_service.update_admin(admin_id, admin)
     if not updated_admin:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -49,9 +60,12 @@ async def update_admin(admin_id: str, admin: AdminUpdate):
 
 
 @router.delete("/{admin_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_admin(admin_id: str):
+async def delete_admin(
+    admin_id: str,
+    admin_service: AdminService = Depends(get_admin_service),
+):
     """Delete an admin"""
-    deleted = admin_service.delete_admin(admin_id)
+    deleted = await admin_service.delete_admin(admin_id)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
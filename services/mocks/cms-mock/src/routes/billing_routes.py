@@ -1,28 +1,68 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 
 from ..models.schemas import BillingInvoice, BillingCreate, BillingUpdate
 from ..services.billing_service import BillingService
+from ..utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    NDJSON_MEDIA_TYPE,
+    InvalidCursorError,
+)
+from ..dependencies import get_billing_service
 
 router = APIRouter(prefix="/api/billing", tags=["Billing"])
-billing_service = BillingService()
 
 
 @router.get("/", response_model=List[BillingInvoice])
 async def get_all_invoices(
+    response: Response,
     client_id: Optional[str] = Query(None, description="Filter by client ID"),
     payment_status: Optional[str] = Query(None, description="Filter by payment status"),
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+    ),
+    cursor: Optional[str] = Query(
+        None, description=f"Cursor from the previous page's {NEXT_CURSOR_HEADER} header"
+    ),
+    billing_service: BillingService = Depends(get_billing_service),
 ):
-    """Get all billing invoices with optional filtering"""
-    return billing_service.get_all_invoices(
-        client_id=client_id, payment_status=payment_status
+    """Get billing invoices with optional filtering, one page at a time"""
+    try:
+        invoices, next_cursor = await billing_service.get_invoices_page(
+            limit, cursor, client_id=client_id, payment_status=payment_status
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return invoices
+
+
+@router.get("/export")
+async def export_invoices(
+    client_id: Optional[str] = Query(None, description="Filter by client ID"),
+    payment_status: Optional[str] = Query(None, description="Filter by payment status"),
+    billing_service: BillingService = Depends(get_billing_service),
+):
+    """Stream all matching invoices as newline-delimited JSON"""
+    return StreamingResponse(
+        billing_service.export_invoices(
+            client_id=client_id, payment_status=payment_status
+        ),
+        media_type=NDJSON_MEDIA_TYPE,
     )
 
 
 @router.get("/{invoice_id}", response_model=BillingInvoice)
-async def get_invoice(invoice_id: str):
+async def get_invoice(
+    invoice_id: str,
+    billing_service: BillingService = Depends(get_billing_service),
+):
     """Get a specific invoice by ID"""
-    invoice = billing_service.get_invoice(invoice_id)
+    invoice = await billing_service.get_invoice(invoice_id)
     if not invoice:
         raise HTTPException(
             status_code=404, detail=f"Invoice with ID {invoice_id} not found"
@@ -35,15 +75,20 @@ async def create_invoice(
     billing: BillingCreate,
     base_rate: float = Query(250.0, description="Base rate per delivery in LKR"),
     volume_discount: float = Query(0.0, description="Volume discount percentage"),
+    billing_service: BillingService = Depends(get_billing_service),
 ):
     """Create a new billing invoice"""
-    return billing_service.create_invoice(billing, base_rate, volume_discount)
+    return await billing_service.create_invoice(billing, base_rate, volume_discount)
 
 
 @router.put("/{invoice_id}", response_model=BillingInvoice)
-async def update_invoice(invoice_id: str, billing: BillingUpdate):
+async def update_invoice(
+    invoice_id: str,
+    billing: BillingUpdate,
+    billing_service: BillingService = Depends(get_billing_service),
+):
     """Update an existing invoice"""
-    updated_invoice = billing_service.update_invoice(invoice_id, billing)
+    updated_invoice = await billing_service.update_invoice(invoice_id, billing)
     if not updated_invoice:
         raise HTTPException(
             status_code=404, detail=f"Invoice with ID {invoice_id} not found"
@@ -52,9 +97,12 @@ async def update_invoice(invoice_id: str, billing: BillingUpdate):
 
 
 @router.delete("/{invoice_id}", status_code=204)
-async def delete_invoice(invoice_id: str):
+async def delete_invoice(
+    invoice_id: str,
+    billing_service: BillingService = Depends(get_billing_service),
+):
     """Delete an invoice"""
-    if not billing_service.delete_invoice(invoice_id):
+    if not await billing_service.delete_invoice(invoice_id):
         raise HTTPException(
             status_code=404, detail=f"Invoice with ID {invoice_id} not found"
         )
@@ -65,9 +113,12 @@ async def record_payment(
     invoice_id: str,
     payment_amount: float = Query(..., description="Payment amount in LKR"),
     payment_date: Optional[str] = Query(None, description="Payment date (ISO format)"),
+    billing_service: BillingService = Depends(get_billing_service),
 ):
     """Record a payment for an invoice"""
-    invoice = billing_service.record_payment(invoice_id, payment_amount, payment_date)
+    invoice = await billing_service.record_payment(
+        invoice_id, payment_amount, payment_date
+    )
     if not invoice:
         raise HTTPException(
             status_code=404, detail=f"Invoice with ID {invoice_id} not found"
@@ -1,23 +1,27 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from ..models.schemas import Customer, CustomerCreate, CustomerUpdate, ErrorResponse
-from ..services.cms_service import cms_service
+from ..services.cms_service import CMSService
+from ..dependencies import get_cms_service
 
 router = APIRouter(prefix="/api/customers", tags=["customers"])
 
 
 @router.get("/", response_model=List[Customer])
-async def get_all_customers():
+async def get_all_customers(cms_service: CMSService = Depends(get_cms_service)):
     """Get all customers"""
-    return cms_service.get_all_customers()
+    return await cms_service.get_all_customers()
 
 
 @router.get(
     "/{customer_id}", response_model=Customer, responses={404: {"model": ErrorResponse}}
 )
-async def get_customer(customer_id: str):
+async def get_customer(
+    customer_id: str,
+    cms_service: CMSService = Depends(get_cms_service),
+):
     """Get customer by ID"""
-    customer = cms_service.get_customer(customer_id)
+    customer = await cms_service.get_customer(customer_id)
     if not customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -27,17 +31,24 @@ async def get_customer(customer_id: str):
 
 
 @router.post("/", response_model=Customer, status_code=status.HTTP_201_CREATED)
-async def create_customer(customer: CustomerCreate):
+async def create_customer(
+    customer: CustomerCreate,
+    cms_service: CMSService = Depends(get_cms_service),
+):
     """Create new customer"""
-    return cms_service.create_customer(customer)
+    return await cms_service.create_customer(customer)
 
 
 @router.put(
     "/{customer_id}", response_model=Customer, responses={404: {"model": ErrorResponse}}
 )
-async def update_customer(customer_id: str, customer: CustomerUpdate):
+async def update_customer(
+    customer_id: str,
+    customer: CustomerUpdate,
+    cms_service: CMSService = Depends(get_cms_service),
+):
     """Update existing customer"""
-    updated_customer = cms_service.update_customer(customer_id, customer)
+    updated_customer = await cms_service.update_customer(customer_id, customer)
     if not updated_customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -47,9 +58,12 @@ async def update_customer(customer_id: str, customer: CustomerUpdate):
 
 
 @router.delete("/{customer_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_customer(customer_id: str):
+async def delete_customer(
+    customer_id: str,
+    cms_service: CMSService = Depends(get_cms_service),
+):
     """Delete customer"""
-    success = cms_service.delete_customer(customer_id)
+    success = await cms_service.delete_customer(customer_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -57,12 +71,3 @@ async def delete_customer(customer_id: str):
         )
     return None
 
-
-@router.get("/health", tags=["health"])
-async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "CMS Mock Service",
-        "total_customers": len(cms_service.storage.get_all()),
-    }
@@ -1,28 +1,70 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 
 from ..models.schemas import Contract, ContractCreate, ContractUpdate, ContractStatus
 from ..services.contract_service import ContractService
+from ..utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    NDJSON_MEDIA_TYPE,
+    InvalidCursorError,
+)
+from ..dependencies import get_contract_service
 
 router = APIRouter(prefix="/api/contracts", tags=["Contracts"])
-contract_service = ContractService()
 
 
 @router.get("/", response_model=List[Contract])
 async def get_all_contracts(
+    response: Response,
     client_id: Optional[str] = Query(None, description="Filter by client ID"),
     status: Optional[ContractStatus] = Query(
         None, description="Filter by contract status"
     ),
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+    ),
+    cursor: Optional[str] = Query(
+        None, description=f"Cursor from the previous page's {NEXT_CURSOR_HEADER} header"
+    ),
+    contract_service: ContractService = Depends(get_contract_service),
 ):
-    """Get all contracts with optional filtering"""
-    return contract_service.get_all_contracts(client_id=client_id, status=status)
+    """Get contracts with optional filtering, one page at a time (oldest first)"""
+    try:
+        contracts, next_cursor = await contract_service.get_contracts_page(
+            limit, cursor, client_id=client_id, status=status
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return contracts
+
+
+@router.get("/export")
+async def export_contracts(
+    client_id: Optional[str] = Query(None, description="Filter by client ID"),
+    status: Optional[ContractStatus] = Query(
+        None, description="Filter by contract status"
+    ),
+    contract_service: ContractService = Depends(get_contract_service),
+):
+    """Stream all matching contracts as newline-delimited JSON"""
+    return StreamingResponse(
+        contract_service.export_contracts(client_id=client_id, status=status),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
 
 
 @router.get("/{contract_id}", response_model=Contract)
-async def get_contract(contract_id: str):
+async def get_contract(
+    contract_id: str,
+    contract_service: ContractService = Depends(get_contract_service),
+):
     """Get a specific contract by ID"""
-    contract = contract_service.get_contract(contract_id)
+    contract = await contract_service.get_contract(contract_id)
     if not contract:
         raise HTTPException(
             status_code=404, detail=f"Contract with ID {contract_id} not found"
@@ -31,15 +73,22 @@ async def get_contract(contract_id: str):
 
 
 @router.post("/", response_model=Contract, status_code=201)
-async def create_contract(contract: ContractCreate):
+async def create_contract(
+    contract: ContractCreate,
+    contract_service: ContractService = Depends(get_contract_service),
+):
     """Create a new contract"""
-    return contract_service.create_contract(contract)
+    return await contract_service.create_contract(contract)
 
 
 @router.put("/{contract_id}", response_model=Contract)
-async def update_contract(contract_id: str, contract: ContractUpdate):
+async def update_contract(
+    contract_id: str,
+    contract: ContractUpdate,
+    contract_service: ContractService = Depends(get_contract_service),
+):
     """Update an existing contract"""
-    updated_contract = contract_service.update_contract(contract_id, contract)
+    updated_contract = await contract_service.update_contract(contract_id, contract)
     if not updated_contract:
         raise HTTPException(
             status_code=404, detail=f"Contract with ID {contract_id} not found"
@@ -48,18 +97,24 @@ async def update_contract(contract_id: str, contract: ContractUpdate):
 
 
 @router.delete("/{contract_id}", status_code=204)
-async def delete_contract(contract_id: str):
+async def delete_contract(
+    contract_id: str,
+    contract_service: ContractService = Depends(get_contract_service),
+):
     """Delete a contract"""
-    if not contract_service.delete_contract(contract_id):
+    if not await contract_service.delete_contract(contract_id):
         raise HTTPException(
             status_code=404, detail=f"Contract with ID {contract_id} not found"
         )
 
 
 @router.post("/{contract_id}/activate", response_model=Contract)
-async def activate_contract(contract_id: str):
+async def activate_contract(
+    contract_id: str,
+    contract_service: ContractService = Depends(get_contract_service),
+):
     """Activate a contract"""
-    contract = contract_service.activate_contract(contract_id)
+    contract = await contract_service.activate_contract(contract_id)
     if not contract:
         raise HTTPException(
             status_code=404, detail=f"Contract with ID {contract_id} not found"
@@ -68,9 +123,12 @@ async def activate_contract(contract_id: str):
 
 
 @router.post("/{contract_id}/suspend", response_model=Contract)
-async def suspend_contract(contract_id: str):
+async def suspend_contract(
+    contract_id: str,
+    contract_service: ContractService = Depends(get_contract_service),
+):
     """Suspend a contract"""
-    contract = contract_service.suspend_contract(contract_id)
+    contract = await contract_service.suspend_contract(contract_id)
     if not contract:
         raise HTTPException(
             status_code=404, detail=f"Contract with ID {contract_id} not found"
@@ -79,9 +137,12 @@ async def suspend_contract(contract_id: str):
 
 
 @router.post("/{contract_id}/terminate", response_model=Contract)
-async def terminate_contract(contract_id: str):
+async def terminate_contract(
+    contract_id: str,
+    contract_service: ContractService = Depends(get_contract_service),
+):
     """Terminate a contract"""
-    contract = contract_service.terminate_contract(contract_id)
+    contract = await contract_service.terminate_contract(contract_id)
     if not contract:
         raise HTTPException(
             status_code=404, detail=f"Contract with ID {contract_id} not found"
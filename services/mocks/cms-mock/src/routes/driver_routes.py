@@ -1,27 +1,31 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Optional
 
 from ..models.schemas import Driver, DriverCreate, DriverUpdate, DriverStatus, ErrorResponse
 from ..services.driver_service import DriverService
+from ..dependencies import get_driver_service
 
 router = APIRouter(prefix="/drivers", tags=["drivers"])
-driver_service = DriverService()
 
 
 @router.get("/", response_model=List[Driver])
 async def get_all_drivers(
-    status: Optional[DriverStatus] = Query(None, description="Filter drivers by status")
+    status: Optional[DriverStatus] = Query(None, description="Filter drivers by status"),
+    driver_service: DriverService = Depends(get_driver_service),
 ):
     """Get all drivers, optionally filtered by status"""
     if status:
-        return driver_service.get_drivers_by_status(status)
-    return driver_service.get_all_drivers()
+        return await driver_service.get_drivers_by_status(status)
+    return await driver_service.get_all_drivers()
 
 
 @router.get("/{driver_id}", response_model=Driver, responses={404: {"model": ErrorResponse}})
-async def get_driver(driver_id: str):
+async def get_driver(
+    driver_id: str,
+    driver_service: DriverService = Depends(get_driver_service),
+):
     """Get a specific driver by ID"""
-    driver = driver_service.get_driver_by_id(driver_id)
+    driver = await driver_service.get_driver_by_id(driver_id)
     if not driver:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -31,15 +35,22 @@ async def get_driver(driver_id: str):
 
 
 @router.post("/", response_model=Driver, status_code=status.HTTP_201_CREATED)
-async def create_driver(driver: DriverCreate):
+async def create_driver(
+    driver: DriverCreate,
+    driver_service: DriverService = Depends(get_driver_service),
+):
     """Create a new driver"""
-    return driver_service.create_driver(driver)
+    return await driver_service.create_driver(driver)
 
 
 @router.put("/{driver_id}", response_model=Driver, responses={404: {"model": ErrorResponse}})
-async def update_driver(driver_id: str, driver: DriverUpdate):
+async def update_driver(
+    driver_id: str,
+    driver: DriverUpdate,
+    driver_service: DriverService = Depends(get_driver_service),
+):
     """Update a driver"""
-    updated_driver = driver_service.update_driver(driver_id, driver)
+    updated_driver = await driver_service.update_driver(driver_id, driver)
     if not updated_driver:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -49,9 +60,12 @@ async def update_driver(driver_id: str, driver: DriverUpdate):
 
 
 @router.delete("/{driver_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_driver(driver_id: str):
+async def delete_driver(
+    driver_id: str,
+    driver_service: DriverService = Depends(get_driver_service),
+):
     """Delete a driver"""
-    deleted = driver_service.delete_driver(driver_id)
+    deleted = await driver_service.delete_driver(driver_id)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
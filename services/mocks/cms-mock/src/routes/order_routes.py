@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import Any, Dict, List, Optional, Tuple
 
+from ..config.settings import settings
 from ..models.schemas import (
+    BulkOrderResponse,
+    BulkOrderResult,
     Order,
     OrderCreate,
     OrderUpdate,
@@ -10,28 +16,77 @@ from ..models.schemas import (
     DeliveryFailureReason,
 )
 from ..services.order_service import OrderService
+from ..utils import serialization
+from ..utils.fast_reads import RecordListSerializer
+from ..utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    NDJSON_MEDIA_TYPE,
+    InvalidCursorError,
+)
+from ..dependencies import get_order_service
 
 router = APIRouter(prefix="/api/orders", tags=["Orders"])
-order_service = OrderService()
+order_records = RecordListSerializer(Order)
 
 
 @router.get("/", response_model=List[Order])
 async def get_all_orders(
+    response: Response,
     status: Optional[OrderStatus] = Query(None, description="Filter by order status"),
     client_id: Optional[str] = Query(None, description="Filter by client ID"),
     priority: Optional[str] = Query(None, description="Filter by priority"),
     driver_id: Optional[str] = Query(None, description="Filter by assigned driver ID"),
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+    ),
+    cursor: Optional[str] = Query(
+        None, description=f"Cursor from the previous page's {NEXT_CURSOR_HEADER} header"
+    ),
+    order_service: OrderService = Depends(get_order_service),
 ):
-    """Get all orders with optional filtering"""
-    return order_service.get_all_orders(
-        status=status, client_id=client_id, priority=priority, driver_id=driver_id
+    """Get orders with optional filtering, one page at a time (oldest first)"""
+    try:
+        orders, next_cursor = await order_service.get_order_records_page(
+            limit,
+            cursor,
+            status=status,
+            client_id=client_id,
+            priority=priority,
+            driver_id=driver_id,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return order_records.respond(orders, response)
+
+
+@router.get("/export")
+async def export_orders(
+    status: Optional[OrderStatus] = Query(None, description="Filter by order status"),
+    client_id: Optional[str] = Query(None, description="Filter by client ID"),
+    priority: Optional[str] = Query(None, description="Filter by priority"),
+    driver_id: Optional[str] = Query(None, description="Filter by assigned driver ID"),
+    order_service: OrderService = Depends(get_order_service),
+):
+    """Stream all matching orders as newline-delimited JSON"""
+    return StreamingResponse(
+        order_service.export_orders(
+            status=status, client_id=client_id, priority=priority, driver_id=driver_id
+        ),
+        media_type=NDJSON_MEDIA_TYPE,
     )
 
 
 @router.get("/{order_id}", response_model=Order)
-async def get_order(order_id: str):
+async def get_order(
+    order_id: str,
+    order_service: OrderService = Depends(get_order_service),
+):
     """Get a specific order by ID"""
-    order = order_service.get_order(order_id)
+    order = await order_service.get_order(order_id)
     if not order:
         raise HTTPException(
             status_code=404, detail=f"Order with ID {order_id} not found"
@@ -40,15 +95,142 @@ async def get_order(order_id: str):
 
 
 @router.post("/", response_model=Order, status_code=201)
-async def create_order(order: OrderCreate):
+async def create_order(
+    order: OrderCreate,
+    order_service: OrderService = Depends(get_order_service),
+):
     """Create a new order (Order Intake from Client Portal)"""
-    return order_service.create_order(order)
+    return await order_service.create_order(order)
+
+
+def _parse_bulk_body(
+    body: bytes, content_type: str
+) -> Tuple[List[Any], Dict[int, str]]:
+    """Split a bulk body into items, plus parse errors keyed by item index
+
+    NDJSON bodies are parsed line by line so one malformed line only fails
+    its own item; anything else must be a JSON array.
+    """
+    if "ndjson" in content_type or "jsonl" in content_type:
+        items: List[Any] = []
+        errors: Dict[int, str] = {}
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(serialization.loads(line))
+            except serialization.JSONDecodeError as e:
+                errors[len(items)] = f"Invalid JSON: {e}"
+                items.append(None)
+        return items, errors
+
+    try:
+        items = serialization.loads(body)
+    except serialization.JSONDecodeError:
+        items = None
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=400, detail="Body must be a JSON array or NDJSON"
+        )
+    return items, {}
+
+
+def _validation_message(error: ValidationError) -> str:
+    """Flatten a validation error into one line per invalid field"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'body'}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+def _validate_bulk_body(
+    body: bytes, content_type: str
+) -> Tuple[int, Dict[int, BulkOrderResult], List[Tuple[int, OrderCreate]]]:
+    """Parse and validate a bulk body
+
+    Returns the number of items, the results of the items that failed and
+    the valid orders with their indexes.
+    """
+    items, parse_errors = _parse_bulk_body(body, content_type)
+    if len(items) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds the limit of {settings.bulk_max_items} orders",
+        )
+
+    results: Dict[int, BulkOrderResult] = {}
+    valid: List[Tuple[int, OrderCreate]] = []
+    for index, item in enumerate(items):
+        if index in parse_errors:
+            results[index] = BulkOrderResult(
+                index=index, success=False, error=parse_errors[index]
+            )
+            continue
+        try:
+            valid.append((index, OrderCreate.model_validate(item)))
+        except ValidationError as e:
+            results[index] = BulkOrderResult(
+                index=index, success=False, error=_validation_message(e)
+            )
+    return len(items), results, valid
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkOrderResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/OrderCreate"},
+                    }
+                },
+                NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def create_orders_bulk(
+    request: Request,
+    order_service: OrderService = Depends(get_order_service),
+):
+    """Create many orders from a JSON array or NDJSON body
+
+    Every item is validated on its own; valid items are created together in
+    a single storage write and each item gets its own result.
+    """
+    # Parsing and validating up to BULK_MAX_ITEMS orders would otherwise
+    # hold up the event loop for every other request
+    total, results, valid = await run_in_threadpool(
+        _validate_bulk_body,
+        await request.body(),
+        request.headers.get("content-type", ""),
+    )
+
+    if valid:
+        created = await order_service.create_orders([order for _, order in valid])
+        for (index, _), order in zip(valid, created):
+            results[index] = BulkOrderResult(index=index, success=True, order=order)
+
+    return BulkOrderResponse(
+        total=total,
+        created=len(valid),
+        failed=total - len(valid),
+        results=[results[index] for index in range(total)],
+    )
 
 
 @router.put("/{order_id}", response_model=Order)
-async def update_order(order_id: str, order: OrderUpdate):
+async def update_order(
+    order_id: str,
+    order: OrderUpdate,
+    order_service: OrderService = Depends(get_order_service),
+):
     """Update an existing order"""
-    updated_order = order_service.update_order(order_id, order)
+    updated_order = await order_service.update_order(order_id, order)
     if not updated_order:
         raise HTTPException(
             status_code=404, detail=f"Order with ID {order_id} not found"
@@ -57,9 +239,12 @@ async def update_order(order_id: str, order: OrderUpdate):
 
 
 @router.delete("/{order_id}", status_code=204)
-async def delete_order(order_id: str):
+async def delete_order(
+    order_id: str,
+    order_service: OrderService = Depends(get_order_service),
+):
     """Delete an order"""
-    if not order_service.delete_order(order_id):
+    if not await order_service.delete_order(order_id):
         raise HTTPException(
             status_code=404, detail=f"Order with ID {order_id} not found"
         )
@@ -70,9 +255,10 @@ async def assign_driver(
     order_id: str,
     driver_id: str = Query(..., description="Driver ID to assign"),
     route_id: Optional[str] = Query(None, description="Route ID (optional)"),
+    order_service: OrderService = Depends(get_order_service),
 ):
     """Assign an order to a driver (and optionally a route)"""
-    order = order_service.assign_to_driver(order_id, driver_id, route_id)
+    order = await order_service.assign_to_driver(order_id, driver_id, route_id)
     if not order:
         raise HTTPException(
             status_code=404, detail=f"Order with ID {order_id} not found"
@@ -81,9 +267,13 @@ async def assign_driver(
 
 
 @router.post("/{order_id}/mark-delivered", response_model=Order)
-async def mark_delivered(order_id: str, proof: ProofOfDelivery):
+async def mark_delivered(
+    order_id: str,
+    proof: ProofOfDelivery,
+    order_service: OrderService = Depends(get_order_service),
+):
     """Mark an order as delivered with proof of delivery"""
-    order = order_service.mark_as_delivered(order_id, proof.model_dump())
+    order = await order_service.mark_as_delivered(order_id, proof.model_dump())
     if not order:
         raise HTTPException(
             status_code=404, detail=f"Order with ID {order_id} not found"
@@ -96,9 +286,10 @@ async def mark_failed(
     order_id: str,
     reason: DeliveryFailureReason = Query(..., description="Failure reason"),
     notes: Optional[str] = Query(None, description="Additional notes"),
+    order_service: OrderService = Depends(get_order_service),
 ):
     """Mark an order as failed with reason"""
-    order = order_service.mark_as_failed(order_id, reason, notes)
+    order = await order_service.mark_as_failed(order_id, reason, notes)
     if not order:
         raise HTTPException(
             status_code=404, detail=f"Order with ID {order_id} not found"
@@ -107,6 +298,24 @@ async def mark_failed(
 
 
 @router.get("/status/{status}", response_model=List[Order])
-async def get_orders_by_status(status: OrderStatus):
-    """Get all orders with a specific status"""
-    return order_service.get_orders_by_status(status)
+async def get_orders_by_status(
+    status: OrderStatus,
+    response: Response,
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+    ),
+    cursor: Optional[str] = Query(
+        None, description=f"Cursor from the previous page's {NEXT_CURSOR_HEADER} header"
+    ),
+    order_service: OrderService = Depends(get_order_service),
+):
+    """Get orders with a specific status, one page at a time (oldest first)"""
+    try:
+        orders, next_cursor = await order_service.get_order_records_page(
+            limit, cursor, status=status
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return order_records.respond(orders, response)
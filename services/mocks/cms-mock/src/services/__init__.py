@@ -1,5 +1,5 @@
 """Services Module"""
 
-from .cms_service import cms_service
+from .cms_service import CMSService
 
-__all__ = ["cms_service"]
+__all__ = ["CMSService"]
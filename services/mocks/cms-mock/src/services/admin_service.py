@@ -4,26 +4,26 @@ from typing import Dict, Optional, List
 from pathlib import Path
 
 from ..models.schemas import Admin, AdminCreate, AdminUpdate, AdminRole
-from ..utils.file_storage import FileStorage
+from ..utils.storage_factory import create_storage
 
 
 class AdminService:
     def __init__(self, data_dir: str = "data"):
-        self.storage = FileStorage(data_dir, "admins")
+        self.storage = create_storage(data_dir, "admins")
     
-    def get_all_admins(self) -> List[Admin]:
+    async def get_all_admins(self) -> List[Admin]:
         """Get all admins"""
-        admins_data = self.storage.get_all()
+        admins_data = await self.storage.aget_all()
         return [Admin(**admin) for admin in admins_data.values()]
     
-    def get_admin_by_id(self, admin_id: str) -> Optional[Admin]:
+    async def get_admin_by_id(self, admin_id: str) -> Optional[Admin]:
         """Get admin by ID"""
-        admin_data = self.storage.get(admin_id)
+        admin_data = await self.storage.aget(admin_id)
         if admin_data:
             return Admin(**admin_data)
         return None
     
-    def create_admin(self, admin_data: AdminCreate) -> Admin:
+    async def create_admin(self, admin_data: AdminCreate) -> Admin:
         """Create a new admin"""
         admin_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat()
@@ -39,15 +39,13 @@ class AdminService:
         if "role" in admin and admin["role"]:
             admin["role"] = admin["role"].value
         
-        self.storage.create(admin_id, admin)
+        await self.storage.acreate(admin_id, admin)
         return Admin(**admin)
     
-    def update_admin(self, admin_id: str, admin_data: AdminUpdate) -> Optional[Admin]:
+    async def update_admin(
+        self, admin_id: str, admin_data: AdminUpdate
+    ) -> Optional[Admin]:
         """Update an admin"""
-        existing_admin = self.storage.get(admin_id)
-        if not existing_admin:
-            return None
-        
         update_data = admin_data.model_dump(exclude_unset=True)
         update_data["updated_at"] = datetime.utcnow().isoformat()
         
@@ -55,20 +53,23 @@ class AdminService:
         if "role" in update_data and update_data["role"]:
             update_data["role"] = update_data["role"].value
         
-        updated_admin = {**existing_admin, **update_data}
-        self.storage.update(admin_id, updated_admin)
+        updated_admin = await self.storage.aupdate_with(
+            admin_id, lambda existing: {**existing, **update_data}
+        )
+        if updated_admin is None:
+            return None
         
         return Admin(**updated_admin)
     
-    def delete_admin(self, admin_id: str) -> bool:
+    async def delete_admin(self, admin_id: str) -> bool:
         """Delete an admin"""
-        return self.storage.delete(admin_id)
+        return await self.storage.adelete(admin_id)
     
-    def get_admins_by_role(self, role: AdminRole) -> List[Admin]:
+    async def get_admins_by_role(self, role: AdminRole) -> List[Admin]:
         """Get admins by role"""
-        all_admins = self.get_all_admins()
+        all_admins = await self.get_all_admins()
         return [admin for admin in all_admins if admin.role == role]
     
-    def get_admin_count(self) -> int:
+    async def get_admin_count(self) -> int:
         """Get total number of admins"""
-        return len(self.storage.get_all())
+        return await self.storage.acount()
@@ -1,19 +1,23 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime
 import uuid
 
-from ..utils.file_storage import FileStorage
+from ..utils.pagination import afetch_page, iter_ndjson
+from ..utils.sequence import create_sequence
+from ..utils.storage_factory import create_storage
 from ..models.schemas import BillingInvoice, BillingCreate, BillingUpdate
 
 
 class BillingService:
     def __init__(self):
-        self.storage = FileStorage(data_dir="data", filename="billing")
+        self.storage = create_storage(data_dir="data", filename="billing")
         self._init_mock_data()
-        self.invoice_counter = self._get_next_invoice_number()
+        self.invoice_numbers = create_sequence(
+            "data", "invoice_number", self._get_next_invoice_number
+        )
 
     def _get_next_invoice_number(self) -> int:
-        """Get the next invoice number"""
+        """Get the next invoice number from existing invoices (new sequences)"""
         invoices = self.storage.get_all()
         if not invoices:
             return 10001
@@ -29,12 +33,10 @@ class BillingService:
                 pass
         return max_num + 1
 
-    def _generate_invoice_number(self) -> str:
+    async def _generate_invoice_number(self) -> str:
         """Generate invoice number: INV-YYYY-NNNNN"""
         year = datetime.now().year
-        invoice_num = f"INV-{year}-{self.invoice_counter:05d}"
-        self.invoice_counter += 1
-        return invoice_num
+        return f"INV-{year}-{await self.invoice_numbers.anext():05d}"
 
     def _calculate_billing_amount(
         self, base_rate: float, total_deliveries: int, volume_discount: float = 0.0
@@ -46,7 +48,7 @@ class BillingService:
 
     def _init_mock_data(self):
         """Initialize with sample billing records"""
-        if not self.storage.get_all():
+        if not self.storage.count():
             # Invoice for Daraz - January 2026
             invoice1_id = str(uuid.uuid4())
             invoice1 = {
@@ -94,7 +96,7 @@ class BillingService:
             self.storage.create(invoice1_id, invoice1)
             self.storage.create(invoice2_id, invoice2)
 
-    def create_invoice(
+    async def create_invoice(
         self,
         billing_data: BillingCreate,
         base_rate: float = 250.0,
@@ -102,7 +104,7 @@ class BillingService:
     ) -> BillingInvoice:
         """Create a new billing invoice"""
         invoice_id = str(uuid.uuid4())
-        invoice_number = self._generate_invoice_number()
+        invoice_number = await self._generate_invoice_number()
 
         total_amount = self._calculate_billing_amount(
             base_rate, billing_data.total_deliveries, volume_discount
@@ -122,23 +124,23 @@ class BillingService:
             "updated_at": now,
         }
 
-        self.storage.create(invoice_id, invoice_dict)
+        await self.storage.acreate(invoice_id, invoice_dict)
         return BillingInvoice(**invoice_dict)
 
-    def get_invoice(self, invoice_id: str) -> Optional[BillingInvoice]:
+    async def get_invoice(self, invoice_id: str) -> Optional[BillingInvoice]:
         """Get a specific invoice by ID"""
-        invoice_data = self.storage.get(invoice_id)
+        invoice_data = await self.storage.aget(invoice_id)
         if invoice_data:
             return BillingInvoice(**invoice_data)
         return None
 
-    def get_all_invoices(
+    async def get_all_invoices(
         self,
         client_id: Optional[str] = None,
         payment_status: Optional[str] = None,
     ) -> List[BillingInvoice]:
         """Get all invoices with optional filtering"""
-        invoices = self.storage.get_all()
+        invoices = await self.storage.aget_all()
         invoice_list = [BillingInvoice(**invoice) for invoice in invoices.values()]
 
         if client_id:
@@ -150,31 +152,57 @@ class BillingService:
 
         return invoice_list
 
-    def update_invoice(
+    @staticmethod
+    def _filters(client_id: Optional[str], payment_status: Optional[str]) -> dict:
+        """Map the list filters onto record fields, dropping unset ones"""
+        filters = {"client_id": client_id, "payment_status": payment_status}
+        return {field: value for field, value in filters.items() if value}
+
+    async def get_invoices_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        client_id: Optional[str] = None,
+        payment_status: Optional[str] = None,
+    ) -> Tuple[List[BillingInvoice], Optional[str]]:
+        """Get one page of invoices, oldest first, and the next page's cursor"""
+        invoices, next_cursor = await afetch_page(
+            self.storage, limit, cursor, **self._filters(client_id, payment_status)
+        )
+        return [BillingInvoice(**invoice) for invoice in invoices], next_cursor
+
+    def export_invoices(
+        self,
+        client_id: Optional[str] = None,
+        payment_status: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        """Stream matching invoices as NDJSON lines, oldest first"""
+        return iter_ndjson(self.storage, **self._filters(client_id, payment_status))
+
+    async def update_invoice(
         self, invoice_id: str, billing_update: BillingUpdate
     ) -> Optional[BillingInvoice]:
         """Update an existing invoice"""
-        existing_invoice = self.storage.get(invoice_id)
-        if not existing_invoice:
-            return None
-
         update_data = billing_update.model_dump(exclude_unset=True)
         update_data["updated_at"] = datetime.now().isoformat()
 
-        updated_invoice = {**existing_invoice, **update_data}
-        self.storage.update(invoice_id, updated_invoice)
+        updated_invoice = await self.storage.aupdate_with(
+            invoice_id, lambda existing: {**existing, **update_data}
+        )
+        if updated_invoice is None:
+            return None
 
         return BillingInvoice(**updated_invoice)
 
-    def delete_invoice(self, invoice_id: str) -> bool:
+    async def delete_invoice(self, invoice_id: str) -> bool:
         """Delete an invoice"""
-        return self.storage.delete(invoice_id)
+        return await self.storage.adelete(invoice_id)
 
-    def record_payment(
+    async def record_payment(
         self, invoice_id: str, payment_amount: float, payment_date: Optional[str] = None
     ) -> Optional[BillingInvoice]:
         """Record a payment for an invoice"""
-        invoice = self.get_invoice(invoice_id)
+        invoice = await self.get_invoice(invoice_id)
         if not invoice:
             return None
 
@@ -194,4 +222,4 @@ class BillingService:
             payment_date=payment_date or datetime.now().isoformat(),
         )
 
-        return self.update_invoice(invoice_id, update)
+        return await self.update_invoice(invoice_id, update)
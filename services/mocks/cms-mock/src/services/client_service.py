@@ -4,26 +4,26 @@ from typing import Dict, Optional, List
 from pathlib import Path
 
 from ..models.schemas import Client, ClientCreate, ClientUpdate, MembershipLevel
-from ..utils.file_storage import FileStorage
+from ..utils.storage_factory import create_storage
 
 
 class ClientService:
     def __init__(self, data_dir: str = "data"):
-        self.storage = FileStorage(data_dir, "clients")
+        self.storage = create_storage(data_dir, "clients")
     
-    def get_all_clients(self) -> List[Client]:
+    async def get_all_clients(self) -> List[Client]:
         """Get all clients"""
-        clients_data = self.storage.get_all()
+        clients_data = await self.storage.aget_all()
         return [Client(**client) for client in clients_data.values()]
     
-    def get_client_by_id(self, client_id: str) -> Optional[Client]:
+    async def get_client_by_id(self, client_id: str) -> Optional[Client]:
         """Get client by ID"""
-        client_data = self.storage.get(client_id)
+        client_data = await self.storage.aget(client_id)
         if client_data:
             return Client(**client_data)
         return None
     
-    def create_client(self, client_data: ClientCreate) -> Client:
+    async def create_client(self, client_data: ClientCreate) -> Client:
         """Create a new client"""
         client_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat()
@@ -39,15 +39,13 @@ class ClientService:
         if "membership_level" in client and client["membership_level"]:
             client["membership_level"] = client["membership_level"].value
         
-        self.storage.create(client_id, client)
+        await self.storage.acreate(client_id, client)
         return Client(**client)
     
-    def update_client(self, client_id: str, client_data: ClientUpdate) -> Optional[Client]:
+    async def update_client(
+        self, client_id: str, client_data: ClientUpdate
+    ) -> Optional[Client]:
         """Update a client"""
-        existing_client = self.storage.get(client_id)
-        if not existing_client:
-            return None
-        
         update_data = client_data.model_dump(exclude_unset=True)
         update_data["updated_at"] = datetime.utcnow().isoformat()
         
@@ -55,20 +53,25 @@ class ClientService:
         if "membership_level" in update_data and update_data["membership_level"]:
             update_data["membership_level"] = update_data["membership_level"].value
         
-        updated_client = {**existing_client, **update_data}
-        self.storage.update(client_id, updated_client)
+        updated_client = await self.storage.aupdate_with(
+            client_id, lambda existing: {**existing, **update_data}
+        )
+        if updated_client is None:
+            return None
         
         return Client(**updated_client)
     
-    def delete_client(self, client_id: str) -> bool:
+    async def delete_client(self, client_id: str) -> bool:
         """Delete a client"""
-        return self.storage.delete(client_id)
+        return await self.storage.adelete(client_id)
     
-    def get_clients_by_membership(self, membership_level: MembershipLevel) -> List[Client]:
+    async def get_clients_by_membership(
+        self, membership_level: MembershipLevel
+    ) -> List[Client]:
         """Get clients by membership level"""
-        all_clients = self.get_all_clients()
+        all_clients = await self.get_all_clients()
         return [client for client in all_clients if client.membership_level == membership_level]
     
-    def get_client_count(self) -> int:
+    async def get_client_count(self) -> int:
         """Get total number of clients"""
-        return len(self.storage.get_all())
+        return await self.storage.acount()
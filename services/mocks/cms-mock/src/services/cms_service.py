@@ -3,7 +3,7 @@ from typing import Dict, List, Optional
 import uuid
 import os
 from ..models.schemas import Customer, CustomerCreate, CustomerUpdate, CustomerStatus
-from ..utils.file_storage import FileStorage
+from ..utils.storage_factory import create_storage
 
 
 class CMSService:
@@ -12,13 +12,13 @@ class CMSService:
     def __init__(self):
         # Initialize file storage
         data_dir = os.path.join(os.path.dirname(__file__), "../../data")
-        self.storage = FileStorage(data_dir, "customers")
+        self.storage = create_storage(data_dir, "customers")
         self._initialize_mock_data()
 
     def _initialize_mock_data(self):
         """Initialize with some mock customers if file is empty"""
         # Only initialize if storage is empty
-        if not self.storage.get_all():
+        if not self.storage.count():
             mock_customers = [
                 {
                     "name": "John Doe",
@@ -50,17 +50,17 @@ class CMSService:
 
             self.storage.initialize_with_data(initial_data)
 
-    def get_all_customers(self) -> List[Customer]:
+    async def get_all_customers(self) -> List[Customer]:
         """Get all customers"""
-        customers = self.storage.get_all()
+        customers = await self.storage.aget_all()
         return [Customer(**customer) for customer in customers.values()]
 
-    def get_customer(self, customer_id: str) -> Optional[Customer]:
+    async def get_customer(self, customer_id: str) -> Optional[Customer]:
         """Get customer by ID"""
-        customer = self.storage.get(customer_id)
+        customer = await self.storage.aget(customer_id)
         return Customer(**customer) if customer else None
 
-    def create_customer(self, customer_data: CustomerCreate) -> Customer:
+    async def create_customer(self, customer_data: CustomerCreate) -> Customer:
         """Create new customer"""
         customer_id = str(uuid.uuid4())
         now = datetime.now().isoformat()
@@ -73,28 +73,23 @@ class CMSService:
             "updated_at": now,
         }
 
-        self.storage.create(customer_id, customer)
+        await self.storage.acreate(customer_id, customer)
         return Customer(**customer)
 
-    def update_customer(
+    async def update_customer(
         self, customer_id: str, customer_data: CustomerUpdate
     ) -> Optional[Customer]:
         """Update existing customer"""
-        customer = self.storage.get(customer_id)
-        if not customer:
-            return None
-
         update_data = customer_data.model_dump(exclude_unset=True)
-        customer.update(update_data)
-        customer["updated_at"] = datetime.now().isoformat()
+        update_data["updated_at"] = datetime.now().isoformat()
 
-        self.storage.update(customer_id, customer)
+        customer = await self.storage.aupdate_with(
+            customer_id, lambda existing: {**existing, **update_data}
+        )
+        if not customer:
+            return None
         return Customer(**customer)
 
-    def delete_customer(self, customer_id: str) -> bool:
+    async def delete_customer(self, customer_id: str) -> bool:
         """Delete customer"""
-        return self.storage.delete(customer_id)
-
-
-# Singleton instance
-cms_service = CMSService()
+        return await self.storage.adelete(customer_id)
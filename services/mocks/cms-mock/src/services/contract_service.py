@@ -1,19 +1,23 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime
 import uuid
 
-from ..utils.file_storage import FileStorage
+from ..utils.pagination import afetch_page, iter_ndjson
+from ..utils.sequence import create_sequence
+from ..utils.storage_factory import create_storage
 from ..models.schemas import Contract, ContractCreate, ContractUpdate, ContractStatus
 
 
 class ContractService:
     def __init__(self):
-        self.storage = FileStorage(data_dir="data", filename="contracts")
+        self.storage = create_storage(data_dir="data", filename="contracts")
         self._init_mock_data()
-        self.contract_counter = self._get_next_contract_number()
+        self.contract_numbers = create_sequence(
+            "data", "contract_number", self._get_next_contract_number
+        )
 
     def _get_next_contract_number(self) -> int:
-        """Get the next contract number"""
+        """Get the next contract number from existing contracts (new sequences)"""
         contracts = self.storage.get_all()
         if not contracts:
             return 5001
@@ -29,15 +33,13 @@ class ContractService:
                 pass
         return max_num + 1
 
-    def _generate_contract_number(self) -> str:
+    async def _generate_contract_number(self) -> str:
         """Generate contract number: CON-NNNN"""
-        contract_num = f"CON-{self.contract_counter:04d}"
-        self.contract_counter += 1
-        return contract_num
+        return f"CON-{await self.contract_numbers.anext():04d}"
 
     def _init_mock_data(self):
         """Initialize with sample contracts"""
-        if not self.storage.get_all():
+        if not self.storage.count():
             # Contract for Daraz
             contract1_id = str(uuid.uuid4())
             contract1 = {
@@ -79,10 +81,10 @@ class ContractService:
             self.storage.create(contract1_id, contract1)
             self.storage.create(contract2_id, contract2)
 
-    def create_contract(self, contract_data: ContractCreate) -> Contract:
+    async def create_contract(self, contract_data: ContractCreate) -> Contract:
         """Create a new contract"""
         contract_id = str(uuid.uuid4())
-        contract_number = self._generate_contract_number()
+        contract_number = await self._generate_contract_number()
 
         now = datetime.now().isoformat()
         contract_dict = {
@@ -94,23 +96,23 @@ class ContractService:
             "updated_at": now,
         }
 
-        self.storage.create(contract_id, contract_dict)
+        await self.storage.acreate(contract_id, contract_dict)
         return Contract(**contract_dict)
 
-    def get_contract(self, contract_id: str) -> Optional[Contract]:
+    async def get_contract(self, contract_id: str) -> Optional[Contract]:
         """Get a specific contract by ID"""
-        contract_data = self.storage.get(contract_id)
+        contract_data = await self.storage.aget(contract_id)
         if contract_data:
             return Contract(**contract_data)
         return None
 
-    def get_all_contracts(
+    async def get_all_contracts(
         self,
         client_id: Optional[str] = None,
         status: Optional[ContractStatus] = None,
     ) -> List[Contract]:
         """Get all contracts with optional filtering"""
-        contracts = self.storage.get_all()
+        contracts = await self.storage.aget_all()
         contract_list = [Contract(**contract) for contract in contracts.values()]
 
         if client_id:
@@ -120,37 +122,63 @@ class ContractService:
 
         return contract_list
 
-    def update_contract(
+    @staticmethod
+    def _filters(client_id: Optional[str], status: Optional[ContractStatus]) -> dict:
+        """Map the list filters onto record fields, dropping unset ones"""
+        filters = {"client_id": client_id, "status": status}
+        return {field: value for field, value in filters.items() if value}
+
+    async def get_contracts_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        client_id: Optional[str] = None,
+        status: Optional[ContractStatus] = None,
+    ) -> Tuple[List[Contract], Optional[str]]:
+        """Get one page of contracts, oldest first, and the next page's cursor"""
+        contracts, next_cursor = await afetch_page(
+            self.storage, limit, cursor, **self._filters(client_id, status)
+        )
+        return [Contract(**contract) for contract in contracts], next_cursor
+
+    def export_contracts(
+        self,
+        client_id: Optional[str] = None,
+        status: Optional[ContractStatus] = None,
+    ) -> Iterator[bytes]:
+        """Stream matching contracts as NDJSON lines, oldest first"""
+        return iter_ndjson(self.storage, **self._filters(client_id, status))
+
+    async def update_contract(
         self, contract_id: str, contract_update: ContractUpdate
     ) -> Optional[Contract]:
         """Update an existing contract"""
-        existing_contract = self.storage.get(contract_id)
-        if not existing_contract:
-            return None
-
         update_data = contract_update.model_dump(exclude_unset=True)
         update_data["updated_at"] = datetime.now().isoformat()
 
-        updated_contract = {**existing_contract, **update_data}
-        self.storage.update(contract_id, updated_contract)
+        updated_contract = await self.storage.aupdate_with(
+            contract_id, lambda existing: {**existing, **update_data}
+        )
+        if updated_contract is None:
+            return None
 
         return Contract(**updated_contract)
 
-    def delete_contract(self, contract_id: str) -> bool:
+    async def delete_contract(self, contract_id: str) -> bool:
         """Delete a contract"""
-        return self.storage.delete(contract_id)
+        return await self.storage.adelete(contract_id)
 
-    def activate_contract(self, contract_id: str) -> Optional[Contract]:
+    async def activate_contract(self, contract_id: str) -> Optional[Contract]:
         """Activate a contract"""
         update = ContractUpdate(status=ContractStatus.ACTIVE)
-        return self.update_contract(contract_id, update)
+        return await self.update_contract(contract_id, update)
 
-    def suspend_contract(self, contract_id: str) -> Optional[Contract]:
+    async def suspend_contract(self, contract_id: str) -> Optional[Contract]:
         """Suspend a contract"""
         update = ContractUpdate(status=ContractStatus.SUSPENDED)
-        return self.update_contract(contract_id, update)
+        return await self.update_contract(contract_id, update)
 
-    def terminate_contract(self, contract_id: str) -> Optional[Contract]:
+    async def terminate_contract(self, contract_id: str) -> Optional[Contract]:
         """Terminate a contract"""
         update = ContractUpdate(status=ContractStatus.TERMINATED)
-        return self.update_contract(contract_id, update)
+        return await self.update_contract(contract_id, update)
@@ -1,19 +1,28 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 import uuid
 
-from ..utils.file_storage import FileStorage
+from ..utils.pagination import afetch_page, iter_ndjson
+from ..utils.sequence import create_sequence
+from ..utils.storage_factory import create_storage
 from ..models.schemas import Order, OrderCreate, OrderUpdate, OrderStatus
 
 
 class OrderService:
+    # Fields dispatch dashboards filter on; kept as storage secondary indexes
+    INDEXED_FIELDS = ("status", "client_id", "priority", "assigned_driver_id")
+
     def __init__(self):
-        self.storage = FileStorage(data_dir="data", filename="orders")
+        self.storage = create_storage(
+            data_dir="data", filename="orders", indexes=self.INDEXED_FIELDS
+        )
         self._init_mock_data()
-        self.order_counter = self._get_next_order_number()
+        self.order_numbers = create_sequence(
+            "data", "order_number", self._get_next_order_number
+        )
 
     def _get_next_order_number(self) -> int:
-        """Get the next order number based on existing orders"""
+        """Get the next order number based on existing orders (new sequences)"""
         orders = self.storage.get_all()
         if not orders:
             return 1000
@@ -30,16 +39,19 @@ class OrderService:
                 pass
         return max_num + 1
 
-    def _generate_order_number(self) -> str:
+    async def _generate_order_number(self) -> str:
         """Generate a human-readable order number: ORD-YYYY-NNNN"""
+        return (await self._generate_order_numbers(1))[0]
+
+    async def _generate_order_numbers(self, count: int) -> List[str]:
+        """Reserve a contiguous block of order numbers"""
         year = datetime.now().year
-        order_num = f"ORD-{year}-{self.order_counter:04d}"
-        self.order_counter += 1
-        return order_num
+        start = await self.order_numbers.atake(count)
+        return [f"ORD-{year}-{num:04d}" for num in range(start, start + count)]
 
     def _init_mock_data(self):
         """Initialize with sample orders if storage is empty"""
-        if not self.storage.get_all():
+        if not self.storage.count():
             # Sample order 1
             order1_id = str(uuid.uuid4())
             order1 = {
@@ -121,14 +133,11 @@ class OrderService:
             self.storage.create(order1_id, order1)
             self.storage.create(order2_id, order2)
 
-    def create_order(self, order_data: OrderCreate) -> Order:
-        """Create a new order"""
-        order_id = str(uuid.uuid4())
-        order_number = self._generate_order_number()
-
-        now = datetime.now().isoformat()
-        order_dict = {
-            "id": order_id,
+    @staticmethod
+    def _new_order(order_data: OrderCreate, order_number: str, now: str) -> dict:
+        """Build the stored record for a newly created order"""
+        return {
+            "id": str(uuid.uuid4()),
             "order_number": order_number,
             **order_data.model_dump(),
             "status": OrderStatus.PENDING,
@@ -142,17 +151,49 @@ class OrderService:
             "updated_at": now,
         }
 
-        self.storage.create(order_id, order_dict)
+    async def create_order(self, order_data: OrderCreate) -> Order:
+        """Create a new order"""
+        order_dict = self._new_order(
+            order_data, await self._generate_order_number(), datetime.now().isoformat()
+        )
+        await self.storage.acreate(order_dict["id"], order_dict)
         return Order(**order_dict)
 
-    def get_order(self, order_id: str) -> Optional[Order]:
+    async def create_orders(self, orders_data: List[OrderCreate]) -> List[Order]:
+        """Create a batch of orders with one block of order numbers and one write"""
+        now = datetime.now().isoformat()
+        order_numbers = await self._generate_order_numbers(len(orders_data))
+        order_dicts = [
+            self._new_order(order_data, order_number, now)
+            for order_data, order_number in zip(orders_data, order_numbers)
+        ]
+        await self.storage.acreate_many({order["id"]: order for order in order_dicts})
+        return [Order(**order) for order in order_dicts]
+
+    async def get_order(self, order_id: str) -> Optional[Order]:
         """Get a specific order by ID"""
-        order_data = self.storage.get(order_id)
+        order_data = await self.storage.aget(order_id)
         if order_data:
             return Order(**order_data)
         return None
 
-    def get_all_orders(
+    @staticmethod
+    def _filters(
+        status: Optional[OrderStatus],
+        client_id: Optional[str],
+        priority: Optional[str],
+        driver_id: Optional[str],
+    ) -> dict:
+        """Map the list filters onto record fields, dropping unset ones"""
+        filters = {
+            "status": status,
+            "client_id": client_id,
+            "priority": priority,
+            "assigned_driver_id": driver_id,
+        }
+        return {field: value for field, value in filters.items() if value}
+
+    async def get_all_orders(
         self,
         status: Optional[OrderStatus] = None,
         client_id: Optional[str] = None,
@@ -160,53 +201,74 @@ class OrderService:
         driver_id: Optional[str] = None,
     ) -> List[Order]:
         """Get all orders with optional filtering"""
-        orders = self.storage.get_all()
-        order_list = [Order(**order) for order in orders.values()]
+        # Only matching records are loaded and validated
+        orders = await self.storage.afind(
+            **self._filters(status, client_id, priority, driver_id)
+        )
+        return [Order(**order) for order in orders.values()]
+
+    async def get_order_records_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[OrderStatus] = None,
+        client_id: Optional[str] = None,
+        priority: Optional[str] = None,
+        driver_id: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of stored order records, oldest first, and the next cursor
 
-        # Apply filters
-        if status:
-            order_list = [o for o in order_list if o.status == status]
-        if client_id:
-            order_list = [o for o in order_list if o.client_id == client_id]
-        if priority:
-            order_list = [o for o in order_list if o.priority == priority]
-        if driver_id:
-            order_list = [o for o in order_list if o.assigned_driver_id == driver_id]
+        Records are returned as stored, without building Order models.
+        """
+        orders, next_cursor = await afetch_page(
+            self.storage,
+            limit,
+            cursor,
+            **self._filters(status, client_id, priority, driver_id),
+        )
+        return orders, next_cursor
 
-        return order_list
+    def export_orders(
+        self,
+        status: Optional[OrderStatus] = None,
+        client_id: Optional[str] = None,
+        priority: Optional[str] = None,
+        driver_id: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        """Stream matching orders as NDJSON lines, oldest first"""
+        return iter_ndjson(
+            self.storage, **self._filters(status, client_id, priority, driver_id)
+        )
 
-    def update_order(self, order_id: str, order_update: OrderUpdate) -> Optional[Order]:
+    async def update_order(
+        self, order_id: str, order_update: OrderUpdate
+    ) -> Optional[Order]:
         """Update an existing order"""
-        existing_order = self.storage.get(order_id)
-        if not existing_order:
-            return None
-
         update_data = order_update.model_dump(exclude_unset=True)
         update_data["updated_at"] = datetime.now().isoformat()
 
-        updated_order = {**existing_order, **update_data}
-        self.storage.update(order_id, updated_order)
+        updated_order = await self.storage.aupdate_with(
+            order_id, lambda existing: {**existing, **update_data}
+        )
+        if updated_order is None:
+            return None
 
         return Order(**updated_order)
 
-    def delete_order(self, order_id: str) -> bool:
+    async def delete_order(self, order_id: str) -> bool:
         """Delete an order"""
-        return self.storage.delete(order_id)
-
-    def get_orders_by_status(self, status: OrderStatus) -> List[Order]:
-        """Get orders by status - helper method"""
-        return self.get_all_orders(status=status)
+        return await self.storage.adelete(order_id)
 
-    def mark_as_delivered(
+    async def mark_as_delivered(
         self, order_id: str, proof_of_delivery: dict
     ) -> Optional[Order]:
         """Mark order as delivered with proof"""
         update = OrderUpdate(
             status=OrderStatus.DELIVERED, proof_of_delivery=proof_of_delivery
         )
-        return self.update_order(order_id, update)
+        return await self.update_order(order_id, update)
 
-    def mark_as_failed(
+    async def mark_as_failed(
         self, order_id: str, failure_reason: str, failure_notes: Optional[str] = None
     ) -> Optional[Order]:
         """Mark order as failed with reason"""
@@ -215,9 +277,9 @@ class OrderService:
             failure_reason=failure_reason,
             failure_notes=failure_notes,
         )
-        return self.update_order(order_id, update)
+        return await self.update_order(order_id, update)
 
-    def assign_to_driver(
+    async def assign_to_driver(
         self, order_id: str, driver_id: str, route_id: Optional[str] = None
     ) -> Optional[Order]:
         """Assign order to a driver and optionally a route"""
@@ -226,4 +288,4 @@ class OrderService:
             assigned_route_id=route_id,
             status=OrderStatus.OUT_FOR_DELIVERY,
         )
-        return self.update_order(order_id, update)
+        return await self.update_order(order_id, update)
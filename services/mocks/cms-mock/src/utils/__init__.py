@@ -1,5 +1,21 @@
 """Utilities Module"""
 
-from .file_storage import FileStorage
+from .file_storage import DuplicateKeyError, FileStorage, StorageCorruptedError
+from .journal_storage import JournalStorage
+from .sqlite_storage import SQLiteStorage
+from .storage_factory import close_storages, create_storage
+from .sequence import SequenceAllocator, create_sequence
+from .service_registry import ServiceRegistry
 
-__all__ = ["FileStorage"]
+__all__ = [
+    "DuplicateKeyError",
+    "FileStorage",
+    "JournalStorage",
+    "SQLiteStorage",
+    "SequenceAllocator",
+    "ServiceRegistry",
+    "StorageCorruptedError",
+    "close_storages",
+    "create_storage",
+    "create_sequence",
+]
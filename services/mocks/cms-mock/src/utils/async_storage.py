@@ -0,0 +1,96 @@
+"""Async access to the storage backends
+
+Storage methods do blocking file and database I/O. Their ``a``-prefixed
+counterparts run them on one bounded thread pool shared by every storage
+object, so a slow write never stalls the event loop and a burst of requests
+cannot start more I/O threads than the pool allows.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, TypeVar
+
+from ..config.settings import settings
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def io_executor() -> ThreadPoolExecutor:
+    """Return the process-wide storage I/O pool, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.storage_io_threads,
+                thread_name_prefix="storage-io",
+            )
+        return _executor
+
+
+async def run_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call on the storage I/O pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor(), partial(func, *args, **kwargs))
+
+
+class AsyncStorageMixin:
+    """Awaitable versions of the storage methods, run on the I/O pool"""
+
+    async def aget_all(self) -> Dict[str, Any]:
+        return await run_io(self.get_all)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return await run_io(self.get, key)
+
+    async def aget_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        return await run_io(self.get_many, list(keys))
+
+    async def afind(self, **filters: Any) -> Dict[str, Any]:
+        return await run_io(self.find, **filters)
+
+    async def afind_many(self, field: str, values: Iterable[Any]) -> Dict[Any, Any]:
+        return await run_io(self.find_many, field, list(values))
+
+    async def afind_one(self, field: str, value: Any) -> Optional[Any]:
+        return await run_io(self.find_one, field, value)
+
+    async def aquery(
+        self, limit: int, after: Optional[Tuple[str, str]] = None, **filters: Any
+    ) -> Tuple[Dict[str, Any], Optional[Tuple[str, str]]]:
+        return await run_io(self.query, limit, after=after, **filters)
+
+    async def acount(self) -> int:
+        return await run_io(self.count)
+
+    async def aexists(self, key: str) -> bool:
+        return await run_io(self.exists, key)
+
+    async def acreate(self, key: str, value: Any) -> Any:
+        return await run_io(self.create, key, value)
+
+    async def acreate_many(self, records: Dict[str, Any]) -> Dict[str, Any]:
+        return await run_io(self.create_many, records)
+
+    async def aupdate(self, key: str, value: Any) -> Optional[Any]:
+        return await run_io(self.update, key, value)
+
+    async def aupdate_many(self, records: Dict[str, Any]) -> Dict[str, Any]:
+        return await run_io(self.update_many, records)
+
+    async def aupdate_with(
+        self, key: str, change: Callable[[Any], Optional[Any]]
+    ) -> Optional[Any]:
+        return await run_io(self.update_with, key, change)
+
+    async def aupdate_many_with(
+        self, keys: Iterable[str], change: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        return await run_io(self.update_many_with, list(keys), change)
+
+    async def adelete(self, key: str) -> bool:
+        return await run_io(self.delete, key)
@@ -1,11 +1,38 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from src.config.settings import settings
+from src.utils.pagination import NEXT_CURSOR_HEADER
+from src.utils.serialization import JSONResponse
+from src.utils.storage_factory import close_storages
+from src.utils.worker_lock import single_worker
 from src.routes.ros_routes import router as ros_router
 from src.routes.manifest_routes import router as manifest_router
+from src.routes.distance_routes import router as distance_router
+from src.routes.dispatch_routes import router as dispatch_router
+from src.dependencies import get_manifest_service, get_ros_service, registry
 from src.services.manifest_service import ManifestService
+from src.services.ros_service import ROSService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build and warm every service before serving, release them on shutdown"""
+    # Driver positions, unflushed breadcrumbs and the dispatch and delivery
+    # indexes live in each worker's memory, so workers would disagree
+    if settings.workers > 1:
+        raise ValueError("The ROS mock supports a single worker; set WORKERS=1")
+    # Also catches workers started another way, e.g. uvicorn --workers
+    with single_worker(os.path.join(os.path.dirname(__file__), "data")):
+        registry.start()
+        yield
+        registry.close()
+        close_storages()
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -13,6 +40,8 @@ app = FastAPI(
     description="Route Optimization System Mock Service for Swift Logistics - Modern cloud-based RESTful API",
     version="2.0.0",
     redoc_url=None,  # Disable ReDoc, use Swagger UI only
+    lifespan=lifespan,
+    default_response_class=JSONResponse,
 )
 
 # Configure CORS
@@ -22,11 +51,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
 app.include_router(ros_router)
 app.include_router(manifest_router)
+app.include_router(distance_router)
+app.include_router(dispatch_router)
 
 
 @app.get("/")
@@ -48,19 +80,25 @@ async def root():
 
 
 @app.get("/health")
-async def health():
-    """Health check endpoint with manifest counts"""
-    manifest_service = ManifestService()
-    
+async def health(
+    manifest_service: ManifestService = Depends(get_manifest_service),
+    ros_service: ROSService = Depends(get_ros_service),
+):
+    """Health check endpoint with manifest and route counts"""
     return {
         "status": "healthy",
         "service": settings.app_name,
         "version": "2.0.0",
-        "manifest_count": len(manifest_service.storage.get_all())
+        "manifest_count": await manifest_service.storage.acount(),
+        "route_count": await ros_service.storage.acount(),
     }
 
 
 if __name__ == "__main__":
     uvicorn.run(
-        "app:app", host=settings.host, port=settings.port, reload=settings.debug
+        "app:app",
+        host=settings.host,
+        port=settings.port,
+        reload=settings.debug,
+        workers=settings.workers,
     )
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -9,10 +9,51 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 3002
     debug: bool = True
+    workers: int = 1  # Uvicorn worker processes; the ROS mock supports only 1
 
     # CORS settings
     cors_origins: list = ["*"]
 
+    # Storage settings
+    storage_backend: str = "file"  # "file", "journal" or "sqlite"
+    storage_cache: bool = True  # Serve reads from memory, re-read on file change
+    storage_pretty_json: bool = False  # Indent data files for reading by hand
+    storage_fsync: str = "batched"  # "always", "batched" or "never"
+    storage_fsync_interval: float = 1.0  # Seconds between batched fsyncs
+    journal_compact_interval: float = 30.0  # Seconds between journal compactions
+    sqlite_filename: str = "ros.db"  # Database file in the data directory
+    sequence_block_size: int = 100  # Numbers a worker reserves per sequence write
+    storage_io_threads: int = 8  # Threads running blocking storage calls for routes
+    fast_reads: bool = True  # List endpoints send stored records without re-validating
+
+    # Route optimization settings
+    route_avg_speed_kmh: float = 30.0  # Average driving speed between stops
+    route_service_minutes: float = 5.0  # Time spent at each delivery stop
+    optimization_time_limit: float = 0.5  # Seconds of local search per request
+    distance_cache_size: int = 32  # Distance matrices kept in the LRU cache
+    distance_cache_max_points: int = 500  # Larger matrices are not cached
+    distance_matrix_max_points: int = 2000  # Largest matrix served or optimized
+
+    # Fleet planning settings
+    fleet_planning_time_limit: float = 10.0  # Seconds per plan-fleet request
+    fleet_planning_max_orders: int = 5000  # Most orders per plan-fleet request
+    fleet_planning_max_tour_stops: int = 500  # Most stops given to one vehicle
+
+    # Dispatch settings
+    spatial_cell_km: float = 1.0  # Grid cell size of the position indexes
+    gps_flush_interval: float = 5.0  # Seconds between breadcrumb flushes to disk
+
+    # ETA settings
+    shift_start: str = "08:00"  # Depot departure time on the delivery date
+    # Start hour -> average speed in km/h, until the next start hour
+    eta_speed_profile: Dict[int, float] = {
+        0: 40.0,
+        7: 20.0,
+        10: 30.0,
+        16: 20.0,
+        19: 35.0,
+    }
+
     class Config:
         env_file = ".env"
         case_sensitive = False
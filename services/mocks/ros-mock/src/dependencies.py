@@ -0,0 +1,39 @@
+"""Shared service instances and the FastAPI dependencies that provide them"""
+
+import os
+
+from .config.settings import settings
+from .services.dispatch_service import DispatchService
+from .services.manifest_service import ManifestService
+from .services.ros_service import ROSService
+from .utils.breadcrumbs import BreadcrumbStore
+from .utils.service_registry import ServiceRegistry
+
+registry = ServiceRegistry()
+
+
+def _build_dispatch_service() -> DispatchService:
+    return DispatchService(
+        registry.get(ManifestService),
+        BreadcrumbStore(
+            os.path.join(os.path.dirname(__file__), "../data/breadcrumbs"),
+            flush_interval=settings.gps_flush_interval,
+        ),
+    )
+
+
+registry.register(ManifestService, ManifestService)
+registry.register(ROSService, lambda: ROSService(registry.get(ManifestService)))
+registry.register(DispatchService, _build_dispatch_service)
+
+
+async def get_manifest_service() -> ManifestService:
+    return registry.get(ManifestService)
+
+
+async def get_ros_service() -> ROSService:
+    return registry.get(ROSService)
+
+
+async def get_dispatch_service() -> DispatchService:
+    return registry.get(DispatchService)
@@ -3,6 +3,8 @@ from typing import Optional, List
 from datetime import datetime
 from enum import Enum
 
+from ..config.settings import settings
+
 
 class RouteStatus(str, Enum):
     PLANNED = "planned"
@@ -50,7 +52,10 @@ class ManifestDelivery(BaseModel):
     coordinates: Optional[Coordinates] = None
     priority: str = "normal"  # low, normal, high, urgent
     special_instructions: Optional[str] = None
-    estimated_delivery_time: Optional[str] = None
+    time_window_start: Optional[str] = None  # Earliest arrival (ISO datetime)
+    time_window_end: Optional[str] = None  # Latest arrival (ISO datetime)
+    estimated_delivery_time: Optional[str] = None  # Computed from the sequence
+    late: bool = False  # Estimated arrival is after time_window_end
     status: DeliveryStatus = DeliveryStatus.PENDING
 
 
@@ -60,6 +65,27 @@ class ManifestCreate(BaseModel):
     route_id: str
     deliveries: List[ManifestDelivery]
     delivery_date: str
+    start_location: Optional[Coordinates] = None  # Depot the route departs from
+
+
+class DeliveryOutcome(BaseModel):
+    order_id: str
+    status: DeliveryStatus
+    occurred_at: Optional[datetime] = None  # Device time; defaults to receipt
+
+
+class DeliveryOutcomeBatch(BaseModel):
+    outcomes: List[DeliveryOutcome] = Field(..., min_length=1)
+
+
+class DeliveryEvent(BaseModel):
+    type: str = "delivery_status_changed"
+    manifest_id: str
+    order_id: str
+    previous_status: DeliveryStatus
+    status: DeliveryStatus
+    occurred_at: str
+    recorded_at: str
 
 
 class ManifestUpdate(BaseModel):
@@ -78,6 +104,7 @@ class DeliveryManifest(BaseModel):
     route_id: str
     deliveries: List[ManifestDelivery]
     delivery_date: str
+    start_location: Optional[Coordinates] = None
     status: ManifestStatus = ManifestStatus.DRAFT
     total_deliveries: int
     completed_deliveries: int = 0
@@ -101,15 +128,127 @@ class OptimizationRequest(BaseModel):
     priority_deliveries: Optional[List[str]] = []  # List of order IDs
 
 
+class DistanceMatrixRequest(BaseModel):
+    points: List[Coordinates] = Field(..., min_length=1)
+
+
+class DistanceMatrixResponse(BaseModel):
+    size: int
+    unit: str = "km"
+    matrix: List[List[float]]  # matrix[i][j] is the distance from point i to j
+
+
+# Dispatch Schemas
+class DriverPositionUpdate(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    available: bool = True  # Whether the driver can take new deliveries
+
+
+class DriverPosition(BaseModel):
+    driver_id: str
+    latitude: float
+    longitude: float
+    available: bool
+    updated_at: str
+
+
+class NearbyDriver(DriverPosition):
+    distance_km: float
+
+
+class NearbyDelivery(BaseModel):
+    manifest_id: str
+    order_id: str
+    latitude: float
+    longitude: float
+    distance_km: float
+
+
+class GpsPing(BaseModel):
+    driver_id: str
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    recorded_at: Optional[datetime] = None  # Device time; defaults to receipt
+
+
+class GpsPingBatch(BaseModel):
+    pings: List[GpsPing] = Field(..., min_length=1, max_length=10000)
+
+
+class GpsIngestResult(BaseModel):
+    accepted: int
+    drivers_updated: int  # Drivers whose latest position moved forward
+    stale: int  # Pings older than the driver's latest position (trail only)
+
+
+class TrailPoint(BaseModel):
+    latitude: float
+    longitude: float
+    recorded_at: str
+
+
+class DriverTrail(BaseModel):
+    driver_id: str
+    points: List[TrailPoint]
+
+
 class OptimizedRoute(BaseModel):
     route_id: str
     optimized_sequence: List[int]  # Indices of addresses in optimal order
     total_distance: float  # in kilometers
     estimated_duration: int  # in minutes
     waypoints: List[dict]
+    unassigned: List[int] = []  # Indices left out by capacity or duration limits
     created_at: str
 
 
+# Fleet Planning Request/Response
+class FleetOrder(ManifestDelivery):
+    coordinates: Coordinates  # Required for planning
+    demand: float = Field(1.0, ge=0)  # Load counted against vehicle capacity
+
+
+class FleetVehicle(BaseModel):
+    vehicle_id: str
+    driver_id: str
+    capacity: float = Field(..., gt=0)
+
+
+class FleetPlanRequest(BaseModel):
+    delivery_date: str  # YYYY-MM-DD
+    depot: Coordinates
+    depot_name: str = "Depot"
+    vehicles: List[FleetVehicle] = Field(..., min_length=1)
+    orders: List[FleetOrder] = Field(
+        ..., min_length=1, max_length=settings.fleet_planning_max_orders
+    )
+    time_limit: Optional[float] = Field(None, gt=0)  # Seconds, capped by settings
+    dry_run: bool = False  # Plan without saving routes or manifests
+
+
+class FleetRoutePlan(BaseModel):
+    vehicle_id: str
+    driver_id: str
+    route_id: Optional[str] = None
+    manifest_id: Optional[str] = None
+    manifest_number: Optional[str] = None
+    order_ids: List[str]  # In visiting order
+    load: float
+    capacity: float
+    distance: float  # in kilometers, depot to depot
+    estimated_duration: int  # in minutes
+
+
+class FleetPlan(BaseModel):
+    delivery_date: str
+    total_distance: float  # in kilometers
+    vehicles_used: int
+    routes: List[FleetRoutePlan]
+    unassigned: List[str] = []  # Order IDs that did not fit the fleet
+    planning_time: float  # in seconds
+
+
 class RouteCreate(BaseModel):
     origin: str
     destination: str
@@ -0,0 +1,123 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+
+from ..models.schemas import (
+    DriverPosition,
+    DriverPositionUpdate,
+    DriverTrail,
+    ErrorResponse,
+    GpsIngestResult,
+    GpsPingBatch,
+    NearbyDelivery,
+    NearbyDriver,
+)
+from ..services.dispatch_service import DispatchService
+from ..dependencies import get_dispatch_service
+
+router = APIRouter(prefix="/api/dispatch", tags=["Dispatch"])
+
+
+@router.put("/drivers/{driver_id}/position", response_model=DriverPosition)
+async def update_driver_position(
+    driver_id: str,
+    position: DriverPositionUpdate,
+    dispatch_service: DispatchService = Depends(get_dispatch_service),
+):
+    """Set a driver's current position and availability"""
+    return dispatch_service.update_driver_position(driver_id, position)
+
+
+@router.post("/positions", response_model=GpsIngestResult)
+async def ingest_positions(
+    batch: GpsPingBatch,
+    dispatch_service: DispatchService = Depends(get_dispatch_service),
+):
+    """Ingest a batch of GPS pings from driver devices"""
+    return dispatch_service.ingest_pings(batch.pings)
+
+
+@router.get(
+    "/drivers/{driver_id}/position",
+    response_model=DriverPosition,
+    responses={404: {"model": ErrorResponse}},
+)
+async def get_driver_position(
+    driver_id: str,
+    dispatch_service: DispatchService = Depends(get_dispatch_service),
+):
+    """Get a driver's latest known position"""
+    position = dispatch_service.get_driver_position(driver_id)
+    if position is None:
+        raise HTTPException(
+            status_code=404, detail=f"No position known for driver {driver_id}"
+        )
+    return position
+
+
+@router.get(
+    "/drivers/{driver_id}/trail",
+    response_model=DriverTrail,
+    responses={404: {"model": ErrorResponse}},
+)
+def get_driver_trail(
+    driver_id: str,
+    since: Optional[datetime] = Query(None, description="Earliest point time"),
+    until: Optional[datetime] = Query(None, description="Latest point time"),
+    limit: int = Query(1000, ge=1, le=10000, description="Most recent points"),
+    dispatch_service: DispatchService = Depends(get_dispatch_service),
+):
+    """Get a driver's breadcrumb trail, oldest first"""
+    trail = dispatch_service.driver_trail(driver_id, since, until, limit)
+    if trail is None:
+        raise HTTPException(
+            status_code=404, detail=f"No positions recorded for driver {driver_id}"
+        )
+    return trail
+
+
+@router.get("/drivers/nearest", response_model=List[NearbyDriver])
+async def get_nearest_drivers(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    k: int = Query(1, ge=1, le=100, description="Number of drivers"),
+    available_only: bool = Query(True, description="Skip unavailable drivers"),
+    max_km: Optional[float] = Query(None, gt=0, description="Search radius limit"),
+    dispatch_service: DispatchService = Depends(get_dispatch_service),
+):
+    """Find the drivers closest to a position, nearest first"""
+    return dispatch_service.nearest_drivers(
+        latitude, longitude, k=k, available_only=available_only, max_km=max_km
+    )
+
+
+@router.get(
+    "/drivers/{driver_id}/nearby-deliveries",
+    response_model=List[NearbyDelivery],
+    responses={404: {"model": ErrorResponse}},
+)
+async def get_deliveries_near_driver(
+    driver_id: str,
+    radius_km: float = Query(3.0, gt=0, le=100),
+    limit: int = Query(100, ge=1, le=1000),
+    dispatch_service: DispatchService = Depends(get_dispatch_service),
+):
+    """Find open deliveries around a driver's latest position"""
+    deliveries = dispatch_service.deliveries_near_driver(driver_id, radius_km, limit)
+    if deliveries is None:
+        raise HTTPException(
+            status_code=404, detail=f"No position known for driver {driver_id}"
+        )
+    return deliveries
+
+
+@router.get("/deliveries/nearby", response_model=List[NearbyDelivery])
+async def get_nearby_deliveries(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(3.0, gt=0, le=100),
+    limit: int = Query(100, ge=1, le=1000),
+    dispatch_service: DispatchService = Depends(get_dispatch_service),
+):
+    """Find open deliveries within a radius of a position, nearest first"""
+    return dispatch_service.nearby_deliveries(latitude, longitude, radius_km, limit)
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException, status
+
+from ..config.settings import settings
+from ..models.schemas import (
+    DistanceMatrixRequest,
+    DistanceMatrixResponse,
+    ErrorResponse,
+)
+from ..utils.distance import distance_matrix
+
+router = APIRouter(prefix="/api/distance", tags=["Distance"])
+
+
+@router.post(
+    "/matrix",
+    response_model=DistanceMatrixResponse,
+    responses={413: {"model": ErrorResponse}},
+)
+def get_distance_matrix(request: DistanceMatrixRequest):
+    """Haversine distances (km) between every pair of points"""
+    if len(request.points) > settings.distance_matrix_max_points:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.distance_matrix_max_points} points per matrix",
+        )
+    matrix = distance_matrix(request.points)
+    return DistanceMatrixResponse(
+        size=len(request.points), matrix=matrix.round(3).tolist()
+    )
@@ -1,21 +1,34 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 
 from ..models.schemas import (
+    DeliveryEvent,
     DeliveryManifest,
+    DeliveryOutcomeBatch,
     ManifestCreate,
     ManifestUpdate,
     ManifestStatus,
     DeliveryStatus,
 )
-from ..services.manifest_service import ManifestService
+from ..services.manifest_service import ManifestService, UnknownOrderError
+from ..utils.fast_reads import RecordListSerializer
+from ..utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    NDJSON_MEDIA_TYPE,
+    InvalidCursorError,
+)
+from ..dependencies import get_manifest_service
 
 router = APIRouter(prefix="/api/manifests", tags=["Delivery Manifests"])
-manifest_service = ManifestService()
+manifest_records = RecordListSerializer(DeliveryManifest)
 
 
 @router.get("/", response_model=List[DeliveryManifest])
 async def get_all_manifests(
+    response: Response,
     driver_id: Optional[str] = Query(None, description="Filter by driver ID"),
     status: Optional[ManifestStatus] = Query(
         None, description="Filter by manifest status"
@@ -23,17 +36,57 @@ async def get_all_manifests(
     delivery_date: Optional[str] = Query(
         None, description="Filter by delivery date (YYYY-MM-DD)"
     ),
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+    ),
+    cursor: Optional[str] = Query(
+        None, description=f"Cursor from the previous page's {NEXT_CURSOR_HEADER} header"
+    ),
+    manifest_service: ManifestService = Depends(get_manifest_service),
 ):
-    """Get all delivery manifests with optional filtering"""
-    return manifest_service.get_all_manifests(
-        driver_id=driver_id, status=status, delivery_date=delivery_date
+    """Get delivery manifests with optional filtering, one page at a time"""
+    try:
+        manifests, next_cursor = await manifest_service.get_manifest_records_page(
+            limit,
+            cursor,
+            driver_id=driver_id,
+            status=status,
+            delivery_date=delivery_date,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return manifest_records.respond(manifests, response)
+
+
+@router.get("/export")
+async def export_manifests(
+    driver_id: Optional[str] = Query(None, description="Filter by driver ID"),
+    status: Optional[ManifestStatus] = Query(
+        None, description="Filter by manifest status"
+    ),
+    delivery_date: Optional[str] = Query(
+        None, description="Filter by delivery date (YYYY-MM-DD)"
+    ),
+    manifest_service: ManifestService = Depends(get_manifest_service),
+):
+    """Stream all matching delivery manifests as newline-delimited JSON"""
+    return StreamingResponse(
+        manifest_service.export_manifests(
+            driver_id=driver_id, status=status, delivery_date=delivery_date
+        ),
+        media_type=NDJSON_MEDIA_TYPE,
     )
 
 
 @router.get("/{manifest_id}", response_model=DeliveryManifest)
-async def get_manifest(manifest_id: str):
+async def get_manifest(
+    manifest_id: str,
+    manifest_service: ManifestService = Depends(get_manifest_service),
+):
     """Get a specific delivery manifest by ID"""
-    manifest = manifest_service.get_manifest(manifest_id)
+    manifest = await manifest_service.get_manifest(manifest_id)
     if not manifest:
         raise HTTPException(
             status_code=404, detail=f"Manifest with ID {manifest_id} not found"
@@ -42,15 +95,22 @@ async def get_manifest(manifest_id: str):
 
 
 @router.post("/", response_model=DeliveryManifest, status_code=201)
-async def create_manifest(manifest: ManifestCreate):
+async def create_manifest(
+    manifest: ManifestCreate,
+    manifest_service: ManifestService = Depends(get_manifest_service),
+):
     """Create a new delivery manifest"""
-    return manifest_service.create_manifest(manifest)
+    return await manifest_service.create_manifest(manifest)
 
 
 @router.put("/{manifest_id}", response_model=DeliveryManifest)
-async def update_manifest(manifest_id: str, manifest: ManifestUpdate):
+async def update_manifest(
+    manifest_id: str,
+    manifest: ManifestUpdate,
+    manifest_service: ManifestService = Depends(get_manifest_service),
+):
     """Update an existing manifest"""
-    updated_manifest = manifest_service.update_manifest(manifest_id, manifest)
+    updated_manifest = await manifest_service.update_manifest(manifest_id, manifest)
     if not updated_manifest:
         raise HTTPException(
             status_code=404, detail=f"Manifest with ID {manifest_id} not found"
@@ -59,18 +119,24 @@ async def update_manifest(manifest_id: str, manifest: ManifestUpdate):
 
 
 @router.delete("/{manifest_id}", status_code=204)
-async def delete_manifest(manifest_id: str):
+async def delete_manifest(
+    manifest_id: str,
+    manifest_service: ManifestService = Depends(get_manifest_service),
+):
     """Delete a manifest"""
-    if not manifest_service.delete_manifest(manifest_id):
+    if not await manifest_service.delete_manifest(manifest_id):
         raise HTTPException(
             status_code=404, detail=f"Manifest with ID {manifest_id} not found"
         )
 
 
 @router.post("/{manifest_id}/assign", response_model=DeliveryManifest)
-async def assign_manifest(manifest_id: str):
+async def assign_manifest(
+    manifest_id: str,
+    manifest_service: ManifestService = Depends(get_manifest_service),
+):
     """Assign manifest to driver (move from draft to assigned)"""
-    manifest = manifest_service.assign_manifest(manifest_id)
+    manifest = await manifest_service.assign_manifest(manifest_id)
     if not manifest:
         raise HTTPException(
             status_code=404, detail=f"Manifest with ID {manifest_id} not found"
@@ -79,9 +145,12 @@ async def assign_manifest(manifest_id: str):
 
 
 @router.post("/{manifest_id}/start", response_model=DeliveryManifest)
-async def start_manifest(manifest_id: str):
+async def start_manifest(
+    manifest_id: str,
+    manifest_service: ManifestService = Depends(get_manifest_service),
+):
     """Start manifest delivery (driver begins route)"""
-    manifest = manifest_service.start_manifest(manifest_id)
+    manifest = await manifest_service.start_manifest(manifest_id)
     if not manifest:
         raise HTTPException(
             status_code=404, detail=f"Manifest with ID {manifest_id} not found"
@@ -90,9 +159,12 @@ async def start_manifest(manifest_id: str):
 
 
 @router.post("/{manifest_id}/complete", response_model=DeliveryManifest)
-async def complete_manifest(manifest_id: str):
+async def complete_manifest(
+    manifest_id: str,
+    manifest_service: ManifestService = Depends(get_manifest_service),
+):
     """Mark manifest as completed"""
-    manifest = manifest_service.complete_manifest(manifest_id)
+    manifest = await manifest_service.complete_manifest(manifest_id)
     if not manifest:
         raise HTTPException(
             status_code=404, detail=f"Manifest with ID {manifest_id} not found"
@@ -105,12 +177,45 @@ async def update_delivery_status(
     manifest_id: str,
     order_id: str,
     status: DeliveryStatus = Query(..., description="New delivery status"),
+    manifest_service: ManifestService = Depends(get_manifest_service),
 ):
     """Update the status of a specific delivery in the manifest"""
-    manifest = manifest_service.update_delivery_status(manifest_id, order_id, status)
+    manifest = await manifest_service.update_delivery_status(
+        manifest_id, order_id, status
+    )
     if not manifest:
         raise HTTPException(
             status_code=404,
             detail=f"Manifest with ID {manifest_id} or order {order_id} not found",
         )
     return manifest
+
+
+@router.post("/{manifest_id}/deliveries/outcomes", response_model=DeliveryManifest)
+async def apply_delivery_outcomes(
+    manifest_id: str,
+    batch: DeliveryOutcomeBatch,
+    manifest_service: ManifestService = Depends(get_manifest_service),
+):
+    """Apply many delivery status changes at once, e.g. after an offline sync"""
+    try:
+        manifest = await manifest_service.apply_delivery_outcomes(
+            manifest_id, batch.outcomes
+        )
+    except UnknownOrderError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if not manifest:
+        raise HTTPException(
+            status_code=404, detail=f"Manifest with ID {manifest_id} not found"
+        )
+    return manifest
+
+
+@router.get("/{manifest_id}/events", response_model=List[DeliveryEvent])
+async def get_delivery_events(
+    manifest_id: str,
+    order_id: Optional[str] = Query(None, description="Filter by order ID"),
+    manifest_service: ManifestService = Depends(get_manifest_service),
+):
+    """Get the delivery status changes recorded for a manifest, oldest first"""
+    return await manifest_service.get_delivery_events(manifest_id, order_id)
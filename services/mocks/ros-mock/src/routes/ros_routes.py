@@ -1,23 +1,50 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
-from ..models.schemas import Route, RouteCreate, RouteUpdate, ErrorResponse
-from ..services.ros_service import ros_service
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+from typing import List, Optional
+from ..models.schemas import (
+    ErrorResponse,
+    FleetPlan,
+    FleetPlanRequest,
+    OptimizationRequest,
+    OptimizedRoute,
+    Route,
+    RouteCreate,
+    RouteUpdate,
+)
+from ..services.ros_service import ROSService
+from ..dependencies import get_ros_service
 
 router = APIRouter(prefix="/api/routes", tags=["routes"])
 
 
 @router.get("/", response_model=List[Route])
-async def get_all_routes():
+async def get_all_routes(ros_service: ROSService = Depends(get_ros_service)):
     """Get all routes"""
-    return ros_service.get_all_routes()
+    return await ros_service.get_all_routes()
+
+
+@router.post(
+    "/plan-fleet",
+    response_model=FleetPlan,
+    responses={400: {"model": ErrorResponse}},
+)
+def plan_fleet(
+    request: FleetPlanRequest,
+    ros_service: ROSService = Depends(get_ros_service),
+):
+    """Plan one route per vehicle for the day's orders and draft their manifests"""
+    # Plain def: planning is CPU-bound, so it runs in the threadpool
+    try:
+        return ros_service.plan_fleet(request)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.get(
     "/{route_id}", response_model=Route, responses={404: {"model": ErrorResponse}}
 )
-async def get_route(route_id: str):
+async def get_route(route_id: str, ros_service: ROSService = Depends(get_ros_service)):
     """Get route by ID"""
-    route = ros_service.get_route(route_id)
+    route = await ros_service.get_route(route_id)
     if not route:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -27,17 +54,24 @@ async def get_route(route_id: str):
 
 
 @router.post("/", response_model=Route, status_code=status.HTTP_201_CREATED)
-async def create_route(route: RouteCreate):
+async def create_route(
+    route: RouteCreate,
+    ros_service: ROSService = Depends(get_ros_service),
+):
     """Create new route"""
-    return ros_service.create_route(route)
+    return await ros_service.create_route(route)
 
 
 @router.put(
     "/{route_id}", response_model=Route, responses={404: {"model": ErrorResponse}}
 )
-async def update_route(route_id: str, route: RouteUpdate):
+async def update_route(
+    route_id: str,
+    route: RouteUpdate,
+    ros_service: ROSService = Depends(get_ros_service),
+):
     """Update existing route"""
-    updated_route = ros_service.update_route(route_id, route)
+    updated_route = await ros_service.update_route(route_id, route)
     if not updated_route:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -47,9 +81,12 @@ async def update_route(route_id: str, route: RouteUpdate):
 
 
 @router.delete("/{route_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_route(route_id: str):
+async def delete_route(
+    route_id: str,
+    ros_service: ROSService = Depends(get_ros_service),
+):
     """Delete route"""
-    success = ros_service.delete_route(route_id)
+    success = await ros_service.delete_route(route_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -60,12 +97,21 @@ async def delete_route(route_id: str):
 
 @router.post(
     "/{route_id}/optimize",
-    response_model=Route,
-    responses={404: {"model": ErrorResponse}},
+    response_model=OptimizedRoute,
+    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
 )
-async def optimize_route(route_id: str):
-    """Optimize route for efficiency"""
-    optimized_route = ros_service.optimize_route(route_id)
+def optimize_route(
+    route_id: str,
+    request: Optional[OptimizationRequest] = Body(None),
+    ros_service: ROSService = Depends(get_ros_service),
+):
+    """Sequence the route's stops (or the given addresses) for the shortest drive"""
+    # Plain def: optimization is CPU-bound, so it runs in the threadpool
+    # instead of blocking the event loop
+    try:
+        optimized_route = ros_service.optimize_route(route_id, request)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     if not optimized_route:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -73,12 +119,3 @@ async def optimize_route(route_id: str):
         )
     return optimized_route
 
-
-@router.get("/health", tags=["health"])
-async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "ROS Mock Service",
-        "total_routes": len(ros_service.storage.get_all()),
-    }
@@ -1,5 +1,5 @@
 """ROS Service Module"""
 
-from .ros_service import ros_service
+from .ros_service import ROSService
 
-__all__ = ["ros_service"]
+__all__ = ["ROSService"]
@@ -0,0 +1,194 @@
+import math
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from ..config.settings import settings
+from ..models.schemas import (
+    DriverPosition,
+    DriverPositionUpdate,
+    DriverTrail,
+    GpsIngestResult,
+    GpsPing,
+    NearbyDelivery,
+    NearbyDriver,
+    TrailPoint,
+)
+from ..utils.breadcrumbs import BreadcrumbStore
+from ..utils.spatial_index import GridIndex
+from .manifest_service import ManifestService
+
+
+class DispatchService:
+    """Nearest-driver and nearby-delivery lookups over in-memory grid indexes
+
+    Only the latest position of each driver is kept in memory; every
+    reported position is also appended to the driver's breadcrumb trail.
+    Open deliveries are indexed by the manifest service as manifests change.
+    """
+
+    def __init__(self, manifests: ManifestService, breadcrumbs: BreadcrumbStore):
+        self.manifests = manifests
+        self.breadcrumbs = breadcrumbs
+        self.driver_index = GridIndex(settings.spatial_cell_km)
+        # Available drivers only, so nearest-available lookups need no filter
+        self.available_index = GridIndex(settings.spatial_cell_km)
+        self._drivers: Dict[str, DriverPosition] = {}
+        self._latest: Dict[str, float] = {}  # Epoch time of each latest position
+
+    def close(self) -> None:
+        """Flush buffered breadcrumbs and stop the background flusher"""
+        self.breadcrumbs.close()
+
+    def _set_position(
+        self,
+        driver_id: str,
+        latitude: float,
+        longitude: float,
+        timestamp: float,
+        available: Optional[bool] = None,
+    ) -> DriverPosition:
+        """Replace a driver's latest position, keeping availability by default"""
+        if available is None:
+            current = self._drivers.get(driver_id)
+            available = current.available if current is not None else True
+        driver = DriverPosition(
+            driver_id=driver_id,
+            latitude=latitude,
+            longitude=longitude,
+            available=available,
+            updated_at=datetime.fromtimestamp(timestamp).isoformat(),
+        )
+        self._drivers[driver_id] = driver
+        self._latest[driver_id] = timestamp
+        self.driver_index.upsert(driver_id, latitude, longitude)
+        if available:
+            self.available_index.upsert(driver_id, latitude, longitude)
+        else:
+            self.available_index.remove(driver_id)
+        return driver
+
+    def update_driver_position(
+        self, driver_id: str, position: DriverPositionUpdate
+    ) -> DriverPosition:
+        """Record a driver's latest position and availability"""
+        now = time.time()
+        self.breadcrumbs.append(driver_id, now, position.latitude, position.longitude)
+        return self._set_position(
+            driver_id, position.latitude, position.longitude, now, position.available
+        )
+
+    def ingest_pings(self, pings: List[GpsPing]) -> GpsIngestResult:
+        """
+        Record a batch of GPS pings from driver devices
+
+        Every ping goes to the breadcrumb trail. A driver's latest position
+        only moves to the newest ping in the batch, and only if that is not
+        older than the position already held, so late deliveries from a
+        device cannot move a driver backwards.
+        """
+        now = time.time()
+        records = []
+        newest: Dict[str, Tuple[float, GpsPing]] = {}
+        latest = self._latest
+        stale = 0
+        for ping in pings:
+            timestamp = (
+                ping.recorded_at.timestamp() if ping.recorded_at is not None else now
+            )
+            driver_id = ping.driver_id
+            records.append((driver_id, timestamp, ping.latitude, ping.longitude))
+            if timestamp < latest.get(driver_id, -math.inf):
+                stale += 1
+                continue
+            best = newest.get(driver_id)
+            if best is None or timestamp >= best[0]:
+                newest[driver_id] = (timestamp, ping)
+        self.breadcrumbs.append_many(records)
+
+        for driver_id, (timestamp, ping) in newest.items():
+            self._set_position(driver_id, ping.latitude, ping.longitude, timestamp)
+        return GpsIngestResult(
+            accepted=len(records), drivers_updated=len(newest), stale=stale
+        )
+
+    def get_driver_position(self, driver_id: str) -> Optional[DriverPosition]:
+        """Get a driver's latest known position"""
+        return self._drivers.get(driver_id)
+
+    def driver_trail(
+        self,
+        driver_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> Optional[DriverTrail]:
+        """Get a driver's breadcrumb trail, oldest first; None if never seen"""
+        points = self.breadcrumbs.trail(
+            driver_id,
+            since=since.timestamp() if since is not None else None,
+            until=until.timestamp() if until is not None else None,
+            limit=limit,
+        )
+        if not len(points) and driver_id not in self._drivers:
+            return None
+        return DriverTrail(
+            driver_id=driver_id,
+            points=[
+                TrailPoint(
+                    latitude=latitude,
+                    longitude=longitude,
+                    recorded_at=datetime.fromtimestamp(timestamp).isoformat(),
+                )
+                for timestamp, latitude, longitude in points.tolist()
+            ],
+        )
+
+    def nearest_drivers(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 1,
+        available_only: bool = True,
+        max_km: Optional[float] = None,
+    ) -> List[NearbyDriver]:
+        """Find the k drivers closest to a position"""
+        index = self.available_index if available_only else self.driver_index
+        found = index.nearest(latitude, longitude, k=k, max_km=max_km)
+        return [
+            NearbyDriver(**self._drivers[driver_id].model_dump(), distance_km=distance)
+            for driver_id, distance in found
+        ]
+
+    def nearby_deliveries(
+        self, latitude: float, longitude: float, radius_km: float, limit: int
+    ) -> List[NearbyDelivery]:
+        """Find open deliveries within radius_km of a position, nearest first"""
+        index = self.manifests.delivery_index
+        results = []
+        for key, distance in index.within(latitude, longitude, radius_km, limit=limit):
+            position = index.get(key)
+            if position is None:
+                continue
+            manifest_id, order_id = key.split("/", 1)
+            results.append(
+                NearbyDelivery(
+                    manifest_id=manifest_id,
+                    order_id=order_id,
+                    latitude=position[0],
+                    longitude=position[1],
+                    distance_km=distance,
+                )
+            )
+        return results
+
+    def deliveries_near_driver(
+        self, driver_id: str, radius_km: float, limit: int
+    ) -> Optional[List[NearbyDelivery]]:
+        """Find open deliveries around a driver's latest position"""
+        driver = self._drivers.get(driver_id)
+        if driver is None:
+            return None
+        return self.nearby_deliveries(
+            driver.latitude, driver.longitude, radius_km, limit
+        )
@@ -1,24 +1,98 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 import uuid
 
-from ..utils.file_storage import FileStorage
+from ..config.settings import settings
+from ..utils.async_storage import run_io
+from ..utils.eta import FINISHED_STATUSES, coordinates_point, estimate_arrivals
+from ..utils.event_log import EventLog
+from ..utils.pagination import afetch_page, iter_ndjson
+from ..utils.sequence import create_sequence
+from ..utils.spatial_index import GridIndex
+from ..utils.storage_factory import create_storage
 from ..models.schemas import (
+    DeliveryEvent,
     DeliveryManifest,
+    DeliveryOutcome,
     ManifestCreate,
     ManifestUpdate,
     ManifestStatus,
 )
 
+# Manifest counter kept for each delivery status
+STATUS_COUNTERS = {
+    "delivered": "completed_deliveries",
+    "failed": "failed_deliveries",
+}
+
+
+class UnknownOrderError(KeyError):
+    """Raised when outcomes name orders that are not on the manifest"""
+
+    def __init__(self, order_ids: List[str]):
+        super().__init__(order_ids)
+        self.order_ids = order_ids
+
+    def __str__(self) -> str:
+        return f"Orders not on manifest: {', '.join(self.order_ids)}"
+
 
 class ManifestService:
     def __init__(self):
-        self.storage = FileStorage(data_dir="data", filename="manifests")
+        self.storage = create_storage(data_dir="data", filename="manifests")
+        self.events = EventLog(
+            data_dir="data", filename="manifest_events", index_field="manifest_id"
+        )
+        # Position of each order in its manifest's deliveries, built lazily
+        self._order_positions: Dict[str, Dict[str, int]] = {}
         self._init_mock_data()
-        self.manifest_counter = self._get_next_manifest_number()
+        self.manifest_numbers = create_sequence(
+            "data", "manifest_number", self._get_next_manifest_number
+        )
+        # Open deliveries by position, for dispatch lookups
+        self.delivery_index = GridIndex(settings.spatial_cell_km)
+        for manifest in self.storage.get_all().values():
+            self._index_deliveries(manifest)
+
+    @staticmethod
+    def delivery_key(manifest_id: str, order_id: str) -> str:
+        """Delivery index key; split on the first "/" to get both IDs back"""
+        return f"{manifest_id}/{order_id}"
+
+    def _index_delivery(self, manifest: dict, delivery: dict) -> None:
+        """Add an open delivery to the delivery index, or drop a closed one"""
+        active = manifest.get("status") not in (
+            ManifestStatus.COMPLETED,
+            ManifestStatus.CANCELLED,
+        )
+        key = self.delivery_key(manifest["id"], delivery.get("order_id"))
+        point = coordinates_point(delivery.get("coordinates"))
+        if active and point and delivery.get("status") not in FINISHED_STATUSES:
+            self.delivery_index.upsert(key, *point)
+        else:
+            self.delivery_index.remove(key)
+
+    def _index_deliveries(self, manifest: dict) -> None:
+        """Sync the delivery index with every delivery of a manifest"""
+        for delivery in manifest.get("deliveries", []):
+            self._index_delivery(manifest, delivery)
+
+    def _delivery_position(self, manifest: dict, order_id: str) -> Optional[int]:
+        """Index of an order in the manifest's deliveries, or None"""
+        deliveries = manifest.get("deliveries", [])
+        positions = self._order_positions.get(manifest["id"])
+        index = positions.get(order_id) if positions is not None else None
+        if index is None or index >= len(deliveries) or (
+            deliveries[index].get("order_id") != order_id
+        ):
+            positions = self._order_positions[manifest["id"]] = {
+                delivery.get("order_id"): i for i, delivery in enumerate(deliveries)
+            }
+            index = positions.get(order_id)
+        return index
 
     def _get_next_manifest_number(self) -> int:
-        """Get the next manifest number"""
+        """Get the next manifest number from existing manifests (new sequences)"""
         manifests = self.storage.get_all()
         if not manifests:
             return 2001
@@ -34,16 +108,14 @@ class ManifestService:
                 pass
         return max_num + 1
 
-    def _generate_manifest_number(self) -> str:
-        """Generate manifest number: MAN-YYYY-NNNN"""
-        year = datetime.now().year
-        manifest_num = f"MAN-{year}-{self.manifest_counter:04d}"
-        self.manifest_counter += 1
-        return manifest_num
+    @staticmethod
+    def _format_manifest_number(number: int) -> str:
+        """Format a manifest number: MAN-YYYY-NNNN"""
+        return f"MAN-{datetime.now().year}-{number:04d}"
 
     def _init_mock_data(self):
         """Initialize with sample delivery manifests"""
-        if not self.storage.get_all():
+        if not self.storage.count():
             # Manifest 1 - Today's deliveries
             manifest1_id = str(uuid.uuid4())
             manifest1 = {
@@ -93,17 +165,40 @@ class ManifestService:
                 "updated_at": datetime.now().isoformat(),
             }
 
+            self._estimate_arrivals(manifest1)
+            # Stored in model shape: list endpoints send stored records as is
+            manifest1 = DeliveryManifest(**manifest1).model_dump(mode="json")
             self.storage.create(manifest1_id, manifest1)
 
-    def create_manifest(self, manifest_data: ManifestCreate) -> DeliveryManifest:
-        """Create a new delivery manifest"""
-        manifest_id = str(uuid.uuid4())
-        manifest_number = self._generate_manifest_number()
+    @staticmethod
+    def _departure(manifest: dict) -> Optional[datetime]:
+        """When the vehicle leaves the depot: actual start, else shift start"""
+        try:
+            if manifest.get("started_at"):
+                return datetime.fromisoformat(manifest["started_at"])
+            return datetime.fromisoformat(
+                f"{manifest['delivery_date']}T{settings.shift_start}"
+            )
+        except ValueError:
+            return None
 
-        now = datetime.now().isoformat()
-        manifest_dict = {
-            "id": manifest_id,
-            "manifest_number": manifest_number,
+    def _estimate_arrivals(self, manifest: dict) -> None:
+        """Recompute every stop's ETA; manifests without a valid date keep theirs"""
+        departure = self._departure(manifest)
+        if departure is not None:
+            estimate_arrivals(
+                manifest["deliveries"],
+                departure,
+                origin=coordinates_point(manifest.get("start_location")),
+            )
+
+    def _new_manifest(
+        self, manifest_data: ManifestCreate, now: str, manifest_number: int
+    ) -> dict:
+        """Build the stored record for a new draft manifest"""
+        manifest = {
+            "id": str(uuid.uuid4()),
+            "manifest_number": self._format_manifest_number(manifest_number),
             **manifest_data.model_dump(),
             "status": ManifestStatus.DRAFT,
             "total_deliveries": len(manifest_data.deliveries),
@@ -115,25 +210,50 @@ class ManifestService:
             "created_at": now,
             "updated_at": now,
         }
+        self._estimate_arrivals(manifest)
+        # Stored in model shape: list endpoints send stored records as is
+        return DeliveryManifest(**manifest).model_dump(mode="json")
 
-        self.storage.create(manifest_id, manifest_dict)
+    async def create_manifest(self, manifest_data: ManifestCreate) -> DeliveryManifest:
+        """Create a new delivery manifest"""
+        manifest_dict = self._new_manifest(
+            manifest_data,
+            datetime.now().isoformat(),
+            await self.manifest_numbers.anext(),
+        )
+        await self.storage.acreate(manifest_dict["id"], manifest_dict)
+        self._index_deliveries(manifest_dict)
         return DeliveryManifest(**manifest_dict)
 
-    def get_manifest(self, manifest_id: str) -> Optional[DeliveryManifest]:
+    def create_manifests(
+        self, manifests_data: List[ManifestCreate]
+    ) -> List[DeliveryManifest]:
+        """Create a batch of manifests with a single storage write"""
+        now = datetime.now().isoformat()
+        start = self.manifest_numbers.take(len(manifests_data))
+        manifest_dicts = [
+            self._new_manifest(m, now, start + i) for i, m in enumerate(manifests_data)
+        ]
+        self.storage.create_many({m["id"]: m for m in manifest_dicts})
+        for manifest_dict in manifest_dicts:
+            self._index_deliveries(manifest_dict)
+        return [DeliveryManifest(**m) for m in manifest_dicts]
+
+    async def get_manifest(self, manifest_id: str) -> Optional[DeliveryManifest]:
         """Get a specific manifest by ID"""
-        manifest_data = self.storage.get(manifest_id)
+        manifest_data = await self.storage.aget(manifest_id)
         if manifest_data:
             return DeliveryManifest(**manifest_data)
         return None
 
-    def get_all_manifests(
+    async def get_all_manifests(
         self,
         driver_id: Optional[str] = None,
         status: Optional[ManifestStatus] = None,
         delivery_date: Optional[str] = None,
     ) -> List[DeliveryManifest]:
         """Get all manifests with optional filtering"""
-        manifests = self.storage.get_all()
+        manifests = await self.storage.aget_all()
         manifest_list = [DeliveryManifest(**m) for m in manifests.values()]
 
         if driver_id:
@@ -147,66 +267,230 @@ class ManifestService:
 
         return manifest_list
 
-    def update_manifest(
+    @staticmethod
+    def _filters(
+        driver_id: Optional[str],
+        status: Optional[ManifestStatus],
+        delivery_date: Optional[str],
+    ) -> dict:
+        """Map the list filters onto record fields, dropping unset ones"""
+        filters = {
+            "driver_id": driver_id,
+            "status": status,
+            "delivery_date": delivery_date,
+        }
+        return {field: value for field, value in filters.items() if value}
+
+    async def get_manifest_records_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        driver_id: Optional[str] = None,
+        status: Optional[ManifestStatus] = None,
+        delivery_date: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of stored manifest records, oldest first, and the next cursor
+
+        Records are returned as stored, without building DeliveryManifest models.
+        """
+        manifests, next_cursor = await afetch_page(
+            self.storage,
+            limit,
+            cursor,
+            **self._filters(driver_id, status, delivery_date),
+        )
+        return manifests, next_cursor
+
+    def export_manifests(
+        self,
+        driver_id: Optional[str] = None,
+        status: Optional[ManifestStatus] = None,
+        delivery_date: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        """Stream matching manifests as NDJSON lines, oldest first"""
+        return iter_ndjson(
+            self.storage, **self._filters(driver_id, status, delivery_date)
+        )
+
+    async def update_manifest(
         self, manifest_id: str, manifest_update: ManifestUpdate
     ) -> Optional[DeliveryManifest]:
         """Update a manifest"""
-        existing_manifest = self.storage.get(manifest_id)
-        if not existing_manifest:
-            return None
-
         update_data = manifest_update.model_dump(exclude_unset=True)
         update_data["updated_at"] = datetime.now().isoformat()
 
-        updated_manifest = {**existing_manifest, **update_data}
-        self.storage.update(manifest_id, updated_manifest)
+        updated_manifest = await self.storage.aupdate_with(
+            manifest_id, lambda existing: {**existing, **update_data}
+        )
+        if updated_manifest is None:
+            return None
+        if "status" in update_data:
+            self._index_deliveries(updated_manifest)
 
         return DeliveryManifest(**updated_manifest)
 
-    def delete_manifest(self, manifest_id: str) -> bool:
+    async def delete_manifest(self, manifest_id: str) -> bool:
         """Delete a manifest"""
-        return self.storage.delete(manifest_id)
+        manifest = await self.storage.aget(manifest_id)
+        if manifest:
+            for delivery in manifest.get("deliveries", []):
+                self.delivery_index.remove(
+                    self.delivery_key(manifest_id, delivery.get("order_id"))
+                )
+        self._order_positions.pop(manifest_id, None)
+        return await self.storage.adelete(manifest_id)
 
-    def assign_manifest(self, manifest_id: str) -> Optional[DeliveryManifest]:
+    async def assign_manifest(self, manifest_id: str) -> Optional[DeliveryManifest]:
         """Assign manifest to driver"""
         update = ManifestUpdate(status=ManifestStatus.ASSIGNED)
-        return self.update_manifest(manifest_id, update)
+        return await self.update_manifest(manifest_id, update)
 
-    def start_manifest(self, manifest_id: str) -> Optional[DeliveryManifest]:
+    async def start_manifest(self, manifest_id: str) -> Optional[DeliveryManifest]:
         """Start manifest delivery"""
         update = ManifestUpdate(
             status=ManifestStatus.IN_PROGRESS, started_at=datetime.now().isoformat()
         )
-        return self.update_manifest(manifest_id, update)
+        return await self.update_manifest(manifest_id, update)
 
-    def complete_manifest(self, manifest_id: str) -> Optional[DeliveryManifest]:
+    async def complete_manifest(self, manifest_id: str) -> Optional[DeliveryManifest]:
         """Complete manifest"""
         update = ManifestUpdate(
             status=ManifestStatus.COMPLETED, completed_at=datetime.now().isoformat()
         )
-        return self.update_manifest(manifest_id, update)
+        return await self.update_manifest(manifest_id, update)
 
-    def update_delivery_status(
-        self, manifest_id: str, order_id: str, delivery_status: str
-    ) -> Optional[DeliveryManifest]:
-        """Update status of a specific delivery in the manifest"""
-        manifest = self.storage.get(manifest_id)
-        if not manifest:
+    @staticmethod
+    def _apply_outcome(
+        manifest: dict, delivery: dict, status: str, occurred_at: str, now: str
+    ) -> Optional[dict]:
+        """Set a delivery's status, adjust the counters and return the event
+
+        Returns None when the delivery already has that status.
+        """
+        previous = delivery.get("status", "pending")
+        if previous == status:
             return None
+        delivery["status"] = status
+        if previous in STATUS_COUNTERS:
+            counter = STATUS_COUNTERS[previous]
+            manifest[counter] = manifest.get(counter, 0) - 1
+        if status in STATUS_COUNTERS:
+            counter = STATUS_COUNTERS[status]
+            manifest[counter] = manifest.get(counter, 0) + 1
+        return {
+            "type": "delivery_status_changed",
+            "manifest_id": manifest["id"],
+            "order_id": delivery.get("order_id"),
+            "previous_status": previous,
+            "status": status,
+            "occurred_at": occurred_at,
+            "recorded_at": now,
+        }
 
-        deliveries = manifest.get("deliveries", [])
-        for delivery in deliveries:
-            if delivery.get("order_id") == order_id:
-                delivery["status"] = delivery_status
+    async def apply_delivery_outcomes(
+        self, manifest_id: str, outcomes: List[DeliveryOutcome]
+    ) -> Optional[DeliveryManifest]:
+        """
+        Apply a batch of delivery status changes with one storage write
+
+        Outcomes are applied in the order they occurred, so a driver syncing
+        after being offline ends up with the latest status of each stop.
+        Outcomes that do not change a delivery's status are skipped, which
+        makes re-sending a batch harmless.
+
+        Args:
+            manifest_id: Manifest the deliveries belong to
+            outcomes: Status changes, with the device time they happened at
+
+        Returns:
+            The updated manifest, or None if it does not exist
+
+        Raises:
+            UnknownOrderError: If an outcome names an order that is not on the
+                manifest; nothing is applied
+        """
+        now = datetime.now()
+        # Stored times are local and naive; convert aware device times
+        times = [
+            o.occurred_at.astimezone().replace(tzinfo=None)
+            if o.occurred_at is not None and o.occurred_at.tzinfo is not None
+            else o.occurred_at or now
+            for o in outcomes
+        ]
+        events: List[dict] = []
+        positions: List[Optional[int]] = []
+
+        def apply(manifest: dict) -> Optional[dict]:
+            positions[:] = [
+                self._delivery_position(manifest, o.order_id) for o in outcomes
+            ]
+            unknown = [o.order_id for o, i in zip(outcomes, positions) if i is None]
+            if unknown:
+                raise UnknownOrderError(unknown)
+
+            ordered = sorted(zip(times, outcomes, positions), key=lambda item: item[0])
+            deliveries = manifest["deliveries"]
+            last_finished = None
+            for occurred_at, outcome, index in ordered:
+                event = self._apply_outcome(
+                    manifest,
+                    deliveries[index],
+                    outcome.status.value,
+                    occurred_at.isoformat(),
+                    now.isoformat(),
+                )
+                if event is None:
+                    continue
+                events.append(event)
+                if outcome.status.value in FINISHED_STATUSES:
+                    last_finished = max(index, last_finished or 0)
 
-        # Update counters
-        completed = sum(1 for d in deliveries if d.get("status") == "delivered")
-        failed = sum(1 for d in deliveries if d.get("status") == "failed")
+            if not events:
+                return None
 
-        manifest["deliveries"] = deliveries
-        manifest["completed_deliveries"] = completed
-        manifest["failed_deliveries"] = failed
-        manifest["updated_at"] = datetime.now().isoformat()
+            # Re-estimate only the stops after the furthest one finished, from now
+            if last_finished is not None:
+                estimate_arrivals(
+                    deliveries,
+                    now,
+                    origin=coordinates_point(
+                        deliveries[last_finished].get("coordinates")
+                    ),
+                    start_index=last_finished + 1,
+                )
+            manifest["updated_at"] = now.isoformat()
+            return manifest
 
-        self.storage.update(manifest_id, manifest)
+        # Applied under the storage write lock, so concurrent outcomes for
+        # other stops of the same manifest are not lost
+        manifest = await self.storage.aupdate_with(manifest_id, apply)
+        if manifest is None:
+            return None
+
+        if events:
+            await run_io(self.events.append, events)
+            for index in set(positions):
+                self._index_delivery(manifest, manifest["deliveries"][index])
         return DeliveryManifest(**manifest)
+
+    async def update_delivery_status(
+        self, manifest_id: str, order_id: str, delivery_status: str
+    ) -> Optional[DeliveryManifest]:
+        """Update status of a specific delivery in the manifest"""
+        try:
+            return await self.apply_delivery_outcomes(
+                manifest_id,
+                [DeliveryOutcome(order_id=order_id, status=delivery_status)],
+            )
+        except UnknownOrderError:
+            return None
+
+    async def get_delivery_events(
+        self, manifest_id: str, order_id: Optional[str] = None
+    ) -> List[DeliveryEvent]:
+        """Get a manifest's delivery status changes, oldest first"""
+        filters = {"manifest_id": manifest_id}
+        if order_id:
+            filters["order_id"] = order_id
+        events = await run_io(list, self.events.read(**filters))
+        return [DeliveryEvent(**event) for event in events]
@@ -1,25 +1,45 @@
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import time
 import uuid
 import os
-from ..models.schemas import Route, RouteCreate, RouteUpdate, RouteStatus
+from ..config.settings import settings
+from ..models.schemas import (
+    FleetPlan,
+    FleetPlanRequest,
+    FleetRoutePlan,
+    ManifestCreate,
+    OptimizationRequest,
+    OptimizedRoute,
+    Route,
+    RouteCreate,
+    RouteUpdate,
+    RouteStatus,
+)
+from ..utils.distance import distance_matrix
+from ..utils.eta import estimate_arrivals, speed_profile
+from ..utils.fleet_planner import FleetPlanner
 from ..utils.helpers import calculate_distance, calculate_duration
-from ..utils.file_storage import FileStorage
+from ..utils.route_optimizer import optimize_stops, trim_to_duration
+from ..utils.storage_factory import create_storage
+from .manifest_service import ManifestService
 
 
 class ROSService:
     """Route Optimization Service - File-based storage"""
 
-    def __init__(self):
+    def __init__(self, manifests: ManifestService):
+        # Fleet plans create their manifests through the manifest service
+        self.manifests = manifests
         # Initialize file storage
         data_dir = os.path.join(os.path.dirname(__file__), "../../data")
-        self.storage = FileStorage(data_dir, "routes")
+        self.storage = create_storage(data_dir, "routes")
         self._initialize_mock_data()
 
     def _initialize_mock_data(self):
         """Initialize with some mock routes if file is empty"""
         # Only initialize if storage is empty
-        if not self.storage.get_all():
+        if not self.storage.count():
             mock_routes = [
                 {
                     "origin": "New York, NY",
@@ -67,17 +87,17 @@ class ROSService:
 
             self.storage.initialize_with_data(initial_data)
 
-    def get_all_routes(self) -> List[Route]:
+    async def get_all_routes(self) -> List[Route]:
         """Get all routes"""
-        routes = self.storage.get_all()
+        routes = await self.storage.aget_all()
         return [Route(**route) for route in routes.values()]
 
-    def get_route(self, route_id: str) -> Optional[Route]:
+    async def get_route(self, route_id: str) -> Optional[Route]:
         """Get route by ID"""
-        route = self.storage.get(route_id)
+        route = await self.storage.aget(route_id)
         return Route(**route) if route else None
 
-    def create_route(self, route_data: RouteCreate) -> Route:
+    async def create_route(self, route_data: RouteCreate) -> Route:
         """Create new route with optimization"""
         route_id = str(uuid.uuid4())
         now = datetime.now().isoformat()
@@ -99,42 +119,315 @@ class ROSService:
             "updated_at": now,
         }
 
-        self.storage.create(route_id, route)
+        await self.storage.acreate(route_id, route)
         return Route(**route)
 
-    def update_route(self, route_id: str, route_data: RouteUpdate) -> Optional[Route]:
+    async def update_route(
+        self, route_id: str, route_data: RouteUpdate
+    ) -> Optional[Route]:
         """Update existing route"""
-        route = self.storage.get(route_id)
-        if not route:
-            return None
-
         update_data = route_data.model_dump(exclude_unset=True)
-        route.update(update_data)
-        route["updated_at"] = datetime.now().isoformat()
+        update_data["updated_at"] = datetime.now().isoformat()
 
-        self.storage.update(route_id, route)
+        route = await self.storage.aupdate_with(
+            route_id, lambda existing: {**existing, **update_data}
+        )
+        if not route:
+            return None
         return Route(**route)
 
-    def delete_route(self, route_id: str) -> bool:
+    async def delete_route(self, route_id: str) -> bool:
         """Delete route"""
-        return self.storage.delete(route_id)
+        return await self.storage.adelete(route_id)
+
+    @staticmethod
+    def _address_point(index: int, address: dict) -> Tuple[float, float]:
+        """Return the (latitude, longitude) of a delivery address"""
+        coordinates = address.get("coordinates") or address
+        try:
+            return (
+                float(coordinates["latitude"]),
+                float(coordinates["longitude"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Delivery address {index} has no valid coordinates")
+
+    @staticmethod
+    def _unsequenced_waypoint(index: int, stop: dict, sequence: int) -> dict:
+        """Waypoint for a stored stop that has no coordinates to sequence by"""
+        return {
+            "index": index,
+            "order_id": None,
+            "sequence": sequence,
+            "address": stop.get("location"),
+            "coordinates": None,
+            "estimated_arrival": stop.get("estimated_arrival"),
+            "distance_from_previous": None,
+        }
 
-    def optimize_route(self, route_id: str) -> Optional[Route]:
-        """Optimize route (mock optimization)"""
+    def optimize_route(
+        self, route_id: str, request: Optional[OptimizationRequest] = None
+    ) -> Optional[OptimizedRoute]:
+        """Sequence a route's deliveries and save the optimized stop order
+
+        Without a request the route's own stops are re-sequenced; stops
+        without coordinates keep their stored order after the sequenced ones,
+        and a route with none to sequence is returned as stored. Raises
+        ValueError if a requested address has no coordinates.
+        """
         route = self.storage.get(route_id)
         if not route:
             return None
+        route_stops = route.get("stops") or []
+        # Index of each address among the route's stops or requested addresses
+        located: List[int] = []
+        unlocated: List[int] = []
+        if request is None:
+            for i, stop in enumerate(route_stops):
+                if stop.get("coordinates"):
+                    located.append(i)
+                else:
+                    unlocated.append(i)
+            if not located:
+                return OptimizedRoute(
+                    route_id=route_id,
+                    optimized_sequence=unlocated,
+                    total_distance=route.get("distance") or 0.0,
+                    estimated_duration=route.get("estimated_duration") or 0,
+                    waypoints=[
+                        self._unsequenced_waypoint(i, route_stops[i], i + 1)
+                        for i in unlocated
+                    ],
+                    created_at=datetime.now().isoformat(),
+                )
+            request = OptimizationRequest(
+                delivery_addresses=[
+                    {
+                        "address": route_stops[i]["location"],
+                        "coordinates": route_stops[i]["coordinates"],
+                    }
+                    for i in located
+                ]
+            )
+        else:
+            located = list(range(len(request.delivery_addresses)))
+        addresses = request.delivery_addresses
+        if not addresses:
+            raise ValueError("No delivery addresses to optimize")
+        depot = request.start_location
+        if len(addresses) + bool(depot) > settings.distance_matrix_max_points:
+            raise ValueError(
+                f"At most {settings.distance_matrix_max_points} points per "
+                "optimization, including the start location"
+            )
 
-        # Mock optimization - reduce duration by 10%
-        current_duration = route.get("estimated_duration", 0)
-        optimized_duration = int(current_duration * 0.9)
+        # Node 0 is the depot when a start location is given
+        points = [self._address_point(i, a) for i, a in enumerate(addresses)]
+        offset = 1 if depot else 0
+        if depot:
+            points.insert(0, (depot.latitude, depot.longitude))
+        # Plain lists: the optimizer's scalar lookups are faster than on arrays
+        matrix = distance_matrix(points).tolist()
 
-        route["estimated_duration"] = optimized_duration
-        route["updated_at"] = datetime.now().isoformat()
+        priority_ids = set(request.priority_deliveries or [])
+        stops = range(offset, len(points))
+        priority = [
+            n for n in stops if addresses[n - offset].get("order_id") in priority_ids
+        ]
+        priority_stops = set(priority)
+        others = [n for n in stops if n not in priority_stops]
+        start = 0 if depot else (priority or others)[0]
+        demands = {n: float(addresses[n - offset].get("demand", 1)) for n in stops}
 
-        self.storage.update(route_id, route)
-        return Route(**route)
+        path, unassigned = optimize_stops(
+            matrix,
+            start,
+            priority,
+            others,
+            demands=demands,
+            capacity=request.vehicle_capacity,
+            time_limit=settings.optimization_time_limit,
+        )
+        minutes_per_km = 60.0 / settings.route_avg_speed_kmh
+        if request.max_route_duration is not None:
+            path, dropped = trim_to_duration(
+                matrix,
+                path,
+                request.max_route_duration,
+                minutes_per_km,
+                settings.route_service_minutes,
+                start_is_stop=not depot,
+            )
+            unassigned.extend(dropped)
+
+        now = datetime.now()
+        elapsed = 0.0
+        total_distance = 0.0
+        waypoints = []
+        previous = None
+        for node in path:
+            if depot and node == 0:
+                previous = node
+                continue
+            leg = matrix[previous][node] if previous is not None else 0.0
+            total_distance += leg
+            elapsed += leg * minutes_per_km
+            address = addresses[node - offset]
+            waypoints.append(
+                {
+                    "index": located[node - offset],
+                    "order_id": address.get("order_id"),
+                    "sequence": len(waypoints) + 1,
+                    "address": address.get("address"),
+                    "coordinates": {
+                        "latitude": points[node][0],
+                        "longitude": points[node][1],
+                    },
+                    "estimated_arrival": (
+                        now + timedelta(minutes=elapsed)
+                    ).isoformat(),
+                    "distance_from_previous": round(leg, 2),
+                }
+            )
+            elapsed += settings.route_service_minutes
+            previous = node
+        for index in unlocated:
+            waypoints.append(
+                self._unsequenced_waypoint(
+                    index, route_stops[index], len(waypoints) + 1
+                )
+            )
+
+        optimized = {
+            "stops": [
+                {
+                    "location": waypoint["address"]
+                    or waypoint["order_id"]
+                    or f"Stop {waypoint['index'] + 1}",
+                    "coordinates": waypoint["coordinates"],
+                    "estimated_arrival": waypoint["estimated_arrival"],
+                    "actual_arrival": None,
+                }
+                for waypoint in waypoints
+            ],
+            "distance": round(total_distance, 2),
+            "estimated_duration": int(round(elapsed)),
+            "updated_at": now.isoformat(),
+        }
+        # Only the optimized fields are written, on top of whatever the route
+        # holds by now
+        self.storage.update_with(route_id, lambda stored: {**stored, **optimized})
+
+        return OptimizedRoute(
+            route_id=route_id,
+            optimized_sequence=[waypoint["index"] for waypoint in waypoints],
+            total_distance=optimized["distance"],
+            estimated_duration=optimized["estimated_duration"],
+            waypoints=waypoints,
+            unassigned=sorted(located[node - offset] for node in unassigned),
+            created_at=optimized["updated_at"],
+        )
+
+    def plan_fleet(self, request: FleetPlanRequest) -> FleetPlan:
+        """Split orders across the fleet and draft one manifest per vehicle
+
+        Raises ValueError if the delivery date is not a YYYY-MM-DD date.
+        """
+        started = time.perf_counter()
+        try:
+            departure = datetime.fromisoformat(
+                f"{request.delivery_date}T{settings.shift_start}"
+            )
+        except ValueError:
+            raise ValueError(
+                f"Invalid delivery_date {request.delivery_date!r}, expected YYYY-MM-DD"
+            )
+        time_limit = settings.fleet_planning_time_limit
+        if request.time_limit is not None:
+            time_limit = min(request.time_limit, time_limit)
+
+        orders = request.orders
+        depot = (request.depot.latitude, request.depot.longitude)
+        planner = FleetPlanner(
+            depot=depot,
+            stops=[(o.coordinates.latitude, o.coordinates.longitude) for o in orders],
+            demands=[order.demand for order in orders],
+            capacities=[vehicle.capacity for vehicle in request.vehicles],
+            max_stops=settings.fleet_planning_max_tour_stops,
+        )
+        tours, unassigned = planner.plan(time_limit)
+
+        now = datetime.now().isoformat()
+        plans = []
+        routes: Dict[str, dict] = {}
+        drafts: List[ManifestCreate] = []
+        for vehicle_index, stops in tours:
+            vehicle = request.vehicles[vehicle_index]
+            deliveries = [orders[stop].model_dump(exclude={"demand"}) for stop in stops]
+            finished = estimate_arrivals(deliveries, departure, origin=depot)
+            back_minutes = speed_profile.travel_minutes(
+                planner.distance(stops[-1] + 1, 0), finished
+            )
+            elapsed = (finished - departure).total_seconds() / 60 + back_minutes
+
+            plan = FleetRoutePlan(
+                vehicle_id=vehicle.vehicle_id,
+                driver_id=vehicle.driver_id,
+                order_ids=[delivery["order_id"] for delivery in deliveries],
+                load=sum(orders[stop].demand for stop in stops),
+                capacity=vehicle.capacity,
+                distance=round(planner.tour_length([s + 1 for s in stops]), 2),
+                estimated_duration=int(round(elapsed)),
+            )
+            if not request.dry_run:
+                plan.route_id = str(uuid.uuid4())
+                routes[plan.route_id] = {
+                    "id": plan.route_id,
+                    "origin": request.depot_name,
+                    "destination": request.depot_name,
+                    "vehicle_id": vehicle.vehicle_id,
+                    "driver_id": vehicle.driver_id,
+                    "stops": [
+                        {
+                            "location": delivery["delivery_address"],
+                            "coordinates": delivery["coordinates"],
+                            "estimated_arrival": delivery["estimated_delivery_time"],
+                            "actual_arrival": None,
+                        }
+                        for delivery in deliveries
+                    ],
+                    "status": RouteStatus.PLANNED,
+                    "distance": plan.distance,
+                    "estimated_duration": plan.estimated_duration,
+                    "actual_duration": None,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                drafts.append(
+                    ManifestCreate(
+                        driver_id=vehicle.driver_id,
+                        vehicle_id=vehicle.vehicle_id,
+                        route_id=plan.route_id,
+                        deliveries=deliveries,
+                        delivery_date=request.delivery_date,
+                        start_location=request.depot,
+                    )
+                )
+            plans.append(plan)
 
+        if routes:
+            # One write per store instead of one per vehicle
+            self.storage.create_many(routes)
+            manifests = self.manifests.create_manifests(drafts)
+            for plan, manifest in zip(plans, manifests):
+                plan.manifest_id = manifest.id
+                plan.manifest_number = manifest.manifest_number
 
-# Singleton instance
-ros_service = ROSService()
+        return FleetPlan(
+            delivery_date=request.delivery_date,
+            total_distance=round(sum(plan.distance for plan in plans), 2),
+            vehicles_used=len(plans),
+            routes=plans,
+            unassigned=[orders[stop].order_id for stop in unassigned],
+            planning_time=round(time.perf_counter() - started, 3),
+        )
@@ -1,11 +1,34 @@
 """Utilities Module"""
 
-from .helpers import calculate_distance, calculate_duration, generate_route_coordinates
-from .file_storage import FileStorage
+from .helpers import (
+    calculate_distance,
+    calculate_duration,
+    generate_route_coordinates,
+    haversine_km,
+)
+from .distance import distance_matrix, haversine_matrix
+from .file_storage import DuplicateKeyError, FileStorage, StorageCorruptedError
+from .journal_storage import JournalStorage
+from .sqlite_storage import SQLiteStorage
+from .storage_factory import close_storages, create_storage
+from .sequence import SequenceAllocator, create_sequence
+from .service_registry import ServiceRegistry
 
 __all__ = [
     "calculate_distance",
     "calculate_duration",
+    "distance_matrix",
     "generate_route_coordinates",
+    "haversine_km",
+    "haversine_matrix",
+    "DuplicateKeyError",
     "FileStorage",
+    "JournalStorage",
+    "SQLiteStorage",
+    "SequenceAllocator",
+    "ServiceRegistry",
+    "StorageCorruptedError",
+    "close_storages",
+    "create_storage",
+    "create_sequence",
 ]
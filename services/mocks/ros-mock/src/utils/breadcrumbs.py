@@ -0,0 +1,149 @@
+"""Compact on-disk breadcrumb trails of driver GPS positions
+
+Pings are buffered in memory per driver as packed float64 triples
+(timestamp, latitude, longitude). A background thread appends the buffers to
+one binary file per driver every flush interval, so ingestion never waits on
+disk and a trail is read back with a single NumPy call.
+"""
+
+import atexit
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import quote
+
+import numpy as np
+
+# One breadcrumb: seconds since the epoch, latitude, longitude
+RECORD = np.dtype([("timestamp", "f8"), ("latitude", "f8"), ("longitude", "f8")])
+
+Ping = Tuple[str, float, float, float]  # driver_id, timestamp, latitude, longitude
+
+
+class BreadcrumbStore:
+    """Append-only per-driver position history with buffered writes"""
+
+    def __init__(self, data_dir: str, flush_interval: float = 5.0):
+        """
+        Initialize the store
+
+        Args:
+            data_dir: Directory holding one ``<driver>.bin`` file per driver
+            flush_interval: Seconds between background flushes
+                (0 disables the background thread)
+        """
+        self.directory = Path(data_dir)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, array] = {}
+        # Guards the buffers; held only for in-memory work
+        self._lock = threading.Lock()
+        # Held while buffers move to disk so trail reads never miss them
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self._flusher: Optional[threading.Thread] = None
+        if flush_interval > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="breadcrumb-flusher", daemon=True
+            )
+            self._flusher.start()
+        atexit.register(self.close)
+
+    def _path(self, driver_id: str) -> Path:
+        return self.directory / f"{quote(driver_id, safe='')}.bin"
+
+    def append_many(self, pings: Iterable[Ping]) -> None:
+        """Buffer pings for the next flush"""
+        with self._lock:
+            pending = self._pending
+            for driver_id, timestamp, latitude, longitude in pings:
+                buffer = pending.get(driver_id)
+                if buffer is None:
+                    buffer = pending[driver_id] = array("d")
+                buffer.extend((timestamp, latitude, longitude))
+
+    def append(
+        self, driver_id: str, timestamp: float, latitude: float, longitude: float
+    ) -> None:
+        """Buffer a single ping for the next flush"""
+        self.append_many(((driver_id, timestamp, latitude, longitude),))
+
+    def flush(self) -> int:
+        """Append all buffered pings to disk; returns the number written"""
+        written = 0
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            for driver_id, buffer in pending.items():
+                try:
+                    with open(self._path(driver_id), "ab") as f:
+                        f.write(buffer.tobytes())
+                except IOError as e:
+                    print(f"Error writing breadcrumbs for {driver_id}: {e}")
+                    # Keep the pings for the next attempt, ahead of newer ones
+                    with self._lock:
+                        newer = self._pending.get(driver_id)
+                        if newer is not None:
+                            buffer.extend(newer)
+                        self._pending[driver_id] = buffer
+                    continue
+                written += len(buffer) // 3
+        return written
+
+    def trail(
+        self,
+        driver_id: str,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Read a driver's breadcrumbs, oldest first
+
+        Args:
+            driver_id: Driver to read
+            since: Only points at or after this epoch timestamp
+            until: Only points at or before this epoch timestamp
+            limit: Keep only the most recent this many points
+
+        Returns:
+            A structured array with RECORD fields
+        """
+        path = self._path(driver_id)
+        with self._flush_lock:
+            stored = np.fromfile(path, dtype=RECORD) if path.exists() else None
+            with self._lock:
+                buffer = self._pending.get(driver_id)
+                pending = buffer.tobytes() if buffer is not None else b""
+        parts = [part for part in (stored,) if part is not None and len(part)]
+        if pending:
+            parts.append(np.frombuffer(pending, dtype=RECORD))
+        if not parts:
+            return np.empty(0, dtype=RECORD)
+        points = np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+        # Devices may deliver pings late; order by when they were recorded
+        points = points[np.argsort(points["timestamp"], kind="stable")]
+        if since is not None:
+            points = points[points["timestamp"] >= since]
+        if until is not None:
+            points = points[points["timestamp"] <= until]
+        if limit is not None:
+            points = points[-limit:] if limit > 0 else points[:0]
+        return points
+
+    def _flush_loop(self) -> None:
+        """Background loop that flushes buffered pings periodically"""
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the background thread and flush what is left"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=self.flush_interval)
+        self.flush()
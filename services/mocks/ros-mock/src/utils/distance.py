@@ -0,0 +1,109 @@
+"""Vectorized haversine distance matrices
+
+Matrices are computed in one NumPy call and cached per coordinate list, so
+repeated optimization and ETA requests over the same stops reuse them.
+"""
+
+from functools import lru_cache
+from typing import Iterable, Tuple, Union
+
+import numpy as np
+
+from ..config.settings import settings
+from ..models.schemas import Coordinates
+from .helpers import EARTH_RADIUS_KM
+
+Point = Tuple[float, float]
+
+# Rows computed per block when searching nearest neighbours
+_NEIGHBOR_BLOCK_ROWS = 512
+
+
+def haversine_distances(
+    lat_a: np.ndarray, lon_a: np.ndarray, lat_b: np.ndarray, lon_b: np.ndarray
+) -> np.ndarray:
+    """Great-circle distances (km) from each point in a to each point in b"""
+    lat_a = np.radians(np.asarray(lat_a, dtype=np.float64))
+    lon_a = np.radians(np.asarray(lon_a, dtype=np.float64))
+    lat_b = np.radians(np.asarray(lat_b, dtype=np.float64))
+    lon_b = np.radians(np.asarray(lon_b, dtype=np.float64))
+    half_dlat = np.sin((lat_b[None, :] - lat_a[:, None]) / 2)
+    half_dlon = np.sin((lon_b[None, :] - lon_a[:, None]) / 2)
+    a = half_dlat**2 + np.cos(lat_a)[:, None] * np.cos(lat_b)[None, :] * half_dlon**2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_matrix(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """N×N great-circle distances (km) between points given in degrees"""
+    matrix = haversine_distances(latitudes, longitudes, latitudes, longitudes)
+    np.fill_diagonal(matrix, 0.0)
+    return matrix
+
+
+def nearest_neighbors(
+    latitudes: np.ndarray, longitudes: np.ndarray, count: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find each point's closest other points without building the full matrix
+
+    Returns:
+        Indices and distances (km) of up to ``count`` neighbours per point,
+        nearest first, as two N×count arrays
+    """
+    n = len(latitudes)
+    count = max(0, min(count, n - 1))
+    indices = np.empty((n, count), dtype=np.intp)
+    distances = np.empty((n, count), dtype=np.float64)
+    if count == 0:
+        return indices, distances
+    for start in range(0, n, _NEIGHBOR_BLOCK_ROWS):
+        stop = min(n, start + _NEIGHBOR_BLOCK_ROWS)
+        block = haversine_distances(
+            latitudes[start:stop], longitudes[start:stop], latitudes, longitudes
+        )
+        block[np.arange(stop - start), np.arange(start, stop)] = np.inf
+        nearest = np.argpartition(block, count - 1, axis=1)[:, :count]
+        nearest_distances = np.take_along_axis(block, nearest, axis=1)
+        order = np.argsort(nearest_distances, axis=1)
+        indices[start:stop] = np.take_along_axis(nearest, order, axis=1)
+        distances[start:stop] = np.take_along_axis(nearest_distances, order, axis=1)
+    return indices, distances
+
+
+def _compute_matrix(points: Tuple[Point, ...]) -> np.ndarray:
+    """Compute and freeze the matrix for a coordinate list"""
+    coordinates = np.array(points, dtype=np.float64).reshape(-1, 2)
+    matrix = haversine_matrix(coordinates[:, 0], coordinates[:, 1])
+    # Cached arrays are shared between callers
+    matrix.setflags(write=False)
+    return matrix
+
+
+_cached_matrix = lru_cache(maxsize=settings.distance_cache_size)(_compute_matrix)
+
+
+def distance_matrix(points: Iterable[Union[Coordinates, Point]]) -> np.ndarray:
+    """
+    Return the haversine distance matrix (km) for a list of points
+
+    Args:
+        points: Coordinates or (latitude, longitude) pairs, in matrix order
+
+    Returns:
+        A read-only N×N array; row and column i belong to points[i]
+    """
+    key = tuple(
+        (float(p.latitude), float(p.longitude))
+        if isinstance(p, Coordinates)
+        else (float(p[0]), float(p[1]))
+        for p in points
+    )
+    if len(key) > settings.distance_cache_max_points:
+        # A cache full of 2,000-point matrices would hold about 1 GB
+        return _compute_matrix(key)
+    return _cached_matrix(key)
+
+
+def cache_info():
+    """Hit and miss counts of the matrix cache"""
+    return _cached_matrix.cache_info()
@@ -0,0 +1,133 @@
+"""Deterministic arrival time estimates along a delivery sequence
+
+Arrival times follow the stops in manifest order: driving time comes from
+the haversine distance between consecutive stops and a time-of-day speed
+profile, and every stop adds a fixed service time. A stop reached before its
+time window opens waits for it; one reached after the window closes is
+flagged late.
+"""
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from ..config.settings import settings
+from .distance import Point
+from .helpers import haversine_km
+
+MINUTES_PER_DAY = 24 * 60
+
+# Deliveries that no longer need an arrival estimate
+FINISHED_STATUSES = ("delivered", "failed")
+
+
+class SpeedProfile:
+    """Average driving speed by time of day"""
+
+    def __init__(self, speeds: Dict[int, float]):
+        """
+        Initialize the profile
+
+        Args:
+            speeds: Map of start hour (0-23) to speed in km/h; each speed
+                applies until the next start hour, wrapping past midnight
+        """
+        if not speeds or min(speeds.values()) <= 0:
+            raise ValueError("Speed profile needs at least one positive speed")
+        hours = sorted(speeds)
+        self._starts = [hour * 60 for hour in hours]
+        self._speeds = [float(speeds[hour]) for hour in hours]
+
+    def travel_minutes(self, distance_km: float, depart: datetime) -> float:
+        """Minutes to drive distance_km leaving at depart, across speed changes"""
+        remaining = distance_km
+        elapsed = 0.0
+        minute = depart.hour * 60 + depart.minute + depart.second / 60
+        while remaining > 0:
+            # The last band also covers the hours before the first start
+            band = bisect_right(self._starts, minute) - 1
+            speed = self._speeds[band] / 60  # km per minute
+            if band + 1 < len(self._starts):
+                band_end = self._starts[band + 1]
+            else:
+                band_end = self._starts[0] + MINUTES_PER_DAY
+            span = band_end - minute
+            if speed * span >= remaining:
+                return elapsed + remaining / speed
+            remaining -= speed * span
+            elapsed += span
+            minute = band_end % MINUTES_PER_DAY
+        return elapsed
+
+
+speed_profile = SpeedProfile(settings.eta_speed_profile)
+
+
+def coordinates_point(coordinates: Optional[Dict[str, Any]]) -> Optional[Point]:
+    """Return (latitude, longitude) from a coordinates dict, if it has one"""
+    if not coordinates:
+        return None
+    return (coordinates["latitude"], coordinates["longitude"])
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO datetime, ignoring values that are missing or malformed
+
+    Estimates run on local naive times, so values with an offset are
+    converted to local time.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def estimate_arrivals(
+    deliveries: List[Dict[str, Any]],
+    departure: datetime,
+    origin: Optional[Point] = None,
+    start_index: int = 0,
+    profile: Optional[SpeedProfile] = None,
+) -> datetime:
+    """
+    Set estimated_delivery_time and late on deliveries[start_index:] in place
+
+    Stops already delivered or failed keep their estimate and are driven
+    past. Legs to or from a stop without coordinates take no driving time.
+
+    Args:
+        deliveries: Manifest delivery dicts in visiting order
+        departure: When the vehicle leaves origin
+        origin: Where the vehicle is at departure (depot or last stop)
+        start_index: First delivery to estimate; earlier ones are untouched
+        profile: Speed profile, the configured one by default
+
+    Returns:
+        The time the vehicle finishes at the last estimated stop
+    """
+    profile = profile or speed_profile
+    service = timedelta(minutes=settings.route_service_minutes)
+    clock = departure
+    position = origin
+    for delivery in deliveries[start_index:]:
+        if delivery.get("status") in FINISHED_STATUSES:
+            continue
+        point = coordinates_point(delivery.get("coordinates"))
+        if position is not None and point is not None:
+            distance = haversine_km(*position, *point)
+            clock += timedelta(minutes=profile.travel_minutes(distance, clock))
+        window_start = _parse_time(delivery.get("time_window_start"))
+        if window_start is not None and clock < window_start:
+            clock = window_start
+        delivery["estimated_delivery_time"] = clock.isoformat(timespec="seconds")
+        window_end = _parse_time(delivery.get("time_window_end"))
+        delivery["late"] = window_end is not None and clock > window_end
+        clock += service
+        if point is not None:
+            position = point
+    return clock
@@ -0,0 +1,92 @@
+"""Append-only event log for mock services"""
+
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from . import serialization
+
+
+def _lines_at(f: BinaryIO, offsets: List[int]) -> Iterator[bytes]:
+    """Read the line starting at each offset"""
+    for offset in offsets:
+        f.seek(offset)
+        yield f.readline()
+
+
+class EventLog:
+    """Events stored as one JSON object per line in ``<filename>.ndjson``
+
+    Appends only write the new lines, so recording an event costs the same
+    however long the log grows. Reads filtered on the indexed field seek
+    straight to that value's lines; other reads scan the file in order.
+    """
+
+    def __init__(
+        self, data_dir: str, filename: str, index_field: Optional[str] = None
+    ):
+        """
+        Initialize the event log
+
+        Args:
+            data_dir: Directory to store the log in
+            filename: Name of the log file (without extension)
+            index_field: Event field to keep line offsets for. The offsets
+                are built on the first read and extended with each read
+                after that, from where the previous one stopped.
+        """
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.filepath = self.data_dir / f"{filename}.ndjson"
+        self.lock = threading.Lock()
+        self.index_field = index_field
+        # Byte offset of each line, per index_field value, up to _indexed_size
+        self._offsets: Dict[Any, List[int]] = {}
+        self._indexed_size = 0
+
+    def append(self, events: Iterable[Dict[str, Any]]) -> None:
+        """Append events in order and flush them to the OS"""
+        lines = serialization.dump_lines(events)
+        if not lines:
+            return
+        with self.lock:
+            with open(self.filepath, "ab") as f:
+                f.write(lines)
+
+    def _catch_up(self, f: BinaryIO) -> None:
+        """Index the lines appended since the last read (caller holds the lock)"""
+        f.seek(self._indexed_size)
+        offset = self._indexed_size
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # Still being written, or torn by a crash
+            try:
+                event = serialization.loads(line)
+            except serialization.JSONDecodeError:
+                event = None
+            if isinstance(event, dict):
+                value = event.get(self.index_field)
+                self._offsets.setdefault(value, []).append(offset)
+            offset += len(line)
+        self._indexed_size = offset
+
+    def read(self, **filters: Any) -> Iterator[Dict[str, Any]]:
+        """Yield events whose fields equal all of the given values, oldest first"""
+        if not self.filepath.exists():
+            return
+        with open(self.filepath, "rb") as f:
+            if self.index_field in filters:
+                with self.lock:
+                    self._catch_up(f)
+                    offsets = list(self._offsets.get(filters[self.index_field], ()))
+                lines = _lines_at(f, offsets)
+            else:
+                lines = f
+            for line in lines:
+                try:
+                    event = serialization.loads(line)
+                except serialization.JSONDecodeError:
+                    # A crash mid-append leaves a torn last line
+                    continue
+                if all(event.get(field) == value for field, value in filters.items()):
+                    yield event
@@ -0,0 +1,337 @@
+"""Multi-vehicle route planning (capacitated vehicle routing)
+
+Stops are grouped into depot-to-depot tours with the Clarke-Wright savings
+heuristic. Savings are only evaluated between each stop and its nearest
+neighbours, so the candidate list grows linearly with the number of stops
+instead of quadratically. Tours are matched to vehicles by capacity, then
+improved by moving stops between neighbouring tours and by re-sequencing each
+tour on its own until nothing improves or the time budget runs out. Tours
+hold at most max_stops stops, which also bounds the distance matrix built to
+re-sequence one.
+"""
+
+import math
+import time
+from bisect import bisect_left
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .distance import Point, haversine_distances, haversine_matrix, nearest_neighbors
+from .helpers import EARTH_RADIUS_KM
+from .route_optimizer import NEIGHBOR_COUNT, improve_path
+
+# Neighbours per stop considered for savings and relocation moves
+SAVINGS_NEIGHBORS = 20
+
+_EPSILON = 1e-9
+# Stops relocated between deadline checks
+_DEADLINE_CHECK_INTERVAL = 64
+
+
+class FleetPlanner:
+    """Plan capacity-feasible depot-to-depot tours for a fleet of vehicles
+
+    Node 0 is the depot and stop i is node i + 1; results use stop indices.
+    """
+
+    def __init__(
+        self,
+        depot: Point,
+        stops: Sequence[Point],
+        demands: Sequence[float],
+        capacities: Sequence[float],
+        max_stops: Optional[int] = None,
+    ):
+        """
+        Initialize the planner
+
+        Args:
+            depot: (latitude, longitude) every tour starts and ends at
+            stops: (latitude, longitude) of each delivery
+            demands: Load of each delivery, in the same unit as capacities
+            capacities: Capacity of each vehicle
+            max_stops: Most stops one tour may hold; stops that fit no tour
+                are left unassigned. Unlimited if None.
+        """
+        self.points = np.array([depot, *stops], dtype=np.float64).reshape(-1, 2)
+        self.size = len(self.points)
+        self.demands = [0.0, *(float(d) for d in demands)]
+        self.capacities = [float(c) for c in capacities]
+        self.max_stops = len(stops) if max_stops is None else max_stops
+
+        radians = np.radians(self.points)
+        self._lat = radians[:, 0].tolist()
+        self._lon = radians[:, 1].tolist()
+        self._cos_lat = np.cos(radians[:, 0]).tolist()
+        latitudes, longitudes = self.points[:, 0], self.points[:, 1]
+        self._depot_distance = haversine_distances(
+            latitudes[:1], longitudes[:1], latitudes, longitudes
+        )[0]
+
+        self._neighbors: List[List[int]] = [[] for _ in range(self.size)]
+        self.tours: List[List[int]] = []
+        self._vehicle: List[int] = []  # Vehicle index of each tour
+        self._load: List[float] = []
+        self._dirty: List[bool] = []  # Tours changed since they were re-sequenced
+        self._tour_of = [-1] * self.size
+        self._pos = [0] * self.size
+
+    def distance(self, a: int, b: int) -> float:
+        """Haversine distance (km) between two nodes"""
+        if a == b:
+            return 0.0
+        sin_dlat = math.sin((self._lat[b] - self._lat[a]) / 2)
+        sin_dlon = math.sin((self._lon[b] - self._lon[a]) / 2)
+        h = sin_dlat**2 + self._cos_lat[a] * self._cos_lat[b] * sin_dlon**2
+        return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+    def tour_length(self, tour: Sequence[int]) -> float:
+        """Length (km) of a tour from the depot through its nodes and back"""
+        nodes = [0, *tour, 0]
+        return sum(self.distance(a, b) for a, b in zip(nodes, nodes[1:]))
+
+    def plan(self, time_limit: float) -> Tuple[List[Tuple[int, List[int]]], List[int]]:
+        """
+        Build and improve tours within the time limit
+
+        Returns:
+            (vehicle index, stop indices in visiting order) for each vehicle
+            used, and the stop indices that did not fit the fleet
+        """
+        deadline = time.perf_counter() + time_limit
+        stops = self.points[1:]
+        indices, distances = nearest_neighbors(
+            stops[:, 0], stops[:, 1], SAVINGS_NEIGHBORS
+        )
+        self._neighbors = [[]] + (indices + 1).tolist()
+
+        tours, unassigned = self._savings_tours(indices + 1, distances)
+        unassigned.extend(self._assign_vehicles(tours))
+        unassigned = self._insert_unassigned(unassigned, deadline)
+
+        self._improve_tours(deadline)
+        while time.perf_counter() < deadline and self._relocate_pass(deadline):
+            self._improve_tours(deadline)
+
+        planned = [
+            (self._vehicle[t], [node - 1 for node in tour])
+            for t, tour in enumerate(self.tours)
+            if tour
+        ]
+        return planned, sorted(node - 1 for node in unassigned)
+
+    def _savings_tours(
+        self, neighbors: np.ndarray, distances: np.ndarray
+    ) -> Tuple[List[List[int]], List[int]]:
+        """Merge single-stop tours in order of decreasing savings"""
+        max_capacity = max(self.capacities)
+        unassigned = [
+            node for node in range(1, self.size) if self.demands[node] > max_capacity
+        ]
+        tour_of = list(range(self.size))
+        tours = {
+            node: [node]
+            for node in range(1, self.size)
+            if self.demands[node] <= max_capacity
+        }
+        load = {node: self.demands[node] for node in tours}
+
+        if neighbors.size:
+            # Each unordered pair once, with its saving over two separate tours
+            a = np.repeat(np.arange(1, self.size), neighbors.shape[1])
+            b = neighbors.ravel()
+            lo, hi = np.minimum(a, b), np.maximum(a, b)
+            _, first = np.unique(lo * self.size + hi, return_index=True)
+            lo, hi = lo[first], hi[first]
+            savings = (
+                self._depot_distance[lo]
+                + self._depot_distance[hi]
+                - distances.ravel()[first]
+            )
+            order = np.argsort(-savings, kind="stable")
+            order = order[savings[order] > 0]
+            pairs = zip(lo[order].tolist(), hi[order].tolist())
+        else:
+            pairs = iter(())
+
+        for a, b in pairs:
+            ta, tb = tour_of[a], tour_of[b]
+            if ta == tb or ta not in tours or tb not in tours:
+                continue
+            if load[ta] + load[tb] > max_capacity:
+                continue
+            if len(tours[ta]) + len(tours[tb]) > self.max_stops:
+                continue
+            first, second = tours[ta], tours[tb]
+            # Only tour ends can be joined: ... a -> b ...
+            if a not in (first[0], first[-1]) or b not in (second[0], second[-1]):
+                continue
+            if first[-1] != a:
+                first.reverse()
+            if second[0] != b:
+                second.reverse()
+            first.extend(second)
+            for node in second:
+                tour_of[node] = ta
+            load[ta] += load.pop(tb)
+            del tours[tb]
+
+        return list(tours.values()), unassigned
+
+    def _assign_vehicles(self, tours: List[List[int]]) -> List[int]:
+        """Give each tour the smallest free vehicle it fits; return leftover stops"""
+        unassigned: List[int] = []
+        free = sorted((c, v) for v, c in enumerate(self.capacities))
+        tours.sort(key=lambda tour: sum(self.demands[n] for n in tour), reverse=True)
+        for tour in tours:
+            if not free:
+                unassigned.extend(tour)
+                continue
+            load = sum(self.demands[node] for node in tour)
+            slot = bisect_left(free, (load, -1))
+            capacity, vehicle = free.pop(min(slot, len(free) - 1))
+            while load > capacity:
+                node = tour.pop()
+                load -= self.demands[node]
+                unassigned.append(node)
+            self._add_tour(vehicle, tour, load)
+        return unassigned
+
+    def _add_tour(self, vehicle: int, tour: List[int], load: float) -> None:
+        """Register a tour and index its nodes"""
+        index = len(self.tours)
+        self.tours.append(tour)
+        self._vehicle.append(vehicle)
+        self._load.append(load)
+        self._dirty.append(True)
+        for position, node in enumerate(tour):
+            self._tour_of[node] = index
+            self._pos[node] = position
+
+    def _reindex(self, t: int, start: int = 0) -> None:
+        """Refresh node positions of tour t from index start"""
+        tour = self.tours[t]
+        for position in range(start, len(tour)):
+            self._pos[tour[position]] = position
+
+    def _fits(self, t: int, u: int) -> bool:
+        """Whether tour t has room for stop u"""
+        return (
+            self._load[t] + self.demands[u] <= self.capacities[self._vehicle[t]]
+            and len(self.tours[t]) < self.max_stops
+        )
+
+    def _insertion(self, u: int, t: int) -> Tuple[float, int]:
+        """Cheapest position to insert u into tour t and its added length"""
+        tour = self.tours[t]
+        nodes = [0, *tour, 0]
+        best_cost, best_at = math.inf, 0
+        for at in range(len(nodes) - 1):
+            x, y = nodes[at], nodes[at + 1]
+            cost = self.distance(x, u) + self.distance(u, y) - self.distance(x, y)
+            if cost < best_cost:
+                best_cost, best_at = cost, at
+        return best_cost, best_at
+
+    def _insert_unassigned(self, unassigned: List[int], deadline: float) -> List[int]:
+        """Insert leftover stops into tours with spare capacity, if any"""
+        for vehicle in range(len(self.capacities)):
+            if vehicle not in self._vehicle:
+                self._add_tour(vehicle, [], 0.0)
+        left: List[int] = []
+        for u in sorted(unassigned, key=self.demands.__getitem__, reverse=True):
+            if time.perf_counter() >= deadline:
+                left.append(u)
+                continue
+            # Prefer tours that already serve a nearby stop
+            nearby = {self._tour_of[v] for v in self._neighbors[u]} - {-1}
+            candidates = [t for t in nearby if self._fits(t, u)] or [
+                t for t in range(len(self.tours)) if self._fits(t, u)
+            ]
+            if not candidates:
+                left.append(u)
+                continue
+            best_cost, t, at = math.inf, -1, 0
+            for candidate in candidates:
+                cost, position = self._insertion(u, candidate)
+                if cost < best_cost:
+                    best_cost, t, at = cost, candidate, position
+            self.tours[t].insert(at, u)
+            self._tour_of[u] = t
+            self._load[t] += self.demands[u]
+            self._dirty[t] = True
+            self._reindex(t, at)
+        return left
+
+    def _relocate_pass(self, deadline: float) -> bool:
+        """Move single stops into a neighbouring tour where that is shorter"""
+        improved = False
+        for u in range(1, self.size):
+            if u % _DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() >= deadline:
+                break
+            tu = self._tour_of[u]
+            if tu < 0:
+                continue
+            tour = self.tours[tu]
+            p = self._pos[u]
+            prev = tour[p - 1] if p > 0 else 0
+            nxt = tour[p + 1] if p + 1 < len(tour) else 0
+            gain = (
+                self.distance(prev, u)
+                + self.distance(u, nxt)
+                - self.distance(prev, nxt)
+            )
+            demand = self.demands[u]
+
+            best_delta, best = -_EPSILON, None
+            for v in self._neighbors[u]:
+                tv = self._tour_of[v]
+                if tv < 0 or tv == tu:
+                    continue
+                if not self._fits(tv, u):
+                    continue
+                other = self.tours[tv]
+                q = self._pos[v]
+                before = other[q - 1] if q > 0 else 0
+                after = other[q + 1] if q + 1 < len(other) else 0
+                d_uv = self.distance(u, v)
+                for x, at in ((before, q), (after, q + 1)):
+                    delta = d_uv + self.distance(x, u) - self.distance(x, v) - gain
+                    if delta < best_delta:
+                        best_delta, best = delta, (tv, at)
+            if best is None:
+                continue
+
+            tv, at = best
+            tour.pop(p)
+            self._reindex(tu, p)
+            self.tours[tv].insert(at, u)
+            self._reindex(tv, at)
+            self._tour_of[u] = tv
+            self._load[tu] -= demand
+            self._load[tv] += demand
+            self._dirty[tu] = self._dirty[tv] = True
+            improved = True
+        return improved
+
+    def _improve_tours(self, deadline: float) -> None:
+        """Re-sequence every changed tour with 2-opt and Or-opt"""
+        for t, tour in enumerate(self.tours):
+            if time.perf_counter() >= deadline:
+                return
+            if not self._dirty[t]:
+                continue
+            self._dirty[t] = False
+            if len(tour) < 3:
+                continue
+            nodes = [0, *tour]
+            latitudes, longitudes = self.points[nodes, 0], self.points[nodes, 1]
+            neighbors, _ = nearest_neighbors(latitudes, longitudes, NEIGHBOR_COUNT)
+            near = dict(enumerate(neighbors.tolist()))
+            # Lists: the local search's scalar lookups are faster than on arrays
+            matrix = haversine_matrix(latitudes, longitudes).tolist()
+            path = list(range(len(nodes)))
+            improve_path(matrix, path, deadline, closed=True, near=near)
+            tour[:] = [nodes[i] for i in path[1:]]
+            self._reindex(t)
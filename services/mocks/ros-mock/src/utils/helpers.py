@@ -1,22 +1,35 @@
+import math
 import random
+import zlib
 from typing import Optional
 
+EARTH_RADIUS_KM = 6371.0088
+
 
 def calculate_distance(origin: str, destination: str) -> float:
     """Calculate mock distance between two locations in kilometers"""
-    # Simple hash-based distance calculation for consistency
-    hash_value = hash(f"{origin}{destination}")
-    return abs(hash_value % 1000) + 10.0
+    # CRC32 rather than hash(): stable across processes and restarts
+    hash_value = zlib.crc32(f"{origin}{destination}".encode("utf-8"))
+    return hash_value % 1000 + 10.0
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometers"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
 
 
 def calculate_duration(distance: float, avg_speed: float = 60.0) -> int:
     """Calculate estimated duration in minutes based on distance"""
     # avg_speed in km/h
     hours = distance / avg_speed
-    minutes = int(hours * 60)
-    # Add some random traffic delay
-    traffic_delay = random.randint(0, 30)
-    return minutes + traffic_delay
+    return int(hours * 60)
 
 
 def generate_route_coordinates(origin: str, destination: str, num_stops: int = 0):
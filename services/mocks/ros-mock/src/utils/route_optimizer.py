@@ -0,0 +1,282 @@
+"""Stop sequencing for delivery routes
+
+Routes are open paths: they start at a fixed node (the depot, or the first
+stop when no depot is given) and end at the last delivery. Closed tours that
+return to their start are supported for fleet planning. A route is built by
+nearest-neighbour construction and then improved with 2-opt and Or-opt moves
+over a precomputed, symmetric distance matrix. Both moves only look at each
+stop's nearest neighbours, which keeps a pass close to linear in the number
+of stops.
+"""
+
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Matrix = Sequence[Sequence[float]]
+
+# Neighbours considered per stop by the local search moves
+NEIGHBOR_COUNT = 10
+# Longest run of consecutive stops moved by Or-opt
+OR_OPT_MAX_SEGMENT = 3
+
+_EPSILON = 1e-9
+
+
+def path_length(matrix: Matrix, path: Sequence[int], closed: bool = False) -> float:
+    """Total length of a path, including the leg back to its start if closed"""
+    length = sum(matrix[a][b] for a, b in zip(path, path[1:]))
+    if closed and len(path) > 1:
+        length += matrix[path[-1]][path[0]]
+    return length
+
+
+def _nearest_neighbors(matrix: Matrix, nodes: Sequence[int]) -> Dict[int, List[int]]:
+    """Map each node to its closest other nodes, nearest first"""
+    return {
+        a: sorted((b for b in nodes if b != a), key=matrix[a].__getitem__)[
+            :NEIGHBOR_COUNT
+        ]
+        for a in nodes
+    }
+
+
+def _two_opt_pass(
+    matrix: Matrix,
+    path: List[int],
+    near: Dict[int, List[int]],
+    deadline: float,
+    fixed_end: bool = False,
+) -> bool:
+    """Apply improving segment reversals; path[0] (and path[-1]) stay fixed"""
+    improved = False
+    m = len(path)
+    # With a fixed end, path[-1] repeats path[0] and is never a move target
+    pos = {node: i for i, node in enumerate(path[: m - 1 if fixed_end else m])}
+
+    def reverse(i: int, j: int) -> None:
+        path[i : j + 1] = path[i : j + 1][::-1]
+        for k in range(i, j + 1):
+            pos[path[k]] = k
+
+    t = 0
+    while t < m - 1 and time.perf_counter() < deadline:
+        a, b = path[t], path[t + 1]
+        d_ab = matrix[a][b]
+        # Reversing the whole tail only swaps edge (a, b) for (a, last)
+        if not fixed_end and t + 2 < m and matrix[a][path[-1]] < d_ab - _EPSILON:
+            reverse(t + 1, m - 1)
+            improved = True
+            continue
+        moved = False
+        for c in near[a]:
+            d_ac = matrix[a][c]
+            if d_ac >= d_ab - _EPSILON:
+                break
+            j = pos[c]
+            if j > t + 1:
+                # a-b ... c-d  ->  a-c ... b-d
+                d = path[j + 1] if j + 1 < m else None
+                delta = d_ac - d_ab
+                if d is not None:
+                    delta += matrix[b][d] - matrix[c][d]
+                if delta < -_EPSILON:
+                    reverse(t + 1, j)
+                    moved = True
+                    break
+            elif j < t:
+                # c-e ... a-b  ->  c-a ... e-b
+                e = path[j + 1]
+                delta = d_ac + matrix[e][b] - matrix[c][e] - d_ab
+                if delta < -_EPSILON:
+                    reverse(j + 1, t)
+                    moved = True
+                    break
+        if moved:
+            # Re-examine the new edge leaving position t
+            improved = True
+        else:
+            t += 1
+    return improved
+
+
+def _or_opt_pass(
+    matrix: Matrix,
+    path: List[int],
+    near: Dict[int, List[int]],
+    deadline: float,
+    fixed_end: bool = False,
+) -> bool:
+    """Move runs of up to OR_OPT_MAX_SEGMENT stops to a cheaper position"""
+    improved = False
+    m = len(path)
+    end = m - 1 if fixed_end else m
+    pos = {node: i for i, node in enumerate(path[:end])}
+    for k in range(1, OR_OPT_MAX_SEGMENT + 1):
+        i = 1
+        while i + k <= end and m > k + 1 and time.perf_counter() < deadline:
+            first, last = path[i], path[i + k - 1]
+            prev = path[i - 1]
+            nxt = path[i + k] if i + k < m else None
+            removal_gain = matrix[prev][first]
+            if nxt is not None:
+                removal_gain += matrix[last][nxt] - matrix[prev][nxt]
+
+            best: Optional[Tuple[float, int, bool]] = None
+            for u in near[first] + near[last]:
+                p = pos[u]
+                # Insert between path[q] and path[q + 1], on either side of u
+                for q in (p - 1, p):
+                    if q < 0 or i - 1 <= q <= i + k - 1:
+                        continue
+                    x = path[q]
+                    y = path[q + 1] if q + 1 < m else None
+                    forward = matrix[x][first]
+                    backward = matrix[x][last]
+                    if y is not None:
+                        forward += matrix[last][y] - matrix[x][y]
+                        backward += matrix[first][y] - matrix[x][y]
+                    for cost, flip in ((forward, False), (backward, True)):
+                        delta = cost - removal_gain
+                        if delta < -_EPSILON and (best is None or delta < best[0]):
+                            best = (delta, q, flip)
+
+            if best is None:
+                i += 1
+                continue
+            _, q, flip = best
+            segment = path[i : i + k]
+            if flip:
+                segment.reverse()
+            rest = path[:i] + path[i + k :]
+            at = q + 1 if q < i else q - k + 1
+            path[:] = rest[:at] + segment + rest[at:]
+            pos = {node: idx for idx, node in enumerate(path[:end])}
+            improved = True
+    return improved
+
+
+def improve_path(
+    matrix: Matrix,
+    path: List[int],
+    deadline: float,
+    closed: bool = False,
+    near: Optional[Dict[int, List[int]]] = None,
+) -> None:
+    """Run 2-opt and Or-opt until neither improves or the deadline passes
+
+    A closed path is improved as a tour returning to path[0]. near maps each
+    node to its closest other nodes, nearest first; it is worked out from
+    the matrix when not given.
+    """
+    if len(path) < 3:
+        return
+    if near is None:
+        near = _nearest_neighbors(matrix, path)
+    work = path + [path[0]] if closed else path
+    while time.perf_counter() < deadline:
+        improved = _two_opt_pass(matrix, work, near, deadline, closed)
+        improved = _or_opt_pass(matrix, work, near, deadline, closed) or improved
+        if not improved:
+            break
+    if closed:
+        path[:] = work[:-1]
+
+
+def _construct(
+    matrix: Matrix,
+    path: List[int],
+    nodes: Sequence[int],
+    demands: Dict[int, float],
+    load: float,
+    capacity: Optional[float],
+) -> Tuple[float, List[int]]:
+    """Extend path by repeatedly visiting the nearest stop that still fits"""
+    remaining = set(nodes)
+    while remaining:
+        row = matrix[path[-1]]
+        nearest = None
+        for node in remaining:
+            if capacity is not None and load + demands.get(node, 1) > capacity:
+                continue
+            if nearest is None or row[node] < row[nearest]:
+                nearest = node
+        if nearest is None:
+            break
+        path.append(nearest)
+        load += demands.get(nearest, 1)
+        remaining.discard(nearest)
+    return load, sorted(remaining)
+
+
+def optimize_stops(
+    matrix: Matrix,
+    start: int,
+    priority: Sequence[int],
+    others: Sequence[int],
+    demands: Optional[Dict[int, float]] = None,
+    capacity: Optional[float] = None,
+    time_limit: float = 0.5,
+) -> Tuple[List[int], List[int]]:
+    """
+    Sequence stops into an open route from a fixed start node
+
+    Priority stops are always served before the others; each group is
+    sequenced on its own so local search never breaks that order.
+
+    Args:
+        matrix: Symmetric distance matrix over all nodes
+        start: Node the route starts from (kept first in the path)
+        priority: Stops that must be visited before all others
+        others: Remaining stops
+        demands: Load per stop (default 1) counted against capacity
+        capacity: Maximum total load, or None for unlimited
+        time_limit: Seconds allowed for local search
+
+    Returns:
+        The path starting with ``start``, and the stops left out because
+        they did not fit in the vehicle
+    """
+    deadline = time.perf_counter() + time_limit
+    demands = demands or {}
+    load = demands.get(start, 1) if start in priority or start in others else 0
+    path = [start]
+    unassigned: List[int] = []
+
+    for group in (priority, others):
+        group_start = len(path) - 1
+        load, left_out = _construct(
+            matrix,
+            path,
+            [node for node in group if node != start],
+            demands,
+            load,
+            capacity,
+        )
+        unassigned.extend(left_out)
+        # Improve only this group's part of the path, anchored at its start
+        segment = path[group_start:]
+        improve_path(matrix, segment, deadline)
+        path[group_start:] = segment
+
+    return path, unassigned
+
+
+def trim_to_duration(
+    matrix: Matrix,
+    path: Sequence[int],
+    max_minutes: float,
+    minutes_per_km: float,
+    service_minutes: float,
+    start_is_stop: bool = False,
+) -> Tuple[List[int], List[int]]:
+    """Cut the path where its travel plus service time exceeds max_minutes
+
+    Returns the kept path and the stops dropped from its end.
+    """
+    elapsed = service_minutes if start_is_stop else 0.0
+    for index in range(1, len(path)):
+        elapsed += matrix[path[index - 1]][path[index]] * minutes_per_km
+        elapsed += service_minutes
+        if elapsed > max_minutes:
+            return list(path[:index]), list(path[index:])
+    return list(path), []
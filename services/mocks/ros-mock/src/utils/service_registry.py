@@ -0,0 +1,76 @@
+"""Registry holding one instance of each service per process"""
+
+import threading
+from typing import Any, Callable, Dict, List, Type, TypeVar
+
+T = TypeVar("T")
+
+
+class ServiceRegistry:
+    """Builds each registered service once and hands out that instance
+
+    Routes receive services through FastAPI dependencies backed by a
+    registry, so every router, the health checks and services that depend
+    on each other share one in-memory view of the data. The app's lifespan
+    calls start() to build and warm everything before the first request;
+    anything not yet built when it is asked for is built on first use.
+    """
+
+    def __init__(self):
+        self._factories: Dict[type, Callable[[], Any]] = {}
+        self._instances: Dict[type, Any] = {}
+        # Reentrant: a factory may get() the services it depends on
+        self._lock = threading.RLock()
+
+    def register(self, service_type: Type[T], factory: Callable[[], T]) -> None:
+        """Register how to build a service; replaces any earlier instance"""
+        with self._lock:
+            self._factories[service_type] = factory
+            self._instances.pop(service_type, None)
+
+    def get(self, service_type: Type[T]) -> T:
+        """Return the shared instance of a service, building it if needed"""
+        instance = self._instances.get(service_type)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(service_type)
+            if instance is None:
+                try:
+                    factory = self._factories[service_type]
+                except KeyError:
+                    raise KeyError(
+                        f"Service not registered: {service_type.__name__}"
+                    ) from None
+                instance = factory()
+                self._instances[service_type] = instance
+            return instance
+
+    def services(self) -> List[Any]:
+        """Return every registered service, building any that are missing"""
+        return [self.get(service_type) for service_type in list(self._factories)]
+
+    def start(self) -> None:
+        """Build every service and warm its caches and indexes
+
+        A service can define warm_up() to prepare more than its storage;
+        otherwise its ``storage`` attribute, if any, is warmed.
+        """
+        for service in self.services():
+            warm_up = getattr(service, "warm_up", None)
+            if warm_up is not None:
+                warm_up()
+                continue
+            storage = getattr(service, "storage", None)
+            if storage is not None:
+                storage.warm_up()
+
+    def close(self) -> None:
+        """Close the services that hold resources and forget all instances"""
+        with self._lock:
+            instances = list(self._instances.values())
+            self._instances.clear()
+        for service in reversed(instances):
+            close = getattr(service, "close", None)
+            if close is not None:
+                close()
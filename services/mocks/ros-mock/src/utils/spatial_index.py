@@ -0,0 +1,318 @@
+"""Uniform grid index over keyed points for radius and k-nearest queries
+
+Points are bucketed into square cells of a fixed size in degrees. A radius
+query only visits the cells overlapping the circle's bounding box, and a
+k-nearest query visits rings of cells outward from the query's cell until no
+unvisited cell can hold a closer match, so both touch a small neighbourhood
+instead of every point. Moving a point only touches its
+old and new cell. Each cell keeps a NumPy copy of its coordinates, rebuilt
+lazily after it changes, so distances are computed a cell at a time.
+"""
+
+import heapq
+import math
+import threading
+from itertools import chain
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .helpers import EARTH_RADIUS_KM
+
+# Length of one degree of latitude
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+Cell = Tuple[int, int]
+Arrays = Tuple[List[str], np.ndarray]
+
+
+class _Bucket:
+    """Points of one grid cell, with a lazily built array copy"""
+
+    __slots__ = ("points", "_keys", "_radians")
+
+    def __init__(self):
+        self.points: Dict[str, Tuple[float, float]] = {}
+        self._keys: Optional[List[str]] = None
+        self._radians: Optional[np.ndarray] = None
+
+    def changed(self) -> None:
+        self._keys = self._radians = None
+
+    def arrays(self) -> Arrays:
+        """Keys and a 2×N array of their latitudes and longitudes in radians"""
+        if self._keys is None:
+            self._keys = list(self.points)
+            self._radians = np.radians(
+                np.array(list(self.points.values()), dtype=np.float64).reshape(-1, 2).T
+            )
+        return self._keys, self._radians
+
+
+class GridIndex:
+    """Points keyed by ID, bucketed into a uniform latitude/longitude grid"""
+
+    def __init__(self, cell_km: float = 1.0):
+        """
+        Initialize an empty index
+
+        Args:
+            cell_km: Cell height in kilometers; cells are square in degrees
+        """
+        if cell_km <= 0:
+            raise ValueError("cell_km must be positive")
+        self._cell_deg = cell_km / KM_PER_DEGREE
+        self._cells: Dict[Cell, _Bucket] = {}
+        self._points: Dict[str, Cell] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._points
+
+    def _cell(self, latitude: float, longitude: float) -> Cell:
+        return (
+            math.floor(latitude / self._cell_deg),
+            math.floor(longitude / self._cell_deg),
+        )
+
+    def get(self, key: str) -> Optional[Tuple[float, float]]:
+        """Return the (latitude, longitude) stored for key"""
+        with self._lock:
+            cell = self._points.get(key)
+            return self._cells[cell].points[key] if cell is not None else None
+
+    def upsert(self, key: str, latitude: float, longitude: float) -> None:
+        """Insert a point or move it to a new position"""
+        cell = self._cell(latitude, longitude)
+        with self._lock:
+            previous = self._points.get(key)
+            if previous is not None and previous != cell:
+                self._discard(key, previous)
+            bucket = self._cells.get(cell)
+            if bucket is None:
+                bucket = self._cells[cell] = _Bucket()
+            bucket.points[key] = (latitude, longitude)
+            bucket.changed()
+            self._points[key] = cell
+
+    def remove(self, key: str) -> bool:
+        """Remove a point; returns False if it was not indexed"""
+        with self._lock:
+            cell = self._points.pop(key, None)
+            if cell is None:
+                return False
+            self._discard(key, cell)
+            return True
+
+    def _discard(self, key: str, cell: Cell) -> None:
+        bucket = self._cells[cell]
+        del bucket.points[key]
+        if bucket.points:
+            bucket.changed()
+        else:
+            del self._cells[cell]
+
+    def within(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        limit: Optional[int] = None,
+        predicate: Optional[Callable[[str], bool]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Find points within radius_km of a position
+
+        Args:
+            latitude: Query latitude
+            longitude: Query longitude
+            radius_km: Search radius in kilometers
+            limit: Return at most this many points
+            predicate: Only keep keys for which this returns True
+
+        Returns:
+            (key, distance in km) pairs, nearest first
+        """
+        dlat = radius_km / KM_PER_DEGREE
+        # Longitude degrees shrink toward the poles; size the box for the
+        # highest latitude it reaches
+        cos_max = math.cos(math.radians(min(90.0, abs(latitude) + dlat)))
+        dlon = radius_km / (KM_PER_DEGREE * cos_max) if cos_max > 1e-9 else 360.0
+
+        row_lo = math.floor((latitude - dlat) / self._cell_deg)
+        row_hi = math.floor((latitude + dlat) / self._cell_deg)
+        col_lo = math.floor((longitude - dlon) / self._cell_deg)
+        col_hi = math.floor((longitude + dlon) / self._cell_deg)
+        wraps = longitude - dlon < -180 or longitude + dlon > 180
+
+        with self._lock:
+            cells = self._cells
+            if wraps or (row_hi - row_lo + 1) * (col_hi - col_lo + 1) > len(cells):
+                buckets = [
+                    bucket
+                    for (row, col), bucket in cells.items()
+                    if row_lo <= row <= row_hi and (wraps or col_lo <= col <= col_hi)
+                ]
+            else:
+                buckets = [
+                    cells[(row, col)]
+                    for row in range(row_lo, row_hi + 1)
+                    for col in range(col_lo, col_hi + 1)
+                    if (row, col) in cells
+                ]
+            if not buckets:
+                return []
+            parts = [bucket.arrays() for bucket in buckets]
+
+        keys, distances = _distances(parts, latitude, longitude)
+        inside = np.flatnonzero(distances <= radius_km)
+        inside = inside[np.argsort(distances[inside], kind="stable")]
+
+        found = []
+        for i, distance in zip(inside.tolist(), distances[inside].tolist()):
+            key = keys[i]
+            if predicate is None or predicate(key):
+                found.append((key, distance))
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 1,
+        max_km: Optional[float] = None,
+        predicate: Optional[Callable[[str], bool]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the k points closest to a position
+
+        The 3×3 block of cells around the query's cell is searched first,
+        then one ring of cells further out at a time, each cell once, until every unvisited cell is farther away than the
+        k-th match, or than max_km (default: half the Earth's circumference)
+        while fewer than k matched. Once the next ring would probe more cells
+        than the index holds, the remaining cells are scanned in one pass.
+        The predicate is only called for points that would make the k
+        nearest so far.
+
+        Returns:
+            Up to k (key, distance in km) pairs, nearest first
+        """
+        limit_km = max_km if max_km is not None else math.pi * EARTH_RADIUS_KM
+        row, col = self._cell(latitude, longitude)
+        found: Dict[str, float] = {}
+        kept: List[float] = []  # Negated distances of the k nearest so far
+        probed = 0  # Cell lookups made so far
+        inner, ring = 0, 1  # Rings searched in this step
+        while True:
+            size = (2 * ring + 1) ** 2 - max(0, 2 * inner - 1) ** 2
+            with self._lock:
+                cells = self._cells
+                last = probed + size > len(cells)
+                if last:
+                    buckets = [
+                        bucket
+                        for (r, c), bucket in cells.items()
+                        if max(abs(r - row), abs(c - col)) >= inner
+                    ]
+                else:
+                    buckets = [
+                        cells[cell]
+                        for cell in _rings(row, col, inner, ring)
+                        if cell in cells
+                    ]
+                parts = [bucket.arrays() for bucket in buckets]
+            probed += size
+
+            if parts:
+                keys, distances = _distances(parts, latitude, longitude)
+                order = np.argsort(distances, kind="stable")
+                for i, distance in zip(order.tolist(), distances[order].tolist()):
+                    if distance > limit_km or (len(kept) >= k and distance >= -kept[0]):
+                        break
+                    key = keys[i]
+                    if key in found or (predicate is not None and not predicate(key)):
+                        continue
+                    found[key] = distance
+                    if len(kept) < k:
+                        heapq.heappush(kept, -distance)
+                    else:
+                        heapq.heappushpop(kept, -distance)
+            if last:
+                break
+            reach = -kept[0] if len(kept) >= k else limit_km
+            if self._gap_km(latitude, longitude, row, col, ring, reach) >= reach:
+                break
+            inner = ring = ring + 1
+        return sorted(found.items(), key=lambda item: item[1])[:k]
+
+    def _gap_km(
+        self,
+        latitude: float,
+        longitude: float,
+        row: int,
+        col: int,
+        ring: int,
+        reach: float,
+    ) -> float:
+        """Lower bound on the distance to unsearched points within reach km"""
+        cell_deg = self._cell_deg
+        south = (row - ring) * cell_deg
+        north = (row + ring + 1) * cell_deg
+        lat_gap = min(
+            latitude - south if south > -90 else math.inf,
+            north - latitude if north < 90 else math.inf,
+        )
+        # Going around the antimeridian is never longer than 180 - |longitude|
+        lon_gap = min(
+            longitude - (col - ring) * cell_deg,
+            (col + ring + 1) * cell_deg - longitude,
+            180.0 - abs(longitude),
+        )
+        # Longitude degrees are shortest at the highest latitude within reach
+        cos_max = math.cos(
+            math.radians(min(90.0, abs(latitude) + reach / KM_PER_DEGREE))
+        )
+        h = (
+            math.cos(math.radians(latitude))
+            * cos_max
+            * math.sin(math.radians(lon_gap) / 2) ** 2
+        )
+        lon_km = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+        return min(lat_gap * KM_PER_DEGREE, lon_km)
+
+
+def _rings(row: int, col: int, inner: int, outer: int) -> Iterator[Cell]:
+    """Cells between inner and outer rings around (row, col), both included
+
+    Ring n holds the cells whose row or column is n cells from (row, col)
+    and neither is further.
+    """
+    for ring in range(inner, outer + 1):
+        if ring == 0:
+            yield (row, col)
+            continue
+        for c in range(col - ring, col + ring + 1):
+            yield (row - ring, c)
+            yield (row + ring, c)
+        for r in range(row - ring + 1, row + ring):
+            yield (r, col - ring)
+            yield (r, col + ring)
+
+
+def _distances(
+    parts: Sequence[Arrays], latitude: float, longitude: float
+) -> Tuple[List[str], np.ndarray]:
+    """Keys of the given cell arrays and their haversine distances (km)"""
+    keys = list(chain.from_iterable(part[0] for part in parts))
+    lat, lon = np.concatenate([part[1] for part in parts], axis=1)
+    lat_q, lon_q = math.radians(latitude), math.radians(longitude)
+    h = (
+        np.sin((lat - lat_q) / 2) ** 2
+        + math.cos(lat_q) * np.cos(lat) * np.sin((lon - lon_q) / 2) ** 2
+    )
+    return keys, 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
@@ -0,0 +1,39 @@
+"""Keep a second worker process from serving the same data directory"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+
+@contextmanager
+def single_worker(data_dir: str) -> Iterator[None]:
+    """Hold an exclusive lock on ``worker.lock`` in data_dir while serving
+
+    The lock is released when the process exits, however it stops, so a
+    crashed worker never blocks the next start.
+
+    Raises:
+        RuntimeError: If another process holds the lock, e.g. a second
+            uvicorn worker started with ``--workers``
+    """
+    path = Path(data_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    with open(path / "worker.lock", "a") as lock_file:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise RuntimeError(
+                    f"Another process is already serving {path.resolve()}; "
+                    "the ROS mock supports a single worker"
+                ) from None
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -1,18 +1,37 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from src.config.settings import settings
+from src.utils.pagination import NEXT_CURSOR_HEADER
+from src.utils.serialization import JSONResponse
+from src.utils.storage_factory import close_storages
 from src.routes.wms_routes import router as wms_router
 from src.routes.package_routes import router as package_router
+from src.dependencies import get_package_service, get_wms_handler, registry
+from src.handlers.wms_handlers import WMSHandler
 from src.services.package_service import PackageService
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build and warm every service before serving, release them on shutdown"""
+    registry.start()
+    yield
+    registry.close()
+    close_storages()
+
+
 # Create FastAPI application
 app = FastAPI(
     title=settings.app_name,
     description="Warehouse Management System Mock Service for Swift Logistics - Package tracking from receipt to loading",
     version="2.0.0",
     redoc_url=None,  # Disable ReDoc, use Swagger UI only
+    lifespan=lifespan,
+    default_response_class=JSONResponse,
 )
 
 # Configure CORS
@@ -22,6 +41,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -48,19 +68,25 @@ async def root():
 
 
 @app.get("/health")
-async def health():
-    """Health check endpoint with package counts"""
-    package_service = PackageService()
-    
+async def health(
+    package_service: PackageService = Depends(get_package_service),
+    wms_handler: WMSHandler = Depends(get_wms_handler),
+):
+    """Health check endpoint with package and inventory counts"""
     return {
         "status": "healthy",
         "service": settings.app_name,
         "version": "2.0.0",
-        "package_count": len(package_service.storage.get_all())
+        "package_count": await package_service.storage.acount(),
+        "inventory_count": await wms_handler.storage.acount(),
     }
 
 
 if __name__ == "__main__":
     uvicorn.run(
-        "app:app", host=settings.host, port=settings.port, reload=settings.debug
+        "app:app",
+        host=settings.host,
+        port=settings.port,
+        reload=settings.debug and settings.workers == 1,
+        workers=settings.workers,
     )
@@ -0,0 +1,17 @@
+"""Shared service instances and the FastAPI dependencies that provide them"""
+
+from .handlers.wms_handlers import WMSHandler
+from .services.package_service import PackageService
+from .utils.service_registry import ServiceRegistry
+
+registry = ServiceRegistry()
+registry.register(WMSHandler, WMSHandler)
+registry.register(PackageService, PackageService)
+
+
+async def get_wms_handler() -> WMSHandler:
+    return registry.get(WMSHandler)
+
+
+async def get_package_service() -> PackageService:
+    return registry.get(PackageService)
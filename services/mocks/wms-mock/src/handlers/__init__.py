@@ -1,5 +1,5 @@
 """Handlers Module"""
 
-from .wms_handlers import wms_handler
+from .wms_handlers import WMSHandler
 
-__all__ = ["wms_handler"]
+__all__ = ["WMSHandler"]
@@ -9,7 +9,7 @@ from ..models.schemas import (
     InventoryStatus,
     WarehouseLocation,
 )
-from ..utils.file_storage import FileStorage
+from ..utils.storage_factory import create_storage
 
 
 class WMSHandler:
@@ -18,13 +18,14 @@ class WMSHandler:
     def __init__(self):
         # Initialize file storage
         data_dir = os.path.join(os.path.dirname(__file__), "../../data")
-        self.storage = FileStorage(data_dir, "inventory")
+        # SKUs are looked up for every order line item, so keep a unique index
+        self.storage = create_storage(data_dir, "inventory", unique_indexes=("sku",))
         self._initialize_mock_data()
 
     def _initialize_mock_data(self):
         """Initialize with some mock inventory if file is empty"""
         # Only initialize if storage is empty
-        if not self.storage.get_all():
+        if not self.storage.count():
             mock_items = [
                 {
                     "sku": "PROD-001",
@@ -98,26 +99,26 @@ class WMSHandler:
 
             self.storage.initialize_with_data(initial_data)
 
-    def get_all_inventory(self) -> List[Inventory]:
+    async def get_all_inventory(self) -> List[Inventory]:
         """Get all inventory items"""
-        inventory = self.storage.get_all()
+        inventory = await self.storage.aget_all()
         return [Inventory(**item) for item in inventory.values()]
 
-    def get_inventory_item(self, item_id: str) -> Optional[Inventory]:
+    async def get_inventory_item(self, item_id: str) -> Optional[Inventory]:
         """Get inventory item by ID"""
-        item = self.storage.get(item_id)
+        item = await self.storage.aget(item_id)
         return Inventory(**item) if item else None
 
-    def get_inventory_by_sku(self, sku: str) -> Optional[Inventory]:
+    async def get_inventory_by_sku(self, sku: str) -> Optional[Inventory]:
         """Get inventory item by SKU"""
-        inventory = self.storage.get_all()
-        for item in inventory.values():
-            if item["sku"] == sku:
-                return Inventory(**item)
-        return None
-
-    def create_inventory_item(self, item_data: InventoryCreate) -> Inventory:
-        """Create new inventory item"""
+        item = await self.storage.afind_one("sku", sku)
+        return Inventory(**item) if item else None
+
+    async def create_inventory_item(self, item_data: InventoryCreate) -> Inventory:
+        """Create new inventory item
+
+        Raises DuplicateKeyError if an item with the same SKU already exists.
+        """
         item_id = str(uuid.uuid4())
         now = datetime.now().isoformat()
 
@@ -136,51 +137,62 @@ class WMSHandler:
             "updated_at": now,
         }
 
-        self.storage.create(item_id, item)
+        await self.storage.acreate(item_id, item)
         return Inventory(**item)
 
-    def update_inventory_item(
+    async def update_inventory_item(
         self, item_id: str, item_data: InventoryUpdate
     ) -> Optional[Inventory]:
         """Update existing inventory item"""
-        item = self.storage.get(item_id)
-        if not item:
-            return None
-
         update_data = item_data.model_dump(exclude_unset=True)
-        item.update(update_data)
-        item["updated_at"] = datetime.now().isoformat()
+        update_data["updated_at"] = datetime.now().isoformat()
 
         # Auto-update status based on quantity if quantity was updated
         if "quantity" in update_data:
-            quantity = item["quantity"]
-            if quantity == 0:
-                item["status"] = InventoryStatus.OUT_OF_STOCK
+            if update_data["quantity"] == 0:
+                update_data["status"] = InventoryStatus.OUT_OF_STOCK
             elif "status" not in update_data:
-                item["status"] = InventoryStatus.AVAILABLE
+                update_data["status"] = InventoryStatus.AVAILABLE
 
-        self.storage.update(item_id, item)
+        item = await self.storage.aupdate_with(
+            item_id, lambda existing: {**existing, **update_data}
+        )
+        if not item:
+            return None
         return Inventory(**item)
 
-    def delete_inventory_item(self, item_id: str) -> bool:
+    async def delete_inventory_item(self, item_id: str) -> bool:
         """Delete inventory item"""
-        return self.storage.delete(item_id)
+        return await self.storage.adelete(item_id)
 
-    def check_stock_level(self, sku: str) -> dict:
-        """Check if item needs reordering"""
-        item = self.get_inventory_by_sku(sku)
-        if not item:
-            return {"error": "Item not found"}
-
-        needs_reorder = item.quantity <= (item.reorder_level or 0)
+    def _stock_level(self, sku: str, item: dict) -> dict:
+        """Build the stock level report for a stored inventory item"""
+        quantity = item["quantity"]
+        reorder_level = item.get("reorder_level")
         return {
             "sku": sku,
-            "quantity": item.quantity,
-            "reorder_level": item.reorder_level,
-            "needs_reorder": needs_reorder,
-            "status": item.status,
+            "quantity": quantity,
+            "reorder_level": reorder_level,
+            "needs_reorder": quantity <= (reorder_level or 0),
+            "status": item.get("status", InventoryStatus.AVAILABLE),
         }
 
-
-# Singleton instance
-wms_handler = WMSHandler()
+    async def check_stock_level(self, sku: str) -> dict:
+        """Check if item needs reordering"""
+        item = await self.storage.afind_one("sku", sku)
+        if not item:
+            return {"error": "Item not found"}
+        return self._stock_level(sku, item)
+
+    async def check_stock_levels(self, skus: List[str]) -> List[dict]:
+        """Check stock levels for many SKUs with a single index lookup pass
+
+        Results are returned in request order; unknown SKUs get an error entry.
+        """
+        items = await self.storage.afind_many("sku", skus)
+        return [
+            self._stock_level(sku, items[sku])
+            if sku in items
+            else {"sku": sku, "error": "Item not found"}
+            for sku in skus
+        ]
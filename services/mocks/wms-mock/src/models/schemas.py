@@ -3,6 +3,8 @@ from typing import Optional, List
 from datetime import datetime
 from enum import Enum
 
+from ..config.settings import settings
+
 
 class InventoryStatus(str, Enum):
     AVAILABLE = "available"
@@ -94,6 +96,47 @@ class Package(BaseModel):
         from_attributes = True
 
 
+# Bulk dock operations
+class BulkPackageRequest(BaseModel):
+    package_ids: List[str] = Field(
+        default_factory=list, max_length=settings.bulk_max_items
+    )
+    tracking_numbers: List[str] = Field(
+        default_factory=list, max_length=settings.bulk_max_items
+    )
+    notes: Optional[str] = None
+    all_or_nothing: bool = False  # Apply nothing if any item fails
+
+
+class BulkInspectRequest(BulkPackageRequest):
+    condition: PackageCondition
+
+
+class BulkStoreRequest(BulkPackageRequest):
+    location: PackageLocation
+
+
+class BulkLoadRequest(BulkPackageRequest):
+    vehicle_id: str
+    driver_id: str
+
+
+class BulkPackageResult(BaseModel):
+    identifier: str  # Package ID or tracking number as sent
+    package_id: Optional[str] = None
+    success: bool
+    package: Optional[Package] = None
+    error: Optional[str] = None
+
+
+class BulkPackageResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    applied: bool  # Whether any changes were saved
+    results: List[BulkPackageResult]
+
+
 class WarehouseLocation(BaseModel):
     warehouse_id: str
     zone: Optional[str] = None
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 from enum import Enum
 
 from ..models.schemas import (
+    BulkInspectRequest,
+    BulkLoadRequest,
+    BulkPackageRequest,
+    BulkPackageResponse,
+    BulkStoreRequest,
     Package,
     PackageCreate,
     PackageUpdate,
@@ -13,9 +19,19 @@ from ..models.schemas import (
     PackageLocation,
 )
 from ..services.package_service import PackageService
+from ..utils.file_storage import DuplicateKeyError
+from ..utils.fast_reads import RecordListSerializer
+from ..utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    NDJSON_MEDIA_TYPE,
+    InvalidCursorError,
+)
+from ..dependencies import get_package_service
 
 router = APIRouter(prefix="/api/packages", tags=["Packages"])
-package_service = PackageService()
+package_records = RecordListSerializer(Package)
 
 
 class RouteStatus(str, Enum):
@@ -126,22 +142,57 @@ class OptimizedRoute(BaseModel):
 
 @router.get("/", response_model=List[Package])
 async def get_all_packages(
+    response: Response,
     status: Optional[PackageStatus] = Query(
         None, description="Filter by package status"
     ),
     client_id: Optional[str] = Query(None, description="Filter by client ID"),
     order_id: Optional[str] = Query(None, description="Filter by order ID"),
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+    ),
+    cursor: Optional[str] = Query(
+        None, description=f"Cursor from the previous page's {NEXT_CURSOR_HEADER} header"
+    ),
+    package_service: PackageService = Depends(get_package_service),
 ):
-    """Get all packages with optional filtering"""
-    return package_service.get_all_packages(
-        status=status, client_id=client_id, order_id=order_id
+    """Get packages with optional filtering, one page at a time (oldest first)"""
+    try:
+        packages, next_cursor = await package_service.get_package_records_page(
+            limit, cursor, status=status, client_id=client_id, order_id=order_id
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return package_records.respond(packages, response)
+
+
+@router.get("/export")
+async def export_packages(
+    status: Optional[PackageStatus] = Query(
+        None, description="Filter by package status"
+    ),
+    client_id: Optional[str] = Query(None, description="Filter by client ID"),
+    order_id: Optional[str] = Query(None, description="Filter by order ID"),
+    package_service: PackageService = Depends(get_package_service),
+):
+    """Stream all matching packages as newline-delimited JSON"""
+    return StreamingResponse(
+        package_service.export_packages(
+            status=status, client_id=client_id, order_id=order_id
+        ),
+        media_type=NDJSON_MEDIA_TYPE,
     )
 
 
 @router.get("/{package_id}", response_model=Package)
-async def get_package(package_id: str):
+async def get_package(
+    package_id: str,
+    package_service: PackageService = Depends(get_package_service),
+):
     """Get a specific package by ID"""
-    package = package_service.get_package(package_id)
+    package = await package_service.get_package(package_id)
     if not package:
         raise HTTPException(
             status_code=404, detail=f"Package with ID {package_id} not found"
@@ -150,9 +201,12 @@ async def get_package(package_id: str):
 
 
 @router.get("/tracking/{tracking_number}", response_model=Package)
-async def get_package_by_tracking(tracking_number: str):
+async def get_package_by_tracking(
+    tracking_number: str,
+    package_service: PackageService = Depends(get_package_service),
+):
     """Get a package by tracking number"""
-    package = package_service.get_package_by_tracking(tracking_number)
+    package = await package_service.get_package_by_tracking(tracking_number)
     if not package:
         raise HTTPException(
             status_code=404,
@@ -162,15 +216,28 @@ async def get_package_by_tracking(tracking_number: str):
 
 
 @router.post("/", response_model=Package, status_code=201)
-async def create_package(package: PackageCreate):
+async def create_package(
+    package: PackageCreate,
+    package_service: PackageService = Depends(get_package_service),
+):
     """Create a new package (receive from client)"""
-    return package_service.create_package(package)
+    try:
+        return await package_service.create_package(package)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Package with tracking number {package.tracking_number} already exists",
+        )
 
 
 @router.put("/{package_id}", response_model=Package)
-async def update_package(package_id: str, package: PackageUpdate):
+async def update_package(
+    package_id: str,
+    package: PackageUpdate,
+    package_service: PackageService = Depends(get_package_service),
+):
     """Update an existing package"""
-    updated_package = package_service.update_package(package_id, package)
+    updated_package = await package_service.update_package(package_id, package)
     if not updated_package:
         raise HTTPException(
             status_code=404, detail=f"Package with ID {package_id} not found"
@@ -179,14 +246,55 @@ async def update_package(package_id: str, package: PackageUpdate):
 
 
 @router.delete("/{package_id}", status_code=204)
-async def delete_package(package_id: str):
+async def delete_package(
+    package_id: str,
+    package_service: PackageService = Depends(get_package_service),
+):
     """Delete a package"""
-    if not package_service.delete_package(package_id):
+    if not await package_service.delete_package(package_id):
         raise HTTPException(
             status_code=404, detail=f"Package with ID {package_id} not found"
         )
 
 
+# Bulk routes are registered before /{package_id}/... so "bulk" is not
+# taken for a package ID
+@router.post("/bulk/inspect", response_model=BulkPackageResponse)
+async def bulk_inspect_packages(
+    request: BulkInspectRequest,
+    package_service: PackageService = Depends(get_package_service),
+):
+    """Inspect a batch of packages in one request"""
+    return await package_service.bulk_inspect_packages(request)
+
+
+@router.post("/bulk/store", response_model=BulkPackageResponse)
+async def bulk_store_packages(
+    request: BulkStoreRequest,
+    package_service: PackageService = Depends(get_package_service),
+):
+    """Store a batch of packages in one warehouse location"""
+    return await package_service.bulk_store_packages(request)
+
+
+@router.post("/bulk/pick", response_model=BulkPackageResponse)
+async def bulk_pick_packages(
+    request: BulkPackageRequest,
+    package_service: PackageService = Depends(get_package_service),
+):
+    """Pick a batch of packages for delivery preparation"""
+    return await package_service.bulk_pick_packages(request)
+
+
+@router.post("/bulk/load", response_model=BulkPackageResponse)
+async def bulk_load_packages(
+    request: BulkLoadRequest,
+    package_service: PackageService = Depends(get_package_service),
+):
+    """Load a batch of packages onto one vehicle"""
+    return await package_service.bulk_load_packages(request)
+
+
 @router.post("/{package_id}/inspect", response_model=Package)
 async def inspect_package(
     package_id: str,
@@ -194,9 +302,10 @@ async def inspect_package(
         ..., description="Package condition after inspection"
     ),
     notes: Optional[str] = Query(None, description="Inspection notes"),
+    package_service: PackageService = Depends(get_package_service),
 ):
     """Inspect a package (quality check)"""
-    package = package_service.inspect_package(package_id, condition, notes)
+    package = await package_service.inspect_package(package_id, condition, notes)
     if not package:
         raise HTTPException(
             status_code=404, detail=f"Package with ID {package_id} not found"
@@ -205,9 +314,13 @@ async def inspect_package(
 
 
 @router.post("/{package_id}/store", response_model=Package)
-async def store_package(package_id: str, location: PackageLocation):
+async def store_package(
+    package_id: str,
+    location: PackageLocation,
+    package_service: PackageService = Depends(get_package_service),
+):
     """Store package in warehouse location"""
-    package = package_service.store_package(package_id, location.model_dump())
+    package = await package_service.store_package(package_id, location.model_dump())
     if not package:
         raise HTTPException(
             status_code=404, detail=f"Package with ID {package_id} not found"
@@ -217,10 +330,12 @@ async def store_package(package_id: str, location: PackageLocation):
 
 @router.post("/{package_id}/pick", response_model=Package)
 async def pick_package(
-    package_id: str, notes: Optional[str] = Query(None, description="Pick notes")
+    package_id: str,
+    notes: Optional[str] = Query(None, description="Pick notes"),
+    package_service: PackageService = Depends(get_package_service),
 ):
     """Pick package for delivery preparation"""
-    package = package_service.pick_package(package_id, notes)
+    package = await package_service.pick_package(package_id, notes)
     if not package:
         raise HTTPException(
             status_code=404, detail=f"Package with ID {package_id} not found"
@@ -234,9 +349,12 @@ async def load_package(
     vehicle_id: str = Query(..., description="Vehicle ID"),
     driver_id: str = Query(..., description="Driver ID"),
     notes: Optional[str] = Query(None, description="Loading notes"),
+    package_service: PackageService = Depends(get_package_service),
 ):
     """Load package onto vehicle for delivery"""
-    package = package_service.load_package(package_id, vehicle_id, driver_id, notes)
+    package = await package_service.load_package(
+        package_id, vehicle_id, driver_id, notes
+    )
     if not package:
         raise HTTPException(
             status_code=404, detail=f"Package with ID {package_id} not found"
@@ -245,6 +363,24 @@ async def load_package(
 
 
 @router.get("/status/{status}", response_model=List[Package])
-async def get_packages_by_status(status: PackageStatus):
-    """Get all packages with a specific status"""
-    return package_service.get_packages_by_status(status)
+async def get_packages_by_status(
+    status: PackageStatus,
+    response: Response,
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+    ),
+    cursor: Optional[str] = Query(
+        None, description=f"Cursor from the previous page's {NEXT_CURSOR_HEADER} header"
+    ),
+    package_service: PackageService = Depends(get_package_service),
+):
+    """Get packages with a specific status, one page at a time (oldest first)"""
+    try:
+        packages, next_cursor = await package_service.get_package_records_page(
+            limit, cursor, status=status
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return package_records.respond(packages, response)
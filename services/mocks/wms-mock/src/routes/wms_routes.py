@@ -1,23 +1,28 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Optional
 from ..models.schemas import Inventory, InventoryCreate, InventoryUpdate, ErrorResponse
-from ..handlers.wms_handlers import wms_handler
+from ..handlers.wms_handlers import WMSHandler
+from ..utils.file_storage import DuplicateKeyError
+from ..dependencies import get_wms_handler
 
 router = APIRouter(prefix="/api/inventory", tags=["inventory"])
 
 
 @router.get("/", response_model=List[Inventory])
-async def get_all_inventory():
+async def get_all_inventory(wms_handler: WMSHandler = Depends(get_wms_handler)):
     """Get all inventory items"""
-    return wms_handler.get_all_inventory()
+    return await wms_handler.get_all_inventory()
 
 
 @router.get(
     "/{item_id}", response_model=Inventory, responses={404: {"model": ErrorResponse}}
 )
-async def get_inventory_item(item_id: str):
+async def get_inventory_item(
+    item_id: str,
+    wms_handler: WMSHandler = Depends(get_wms_handler),
+):
     """Get inventory item by ID"""
-    item = wms_handler.get_inventory_item(item_id)
+    item = await wms_handler.get_inventory_item(item_id)
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -29,9 +34,12 @@ async def get_inventory_item(item_id: str):
 @router.get(
     "/sku/{sku}", response_model=Inventory, responses={404: {"model": ErrorResponse}}
 )
-async def get_inventory_by_sku(sku: str):
+async def get_inventory_by_sku(
+    sku: str,
+    wms_handler: WMSHandler = Depends(get_wms_handler),
+):
     """Get inventory item by SKU"""
-    item = wms_handler.get_inventory_by_sku(sku)
+    item = await wms_handler.get_inventory_by_sku(sku)
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -41,17 +49,30 @@ async def get_inventory_by_sku(sku: str):
 
 
 @router.post("/", response_model=Inventory, status_code=status.HTTP_201_CREATED)
-async def create_inventory_item(item: InventoryCreate):
+async def create_inventory_item(
+    item: InventoryCreate,
+    wms_handler: WMSHandler = Depends(get_wms_handler),
+):
     """Create new inventory item"""
-    return wms_handler.create_inventory_item(item)
+    try:
+        return await wms_handler.create_inventory_item(item)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Inventory item with SKU {item.sku} already exists",
+        )
 
 
 @router.put(
     "/{item_id}", response_model=Inventory, responses={404: {"model": ErrorResponse}}
 )
-async def update_inventory_item(item_id: str, item: InventoryUpdate):
+async def update_inventory_item(
+    item_id: str,
+    item: InventoryUpdate,
+    wms_handler: WMSHandler = Depends(get_wms_handler),
+):
     """Update existing inventory item"""
-    updated_item = wms_handler.update_inventory_item(item_id, item)
+    updated_item = await wms_handler.update_inventory_item(item_id, item)
     if not updated_item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -61,9 +82,12 @@ async def update_inventory_item(item_id: str, item: InventoryUpdate):
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_inventory_item(item_id: str):
+async def delete_inventory_item(
+    item_id: str,
+    wms_handler: WMSHandler = Depends(get_wms_handler),
+):
     """Delete inventory item"""
-    success = wms_handler.delete_inventory_item(item_id)
+    success = await wms_handler.delete_inventory_item(item_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -73,9 +97,12 @@ async def delete_inventory_item(item_id: str):
 
 
 @router.get("/check-stock/{sku}")
-async def check_stock_level(sku: str):
+async def check_stock_level(
+    sku: str,
+    wms_handler: WMSHandler = Depends(get_wms_handler),
+):
     """Check stock level and reorder status"""
-    result = wms_handler.check_stock_level(sku)
+    result = await wms_handler.check_stock_level(sku)
     if "error" in result:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=result["error"]
@@ -83,11 +110,11 @@ async def check_stock_level(sku: str):
     return result
 
 
-@router.get("/health", tags=["health"])
-async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "WMS Mock Service",
-        "total_items": len(wms_handler.storage.get_all()),
-    }
+@router.post("/check-stock")
+async def check_stock_levels(
+    skus: List[str],
+    wms_handler: WMSHandler = Depends(get_wms_handler),
+):
+    """Check stock levels for all line items of an order in one call"""
+    return await wms_handler.check_stock_levels(skus)
+
@@ -1,9 +1,17 @@
-from typing import List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 import uuid
 
-from ..utils.file_storage import FileStorage
+from ..utils.pagination import afetch_page, iter_ndjson
+from ..utils.sequence import create_sequence
+from ..utils.storage_factory import create_storage
 from ..models.schemas import (
+    BulkInspectRequest,
+    BulkLoadRequest,
+    BulkPackageRequest,
+    BulkPackageResponse,
+    BulkPackageResult,
+    BulkStoreRequest,
     Package,
     PackageCreate,
     PackageUpdate,
@@ -14,13 +22,25 @@ from ..models.schemas import (
 
 
 class PackageService:
+    # Fields the package lists filter on; kept as storage secondary indexes
+    INDEXED_FIELDS = ("status", "client_id", "order_id")
+
     def __init__(self):
-        self.storage = FileStorage(data_dir="data", filename="packages")
+        # tracking_number is the customer-facing lookup key, so it is kept in a
+        # persistent unique index instead of being found by scanning
+        self.storage = create_storage(
+            data_dir="data",
+            filename="packages",
+            indexes=self.INDEXED_FIELDS,
+            unique_indexes=("tracking_number",),
+        )
         self._init_mock_data()
-        self.tracking_counter = self._get_next_tracking_number()
+        self.tracking_numbers = create_sequence(
+            "data", "tracking_number", self._get_next_tracking_number
+        )
 
     def _get_next_tracking_number(self) -> int:
-        """Get the next tracking number"""
+        """Get the next tracking number from existing packages (new sequences)"""
         packages = self.storage.get_all()
         if not packages:
             return 100001
@@ -36,11 +56,9 @@ class PackageService:
                 pass
         return max_num + 1
 
-    def _generate_tracking_number(self) -> str:
+    async def _generate_tracking_number(self) -> str:
         """Generate tracking number: SLNNNNNN"""
-        tracking_num = f"SL{self.tracking_counter:06d}"
-        self.tracking_counter += 1
-        return tracking_num
+        return f"SL{await self.tracking_numbers.anext():06d}"
 
     def _add_event(
         self, events: List[dict], event_type: str, notes: Optional[str] = None
@@ -58,7 +76,7 @@ class PackageService:
 
     def _init_mock_data(self):
         """Initialize with sample packages"""
-        if not self.storage.get_all():
+        if not self.storage.count():
             # Package 1 - Ready for delivery
             pkg1_id = str(uuid.uuid4())
             pkg1 = {
@@ -149,11 +167,14 @@ class PackageService:
             self.storage.create(pkg1_id, pkg1)
             self.storage.create(pkg2_id, pkg2)
 
-    def create_package(self, package_data: PackageCreate) -> Package:
-        """Create a new package (receive from client)"""
+    async def create_package(self, package_data: PackageCreate) -> Package:
+        """Create a new package (receive from client)
+
+        Raises DuplicateKeyError if the tracking number is already in use.
+        """
         package_id = str(uuid.uuid4())
         tracking_number = (
-            package_data.tracking_number or self._generate_tracking_number()
+            package_data.tracking_number or await self._generate_tracking_number()
         )
 
         now = datetime.now().isoformat()
@@ -187,51 +208,76 @@ class PackageService:
             "updated_at": now,
         }
 
-        self.storage.create(package_id, package_dict)
+        await self.storage.acreate(package_id, package_dict)
         return Package(**package_dict)
 
-    def get_package(self, package_id: str) -> Optional[Package]:
+    async def get_package(self, package_id: str) -> Optional[Package]:
         """Get a specific package by ID"""
-        package_data = self.storage.get(package_id)
+        package_data = await self.storage.aget(package_id)
         if package_data:
             return Package(**package_data)
         return None
 
-    def get_package_by_tracking(self, tracking_number: str) -> Optional[Package]:
+    async def get_package_by_tracking(self, tracking_number: str) -> Optional[Package]:
         """Get a package by tracking number"""
-        packages = self.storage.get_all()
-        for package in packages.values():
-            if package.get("tracking_number") == tracking_number:
-                return Package(**package)
+        package_data = await self.storage.afind_one("tracking_number", tracking_number)
+        if package_data:
+            return Package(**package_data)
         return None
 
-    def get_all_packages(
+    async def get_all_packages(
         self,
         status: Optional[PackageStatus] = None,
         client_id: Optional[str] = None,
         order_id: Optional[str] = None,
     ) -> List[Package]:
         """Get all packages with optional filtering"""
-        packages = self.storage.get_all()
-        package_list = [Package(**pkg) for pkg in packages.values()]
-
-        if status:
-            package_list = [p for p in package_list if p.status == status]
-        if client_id:
-            package_list = [p for p in package_list if p.client_id == client_id]
-        if order_id:
-            package_list = [p for p in package_list if p.order_id == order_id]
-
-        return package_list
+        # Only matching records are loaded and validated
+        packages = await self.storage.afind(
+            **self._filters(status, client_id, order_id)
+        )
+        return [Package(**package) for package in packages.values()]
+
+    @staticmethod
+    def _filters(
+        status: Optional[PackageStatus],
+        client_id: Optional[str],
+        order_id: Optional[str],
+    ) -> dict:
+        """Map the list filters onto record fields, dropping unset ones"""
+        filters = {"status": status, "client_id": client_id, "order_id": order_id}
+        return {field: value for field, value in filters.items() if value}
+
+    async def get_package_records_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[PackageStatus] = None,
+        client_id: Optional[str] = None,
+        order_id: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of stored package records, oldest first, and the next cursor
 
-    def update_package(
-        self, package_id: str, package_update: PackageUpdate
-    ) -> Optional[Package]:
-        """Update a package"""
-        existing_package = self.storage.get(package_id)
-        if not existing_package:
-            return None
+        Records are returned as stored, without building Package models.
+        """
+        packages, next_cursor = await afetch_page(
+            self.storage, limit, cursor, **self._filters(status, client_id, order_id)
+        )
+        return packages, next_cursor
 
+    def export_packages(
+        self,
+        status: Optional[PackageStatus] = None,
+        client_id: Optional[str] = None,
+        order_id: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        """Stream matching packages as NDJSON lines, oldest first"""
+        return iter_ndjson(self.storage, **self._filters(status, client_id, order_id))
+
+    def _apply_update(
+        self, existing_package: dict, package_update: PackageUpdate
+    ) -> dict:
+        """Return the package record with an update applied"""
         update_data = package_update.model_dump(exclude_unset=True)
         update_data["updated_at"] = datetime.now().isoformat()
 
@@ -243,41 +289,50 @@ class PackageService:
             )
             update_data["events"] = events
 
-        updated_package = {**existing_package, **update_data}
-        self.storage.update(package_id, updated_package)
+        return {**existing_package, **update_data}
+
+    async def update_package(
+        self, package_id: str, package_update: PackageUpdate
+    ) -> Optional[Package]:
+        """Update a package"""
+        updated_package = await self.storage.aupdate_with(
+            package_id, lambda existing: self._apply_update(existing, package_update)
+        )
+        if updated_package is None:
+            return None
 
         return Package(**updated_package)
 
-    def delete_package(self, package_id: str) -> bool:
+    async def delete_package(self, package_id: str) -> bool:
         """Delete a package"""
-        return self.storage.delete(package_id)
+        return await self.storage.adelete(package_id)
 
-    def inspect_package(
+    async def inspect_package(
         self, package_id: str, condition: PackageCondition, notes: Optional[str] = None
     ) -> Optional[Package]:
         """Mark package as inspected"""
         update = PackageUpdate(
             status=PackageStatus.INSPECTED, condition=condition, notes=notes
         )
-        return self.update_package(package_id, update)
+        return await self.update_package(package_id, update)
 
-    def store_package(
+    async def store_package(
         self, package_id: str, location: dict, notes: Optional[str] = None
     ) -> Optional[Package]:
         """Store package in warehouse location"""
         update = PackageUpdate(
             status=PackageStatus.STORED, location=location, notes=notes
         )
-        return self.update_package(package_id, update)
+        return await self.update_package(package_id, update)
 
-    def pick_package(
+    async def pick_package(
         self, package_id: str, notes: Optional[str] = None
     ) -> Optional[Package]:
         """Pick package for delivery preparation"""
         update = PackageUpdate(status=PackageStatus.PICKED, notes=notes)
-        return self.update_package(package_id, update)
+        return await self.update_package(package_id, update)
 
-    def load_package(
+    async def load_package(
         self,
         package_id: str,
         vehicle_id: str,
@@ -285,11 +340,23 @@ class PackageService:
         notes: Optional[str] = None,
     ) -> Optional[Package]:
         """Load package onto vehicle"""
-        now = datetime.now().isoformat()
-
-        existing = self.storage.get(package_id)
-        if not existing:
+        loaded = await self.storage.aupdate_with(
+            package_id,
+            lambda existing: self._apply_load(existing, vehicle_id, driver_id, notes),
+        )
+        if loaded is None:
             return None
+        return Package(**loaded)
+
+    def _apply_load(
+        self,
+        existing: dict,
+        vehicle_id: str,
+        driver_id: str,
+        notes: Optional[str] = None,
+    ) -> dict:
+        """Return the package record marked as loaded onto a vehicle"""
+        now = datetime.now().isoformat()
 
         existing["status"] = PackageStatus.LOADED
         existing["assigned_vehicle_id"] = vehicle_id
@@ -303,10 +370,111 @@ class PackageService:
             events, "loaded", notes or f"Loaded to vehicle {vehicle_id}"
         )
         existing["events"] = events
+        return existing
+
+    async def _bulk_apply(
+        self, request: BulkPackageRequest, change: Callable[[dict], dict]
+    ) -> BulkPackageResponse:
+        """Apply a change to a batch of packages and save them in one write
+
+        Items that are unknown or listed twice fail on their own. With
+        all_or_nothing set, any failure means nothing is saved.
+        """
+        # Only IDs are taken from the lookup; the records themselves are read
+        # again under the write lock
+        by_tracking = await self.storage.afind_many(
+            "tracking_number", request.tracking_numbers
+        )
+        lookups = [(pid, pid) for pid in request.package_ids] + [
+            (number, by_tracking[number]["id"] if number in by_tracking else None)
+            for number in request.tracking_numbers
+        ]
+        results: List[BulkPackageResult] = []
+
+        def apply(records: Dict[str, dict]) -> Dict[str, dict]:
+            updates = {}
+            for identifier, package_id in lookups:
+                if package_id not in records:
+                    result = BulkPackageResult(
+                        identifier=identifier, success=False, error="Package not found"
+                    )
+                elif package_id in updates:
+                    result = BulkPackageResult(
+                        identifier=identifier,
+                        package_id=package_id,
+                        success=False,
+                        error="Package listed more than once",
+                    )
+                else:
+                    updates[package_id] = change(records[package_id])
+                    result = BulkPackageResult(
+                        identifier=identifier, package_id=package_id, success=True
+                    )
+                results.append(result)
+
+            if request.all_or_nothing and any(not r.success for r in results):
+                for result in results:
+                    if result.success:
+                        result.success = False
+                        result.error = "Not applied: another item in the batch failed"
+                return {}
+            return updates
+
+        saved = await self.storage.aupdate_many_with(
+            {package_id for _, package_id in lookups if package_id is not None},
+            apply,
+        )
+        for result in results:
+            if result.success:
+                result.package = Package(**saved[result.package_id])
+
+        succeeded = sum(1 for r in results if r.success)
+        return BulkPackageResponse(
+            total=len(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            applied=succeeded > 0,
+            results=results,
+        )
 
-        self.storage.update(package_id, existing)
-        return Package(**existing)
+    async def bulk_inspect_packages(
+        self, request: BulkInspectRequest
+    ) -> BulkPackageResponse:
+        """Mark a batch of packages as inspected"""
+        update = PackageUpdate(
+            status=PackageStatus.INSPECTED,
+            condition=request.condition,
+            notes=request.notes,
+        )
+        return await self._bulk_apply(
+            request, lambda pkg: self._apply_update(pkg, update)
+        )
 
-    def get_packages_by_status(self, status: PackageStatus) -> List[Package]:
-        """Get packages by status"""
-        return self.get_all_packages(status=status)
+    async def bulk_store_packages(
+        self, request: BulkStoreRequest
+    ) -> BulkPackageResponse:
+        """Store a batch of packages in one warehouse location"""
+        update = PackageUpdate(
+            status=PackageStatus.STORED, location=request.location, notes=request.notes
+        )
+        return await self._bulk_apply(
+            request, lambda pkg: self._apply_update(pkg, update)
+        )
+
+    async def bulk_pick_packages(
+        self, request: BulkPackageRequest
+    ) -> BulkPackageResponse:
+        """Pick a batch of packages for delivery preparation"""
+        update = PackageUpdate(status=PackageStatus.PICKED, notes=request.notes)
+        return await self._bulk_apply(
+            request, lambda pkg: self._apply_update(pkg, update)
+        )
+
+    async def bulk_load_packages(self, request: BulkLoadRequest) -> BulkPackageResponse:
+        """Load a batch of packages onto one vehicle"""
+        return await self._bulk_apply(
+            request,
+            lambda pkg: self._apply_load(
+                pkg, request.vehicle_id, request.driver_id, request.notes
+            ),
+        )
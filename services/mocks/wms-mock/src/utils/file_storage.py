@@ -1,98 +1,896 @@
 """File-based storage utility for mock services"""
 
-import json
+import atexit
+import copy
+import mmap
 import os
-from typing import Dict, List, Optional, Any
+import struct
+import time
+from contextlib import contextmanager, suppress
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 from pathlib import Path
 import threading
+from bisect import bisect_left, bisect_right, insort
 
+from . import serialization
+from .async_storage import AsyncStorageMixin
 
-class FileStorage:
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+# Records are paged in (created_at, key) order by query()
+SORT_FIELD = "created_at"
+
+# Generation counter at the start of the shared lock file
+_GENERATION = struct.Struct("<Q")
+
+# Changes applied by update_with() and update_many_with() under the write
+# lock: one record to its new value (None keeps it), or the records found
+# among the requested keys to the ones to save
+RecordChange = Callable[[Any], Optional[Any]]
+BatchChange = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+# When writes are flushed to disk: every write, at most once per interval,
+# or whenever the OS gets to it
+FSYNC_POLICIES = ("always", "batched", "never")
+
+
+class DuplicateKeyError(ValueError):
+    """Raised when a write would break a unique index"""
+
+    def __init__(self, field: str, value: Any):
+        super().__init__(f"Duplicate value for unique field {field}: {value}")
+        self.field = field
+        self.value = value
+
+
+class StorageCorruptedError(Exception):
+    """Raised when stored data exists but cannot be read back
+
+    Services seed sample data into empty storage, so reading a damaged file
+    as empty would replace real records. Loading fails instead, which stops
+    the service at startup.
+    """
+
+    def __init__(self, path: Any, reason: str):
+        super().__init__(
+            f"Storage file {path} is corrupted ({reason}); restore it from a "
+            "backup, or remove it to start without its contents"
+        )
+        self.path = path
+        self.reason = reason
+
+
+def check_fsync_policy(fsync: str) -> str:
+    """Validate an fsync policy name"""
+    if fsync not in FSYNC_POLICIES:
+        raise ValueError(
+            f"Unknown fsync policy: {fsync} (expected one of {FSYNC_POLICIES})"
+        )
+    return fsync
+
+
+def fsync_directory(path: Path) -> None:
+    """Flush a directory entry change such as a rename (not possible on Windows)"""
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_atomic(
+    path: Path, content: Union[bytes, Iterable[bytes]], sync: bool
+) -> None:
+    """Replace a file's contents so readers and crashes never see a partial file
+
+    The content, bytes or an iterable of chunks, goes to ``<name>.tmp`` next
+    to the file, which is then renamed over it. With sync set, the content
+    and the rename reach the disk before this returns; otherwise a power loss
+    may still lose the write.
+    """
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            if isinstance(content, bytes):
+                f.write(content)
+            else:
+                f.writelines(content)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except OSError:
+        with suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+    if sync:
+        fsync_directory(path.parent)
+
+
+def index_value(value: Any) -> Any:
+    """Normalize a field value for use as an index key"""
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def sort_position(key: str, record: Any) -> Tuple[str, str]:
+    """Return the (created_at, key) position of a record in query() order"""
+    created_at = record.get(SORT_FIELD) if isinstance(record, dict) else None
+    return (str(created_at or ""), key)
+
+
+def _encode_entry(key: str, value: Any) -> bytes:
+    """Encode one '"key":value' entry of a compact JSON object"""
+    return serialization.dumps({key: value})[1:-1]
+
+
+class FileStorage(AsyncStorageMixin):
     """Simple file-based storage using JSON files"""
 
-    def __init__(self, data_dir: str, filename: str):
+    def __init__(
+        self,
+        data_dir: str,
+        filename: str,
+        cached: bool = False,
+        indexes: Iterable[str] = (),
+        unique_indexes: Iterable[str] = (),
+        shared: bool = False,
+        pretty: bool = False,
+        fsync: str = "batched",
+        fsync_interval: float = 1.0,
+    ):
         """
         Initialize file storage
 
         Args:
             data_dir: Directory to store data files
             filename: Name of the JSON file (without extension)
+            cached: Keep the parsed data in memory and serve reads from it.
+                The file is re-read only when its mtime or size changes.
+            indexes: Record fields to keep secondary indexes on for find().
+                Indexes are maintained in memory and only used in cached mode.
+            unique_indexes: Record fields whose values must be unique across
+                records (None values are exempt). In cached mode the
+                value -> key maps are persisted to ``<filename>.index.json``
+                after a rebuild and by sync(), and reused at startup while
+                they match the data file.
+            shared: Other processes use the same file. Writes hold an
+                exclusive lock on ``<filename>.lock`` from load to write and
+                bump a generation counter kept in it; readers reload under a
+                shared lock whenever the counter has moved. Needs fcntl.
+            pretty: Indent the data file for reading by hand. It is written
+                compact by default, which is smaller and faster to encode.
+            fsync: When writes are flushed to disk: "always" after every
+                write, "batched" within fsync_interval of the write (by a
+                background thread, and at exit), or "never". Writes replace
+                the file atomically under every policy, so a process crash
+                never tears it.
+            fsync_interval: Seconds between flushes with the batched policy
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.filepath = self.data_dir / f"{filename}.json"
         self.lock = threading.Lock()
+        self.cached = cached
+        self.pretty = pretty
+        self.fsync = check_fsync_policy(fsync)
+        self.fsync_interval = fsync_interval
+        self._synced_at = float("-inf")
+        self._unsynced = False  # A write skipped its flush under "batched"
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_stamp: Optional[Tuple[int, int]] = None
+        # Encoded '"key":record' entries of the cached data, in file order,
+        # so a write only encodes the records it changes
+        self._encoded: Optional[Dict[str, bytes]] = None
+        self._indexes: Dict[str, Dict[Any, Set[str]]] = {
+            field: {} for field in indexes
+        }
+        self._unique: Dict[str, Dict[Any, str]] = {
+            field: {} for field in unique_indexes
+        }
+        self.index_path = self.data_dir / f"{filename}.index.json"
+        self._index_dirty = False  # Unique indexes changed since last persisted
+        # Sorted positions of all records for query(), built on first use
+        self._ordering: Optional[List[Tuple[str, str]]] = None
+        # Record count and the file version it was taken at, for count()
+        self._counted: Optional[Tuple[int, Tuple[Any, Any]]] = None
+
+        self.shared = shared and fcntl is not None
+        self._exclusive = False  # This process holds the file lock for writing
+        self._cache_generation: Optional[int] = None
+        if self.shared:
+            self.lock_path = self.data_dir / f"{filename}.lock"
+            self._lock_file = open(self.lock_path, "a+b")
+            with self._file_lock(fcntl.LOCK_EX):
+                if os.fstat(self._lock_file.fileno()).st_size < _GENERATION.size:
+                    self._lock_file.write(bytes(_GENERATION.size))
+                    self._lock_file.flush()
+            # Mapped once so checking for other writers costs no system call
+            self._generation_map = mmap.mmap(
+                self._lock_file.fileno(), _GENERATION.size
+            )
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if self.fsync == "batched":
+            self._flusher = threading.Thread(
+                target=self._flush_loop,
+                name=f"storage-flusher-{filename}",
+                daemon=True,
+            )
+            self._flusher.start()
+        if self._flusher is not None or self._unique:
+            atexit.register(self.close)
+
+    @contextmanager
+    def _file_lock(self, operation: int) -> Iterator[None]:
+        """Hold the cross-process lock file in the given flock mode"""
+        fcntl.flock(self._lock_file, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """Serialize a read-modify-write against other threads and processes"""
+        with self.lock:
+            if not self.shared:
+                yield
+                return
+            with self._file_lock(fcntl.LOCK_EX):
+                self._exclusive = True
+                try:
+                    yield
+                finally:
+                    self._exclusive = False
+
+    @contextmanager
+    def _read_lock(self) -> Iterator[None]:
+        """Keep other processes from writing while the data file is read"""
+        if not self.shared or self._exclusive:
+            yield
+            return
+        with self._file_lock(fcntl.LOCK_SH):
+            yield
+
+    def _generation(self) -> Optional[int]:
+        """Number of writes made to the data file by any process"""
+        if not self.shared:
+            return None
+        return _GENERATION.unpack_from(self._generation_map)[0]
+
+    def _version(self) -> Tuple[Any, Any]:
+        """Identify the current contents of the data file without reading it"""
+        return (self._file_stamp(), self._generation())
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        """Return (mtime_ns, size) of the data file, or None if it is missing"""
+        try:
+            stat = os.stat(self.filepath)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
 
     def _read_file(self) -> Dict[str, Any]:
-        """Read data from file"""
+        """Read data from file; a missing file holds no records
+
+        Raises:
+            StorageCorruptedError: If the file is not a JSON object of records
+        """
+        try:
+            with open(self.filepath, "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return {}
         try:
-            if self.filepath.exists():
-                with open(self.filepath, "r", encoding="utf-8") as f:
-                    return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"Error reading file {self.filepath}: {e}")
-        return {}
-
-    def _write_file(self, data: Dict[str, Any]) -> None:
-        """Write data to file"""
+            data = serialization.loads(content)
+        except serialization.JSONDecodeError as e:
+            raise StorageCorruptedError(self.filepath, str(e)) from e
+        if not isinstance(data, dict):
+            raise StorageCorruptedError(self.filepath, "not an object of records")
+        return data
+
+    def _sync_due(self) -> bool:
+        """Whether the write being made now should be flushed to disk"""
+        if self.fsync != "batched":
+            return self.fsync == "always"
+        now = time.monotonic()
+        if now - self._synced_at < self.fsync_interval:
+            self._unsynced = True
+            return False
+        self._synced_at = now
+        self._unsynced = False
+        return True
+
+    def _write_file(
+        self,
+        data: Dict[str, Any],
+        content: Union[bytes, Iterable[bytes], None] = None,
+    ) -> None:
+        """Write data to file, replacing it atomically
+
+        content is data already encoded, as bytes or chunks, if the caller
+        has it.
+        """
+        # Encode first so a value that cannot be encoded leaves the file intact
+        if content is None:
+            content = serialization.dumps(data, pretty=self.pretty)
         try:
-            with open(self.filepath, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            write_atomic(self.filepath, content, self._sync_due())
         except IOError as e:
             print(f"Error writing file {self.filepath}: {e}")
+            self._cache = None
+            self._encoded = None
+            # The indexes hold the failed write; the next load rebuilds them
+            self._index_dirty = False
+            return
+        generation = None
+        if self.shared:
+            generation = self._generation() + 1
+            _GENERATION.pack_into(self._generation_map, 0, generation)
+            self._cache_generation = generation
+        stamp = self._file_stamp()
+        self._counted = (len(data), (stamp, generation))
+        if self.cached:
+            if data is not self._cache:
+                self._reindex(data)
+                self._encoded = None
+            self._cache = data
+            self._cache_stamp = stamp
+            self._index_dirty = bool(self._unique)
+
+    def _load(self) -> Dict[str, Any]:
+        """Return the current data, served from memory in cached mode"""
+        if not self.cached:
+            with self._read_lock():
+                return self._read_file()
+        if (
+            self._cache is None
+            or self._file_stamp() != self._cache_stamp
+            or self._generation() != self._cache_generation
+        ):
+            with self._read_lock():
+                # Stat before reading so a concurrent outside write is picked
+                # up next time
+                stamp = self._file_stamp()
+                self._cache_generation = self._generation()
+                self._cache = self._read_file()
+            self._cache_stamp = stamp
+            self._encoded = None
+            self._counted = (len(self._cache), (stamp, self._cache_generation))
+            self._reindex(self._cache, stamp)
+        return self._cache
+
+    def _read_index_file(self, stamp: Optional[Tuple[int, int]]) -> bool:
+        """Load persisted unique indexes if they were built from this file version"""
+        if stamp is None or not self.index_path.exists():
+            return False
+        try:
+            with open(self.index_path, "rb") as f:
+                persisted = serialization.loads(f.read())
+        except (serialization.JSONDecodeError, IOError):
+            return False
+        unique = persisted.get("unique", {})
+        if tuple(persisted.get("source") or ()) != stamp or set(unique) != set(
+            self._unique
+        ):
+            return False
+        for field, mapping in unique.items():
+            self._unique[field] = mapping
+        return True
+
+    def _write_index_file(self, stamp: Optional[Tuple[int, int]]) -> None:
+        """Persist the unique indexes along with the data file version they match"""
+        if stamp is None:
+            return
+        try:
+            write_atomic(
+                self.index_path,
+                serialization.dumps({"source": stamp, "unique": self._unique}),
+                sync=False,
+            )
+        except (IOError, TypeError) as e:
+            # A missing or stale index file is simply rebuilt on next load
+            print(f"Error writing index file {self.index_path}: {e}")
+            return
+        self._index_dirty = False
+
+    def _reindex(
+        self, data: Dict[str, Any], stamp: Optional[Tuple[int, int]] = None
+    ) -> None:
+        """Rebuild the indexes, reusing persisted unique indexes when current"""
+        self._ordering = None
+        for postings in self._indexes.values():
+            postings.clear()
+        unique_loaded = bool(self._unique) and self._read_index_file(stamp)
+        if not unique_loaded:
+            for mapping in self._unique.values():
+                mapping.clear()
+        for key, record in data.items():
+            self._postings_add(key, record)
+            if not unique_loaded:
+                self._unique_add(key, record)
+        self._index_dirty = bool(self._unique) and not unique_loaded
+        if self._index_dirty:
+            self._write_index_file(stamp)
+
+    def _postings_add(self, key: str, record: Any) -> None:
+        """Add a record to the secondary indexes"""
+        if not isinstance(record, dict):
+            return
+        for field, postings in self._indexes.items():
+            try:
+                postings.setdefault(index_value(record.get(field)), set()).add(key)
+            except TypeError:
+                pass  # Unhashable values are not indexed
+
+    def _unique_add(self, key: str, record: Any) -> None:
+        """Add a record to the unique indexes"""
+        if not isinstance(record, dict):
+            return
+        for field, mapping in self._unique.items():
+            value = index_value(record.get(field))
+            if value is not None:
+                mapping[value] = key
+
+    def _index_add(self, key: str, record: Any) -> None:
+        """Add a record to all indexes"""
+        self._postings_add(key, record)
+        self._unique_add(key, record)
+
+    def _index_remove(self, key: str, record: Any) -> None:
+        """Remove a record from all indexes"""
+        if not isinstance(record, dict):
+            return
+        for field, postings in self._indexes.items():
+            try:
+                value = index_value(record.get(field))
+                keys = postings.get(value)
+            except TypeError:
+                continue
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del postings[value]
+        for field, mapping in self._unique.items():
+            value = index_value(record.get(field))
+            if value is not None and mapping.get(value) == key:
+                del mapping[value]
+
+    def _unique_owners(self, data: Dict[str, Any], field: str) -> Dict[Any, str]:
+        """Return the value -> key map for a field, from its unique index if any"""
+        if self.cached and field in self._unique:
+            return self._unique[field]
+        owners = {}
+        for key, record in data.items():
+            if isinstance(record, dict) and record.get(field) is not None:
+                owners[index_value(record[field])] = key
+        return owners
+
+    def _check_unique(
+        self, data: Dict[str, Any], upserts: Dict[str, Any], deletes: Tuple[str, ...]
+    ) -> None:
+        """Raise DuplicateKeyError if the changes would break a unique index"""
+        for field in self._unique:
+            owners = self._unique_owners(data, field)
+            claimed: Dict[Any, str] = {}
+            for key, record in upserts.items():
+                if not isinstance(record, dict):
+                    continue
+                value = index_value(record.get(field))
+                if value is None:
+                    continue
+                owner = owners.get(value)
+                if owner is not None and owner != key and owner not in deletes:
+                    # Allowed only if the owner moves off this value in the same batch
+                    moved = owner in upserts and index_value(
+                        upserts[owner].get(field)
+                    ) != value
+                    if not moved:
+                        raise DuplicateKeyError(field, value)
+                if claimed.setdefault(value, key) != key:
+                    raise DuplicateKeyError(field, value)
+
+    def _indexed_keys(self, filters: Dict[str, Any]) -> Optional[Iterable[str]]:
+        """Narrow candidate keys using the indexed filters, None if none apply"""
+        if not self.cached:
+            return None
+        for field, value in filters.items():
+            if field in self._unique:
+                key = self._unique[field].get(index_value(value))
+                return [key] if key is not None else []
+        candidates: Optional[Set[str]] = None
+        # Intersect the smallest posting lists first
+        posting_sets = sorted(
+            (
+                self._indexes[field].get(index_value(value), set())
+                for field, value in filters.items()
+                if field in self._indexes
+            ),
+            key=len,
+        )
+        for keys in posting_sets:
+            candidates = set(keys) if candidates is None else candidates & keys
+            if not candidates:
+                break
+        return candidates
+
+    def _find_keys(self, data: Dict[str, Any], filters: Dict[str, Any]) -> Iterable[str]:
+        """Return the keys that may match the filters"""
+        candidates = self._indexed_keys(filters)
+        return data.keys() if candidates is None else candidates
+
+    @staticmethod
+    def _matches(record: Any, filters: Dict[str, Any]) -> bool:
+        """Check whether a record's fields equal all of the filter values"""
+        return isinstance(record, dict) and all(
+            index_value(record.get(field)) == index_value(value)
+            for field, value in filters.items()
+        )
+
+    def _positions(
+        self, data: Dict[str, Any], filters: Dict[str, Any]
+    ) -> List[Tuple[str, str]]:
+        """Return the sorted positions of the records that may match the filters"""
+        if not self.cached:
+            return sorted(sort_position(key, record) for key, record in data.items())
+        candidates = self._indexed_keys(filters)
+        if candidates is not None:
+            return sorted(
+                sort_position(key, data[key]) for key in candidates if key in data
+            )
+        if self._ordering is None:
+            self._ordering = sorted(
+                sort_position(key, record) for key, record in data.items()
+            )
+        return self._ordering
+
+    def sync(self) -> None:
+        """Flush a write left unflushed by the batched fsync policy to disk
+
+        Also persists the unique indexes if writes changed them since they
+        were last saved; the data file itself never waits on that.
+        """
+        with self._write_lock():
+            if self._index_dirty:
+                self._write_index_file(self._cache_stamp)
+            if not self._unsynced:
+                return
+            try:
+                with open(self.filepath, "rb+") as f:
+                    os.fsync(f.fileno())
+                fsync_directory(self.data_dir)
+            except OSError as e:
+                print(f"Error flushing file {self.filepath}: {e}")
+            self._synced_at = time.monotonic()
+            self._unsynced = False
+
+    def _flush_loop(self) -> None:
+        """Background loop that flushes batched writes every fsync_interval"""
+        while not self._stop.wait(self.fsync_interval):
+            self.sync()
+
+    def close(self) -> None:
+        """Stop the background flusher and sync what it has not flushed yet
+
+        Runs at exit unless called earlier. The storage still serves requests
+        afterwards, but batched writes are no longer flushed in the background.
+        """
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        atexit.unregister(self.close)
+        if self._flusher is not None:
+            self._flusher.join(timeout=self.fsync_interval)
+        self.sync()
+
+    def warm_up(self) -> None:
+        """Load the data, indexes and query order ahead of the first request"""
+        with self.lock:
+            version = self._version()
+            data = self._load()
+            self._counted = (len(data), version)
+            if self.cached:
+                self._positions(data, {})
 
     def get_all(self) -> Dict[str, Any]:
         """Get all records"""
         with self.lock:
-            return self._read_file()
+            # Shallow copy: records are shared with the cache and must not be mutated
+            return dict(self._load())
+
+    def count(self) -> int:
+        """Number of records
+
+        Answered from the count kept by the last write or load. The data file
+        is only read again if it changed since, which costs one stat (and a
+        look at the generation counter in shared mode) to detect.
+        """
+        with self.lock:
+            version = self._version()
+            if self._counted is not None and self._counted[1] == version:
+                return self._counted[0]
+            total = len(self._load())
+            self._counted = (total, version)
+            return total
 
     def get(self, key: str) -> Optional[Any]:
         """Get a single record by key"""
         with self.lock:
-            data = self._read_file()
-            return data.get(key)
+            value = self._load().get(key)
+            if self.cached and value is not None:
+                # Callers update records in place before calling update()
+                return copy.deepcopy(value)
+            return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get a batch of records by key; missing keys are left out"""
+        with self.lock:
+            data = self._load()
+            found = {}
+            for key in keys:
+                value = data.get(key)
+                if value is not None:
+                    found[key] = copy.deepcopy(value) if self.cached else value
+            return found
+
+    def find(self, **filters: Any) -> Dict[str, Any]:
+        """Get records whose fields equal all of the given values
+
+        Indexed fields are answered from the secondary indexes; any other
+        fields are checked against the candidate records.
+        """
+        with self.lock:
+            data = self._load()
+            matches = {}
+            for key in self._find_keys(data, filters):
+                record = data.get(key)
+                if self._matches(record, filters):
+                    matches[key] = record
+            return matches
+
+    def query(
+        self, limit: int, after: Optional[Tuple[str, str]] = None, **filters: Any
+    ) -> Tuple[Dict[str, Any], Optional[Tuple[str, str]]]:
+        """Get one page of matching records in (created_at, key) order
+
+        Only the records on the page are collected; in cached mode the sort
+        order is kept up to date on writes instead of being rebuilt per call.
+
+        Args:
+            limit: Maximum number of records to return
+            after: Position of the last record on the previous page
+            **filters: Field values the records must equal, as for find()
+
+        Returns:
+            The page of records and the position to continue after, or None
+            if there are no further matching records
+        """
+        with self.lock:
+            data = self._load()
+            positions = self._positions(data, filters)
+            start = bisect_right(positions, tuple(after)) if after else 0
+            page: Dict[str, Any] = {}
+            last: Optional[Tuple[str, str]] = None
+            for index in range(start, len(positions)):
+                record = data.get(positions[index][1])
+                if not self._matches(record, filters):
+                    continue
+                if len(page) == limit:
+                    # One more match exists, so the page is not the last
+                    return page, last
+                last = positions[index]
+                page[last[1]] = record
+            return page, None
+
+    def find_many(self, field: str, values: Iterable[Any]) -> Dict[Any, Any]:
+        """Get the records for a batch of unique field values, keyed by value
+
+        Values without a matching record are left out of the result.
+        """
+        with self.lock:
+            data = self._load()
+            owners = self._unique_owners(data, field)
+            found = {}
+            for value in values:
+                key = owners.get(index_value(value))
+                if key is not None and key in data:
+                    record = data[key]
+                    found[value] = copy.deepcopy(record) if self.cached else record
+            return found
+
+    def find_one(self, field: str, value: Any) -> Optional[Any]:
+        """Get the record whose unique field equals value"""
+        return self.find_many(field, (value,)).get(value)
+
+    def _apply(
+        self,
+        data: Dict[str, Any],
+        upserts: Dict[str, Any],
+        deletes: Tuple[str, ...] = (),
+    ) -> None:
+        """Apply record changes to the in-memory data and its indexes"""
+        if self._unique:
+            self._check_unique(data, upserts, deletes)
+        maintain_indexes = self.cached and (self._indexes or self._unique)
+        ordering = self._ordering
+        for key in (*deletes, *upserts):
+            if key not in data:
+                continue
+            if maintain_indexes:
+                self._index_remove(key, data[key])
+            if ordering is not None:
+                position = sort_position(key, data[key])
+                index = bisect_left(ordering, position)
+                if index < len(ordering) and ordering[index] == position:
+                    del ordering[index]
+        for key in deletes:
+            data.pop(key, None)
+        data.update(upserts)
+        if maintain_indexes:
+            for key, value in upserts.items():
+                self._index_add(key, value)
+        if ordering is not None:
+            for key, value in upserts.items():
+                insort(ordering, sort_position(key, value))
+
+    def _commit(
+        self,
+        data: Dict[str, Any],
+        upserts: Dict[str, Any],
+        deletes: Tuple[str, ...] = (),
+    ) -> None:
+        """Apply record changes to the loaded data and persist them"""
+        # Encode first, so a value that cannot be encoded changes nothing
+        changed = {key: _encode_entry(key, value) for key, value in upserts.items()}
+        self._apply(data, upserts, deletes)
+        self._write_file(data, self._encode_changes(data, changed, deletes))
+
+    def _encode_changes(
+        self,
+        data: Dict[str, Any],
+        changed: Dict[str, bytes],
+        deletes: Tuple[str, ...],
+    ) -> Optional[Tuple[bytes, ...]]:
+        """Encode the changed data, re-encoding only the changed records
+
+        changed holds the upserted records, already encoded. Re-encoding
+        every record would hold the GIL for the whole file on each write,
+        stalling the event loop and other requests. Works on the cached data
+        in compact mode; returns None otherwise.
+        """
+        if self.pretty or data is not self._cache:
+            return None
+        if self._encoded is None:
+            self._encoded = {
+                key: changed.get(key) or _encode_entry(key, data[key]) for key in data
+            }
+        else:
+            for key in deletes:
+                self._encoded.pop(key, None)
+            # Same order as the data: kept in place if present, else appended
+            self._encoded.update(changed)
+        # Chunks, so the largest one is not copied again just to add braces
+        return (b"{", b",".join(self._encoded.values()), b"}")
 
     def create(self, key: str, value: Any) -> Any:
         """Create a new record"""
-        with self.lock:
-            data = self._read_file()
-            data[key] = value
-            self._write_file(data)
+        with self._write_lock():
+            self._commit(self._load(), {key: value})
             return value
 
+    def create_many(self, records: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a batch of records with a single write
+
+        The batch is applied all-or-nothing: a unique index violation
+        rejects every record.
+        """
+        with self._write_lock():
+            self._commit(self._load(), dict(records))
+            return records
+
     def update(self, key: str, value: Any) -> Optional[Any]:
         """Update an existing record"""
-        with self.lock:
-            data = self._read_file()
+        with self._write_lock():
+            data = self._load()
             if key in data:
-                data[key] = value
-                self._write_file(data)
+                self._commit(data, {key: value})
                 return value
             return None
 
+    def update_many(self, records: Dict[str, Any]) -> Dict[str, Any]:
+        """Update a batch of existing records with a single write
+
+        Keys that no longer exist are skipped. Returns the records that were
+        updated.
+        """
+        with self._write_lock():
+            data = self._load()
+            updated = {key: value for key, value in records.items() if key in data}
+            if updated:
+                self._commit(data, updated)
+            return updated
+
+    def update_with(self, key: str, change: RecordChange) -> Optional[Any]:
+        """Read, change and save one record as a single atomic step
+
+        change gets a copy of the stored record and returns the record to
+        save, or None to keep it as it is. Returns the record as saved, or
+        None without calling change if the key does not exist.
+        """
+
+        def change_one(records: Dict[str, Any]) -> Dict[str, Any]:
+            if key not in records:
+                return {}
+            value = change(records[key])
+            return {} if value is None else {key: value}
+
+        return self.update_many_with((key,), change_one).get(key)
+
+    def update_many_with(
+        self, keys: Iterable[str], change: BatchChange
+    ) -> Dict[str, Any]:
+        """Read, change and save a batch of records as a single atomic step
+
+        change gets copies of the stored records among keys (missing keys
+        are left out) and returns the records to save. It runs under the
+        write lock, so no other thread, or in shared mode no other process,
+        writes in between; an exception from it aborts the whole update.
+        Returns the records found, as saved.
+        """
+        with self._write_lock():
+            data = self._load()
+            records = {
+                key: copy.deepcopy(data[key]) if self.cached else data[key]
+                for key in keys
+                if key in data
+            }
+            updates = change(records)
+            if updates:
+                self._commit(data, updates)
+            records.update(updates)
+            return records
+
     def delete(self, key: str) -> bool:
         """Delete a record"""
-        with self.lock:
-            data = self._read_file()
+        with self._write_lock():
+            data = self._load()
             if key in data:
-                del data[key]
-                self._write_file(data)
+                self._commit(data, {}, (key,))
                 return True
             return False
 
     def exists(self, key: str) -> bool:
         """Check if a record exists"""
         with self.lock:
-            data = self._read_file()
+            data = self._load()
             return key in data
 
     def clear(self) -> None:
         """Clear all data"""
-        with self.lock:
+        with self._write_lock():
             self._write_file({})
 
     def initialize_with_data(self, initial_data: Dict[str, Any]) -> None:
         """Initialize file with data if it doesn't exist or is empty"""
-        with self.lock:
-            if not self.filepath.exists() or not self._read_file():
+        with self._write_lock():
+            if not self.filepath.exists() or not self._load():
                 self._write_file(initial_data)
@@ -0,0 +1,228 @@
+"""Append-only journal storage backend for mock services"""
+
+import atexit
+import os
+from typing import Dict, Optional, Any, Iterable, Tuple
+import threading
+
+from . import serialization
+from .file_storage import FileStorage, StorageCorruptedError, write_atomic
+
+
+class JournalStorage(FileStorage):
+    """File storage that appends operations to a log instead of rewriting
+
+    Every write appends one JSON line (``put``/``del``/``clear``) to
+    ``<filename>.journal``. The full dataset is held in memory. A background
+    thread periodically compacts the journal into the ``<filename>.json``
+    snapshot, which keeps the same format as FileStorage.
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        filename: str,
+        compact_interval: float = 30.0,
+        indexes: Iterable[str] = (),
+        unique_indexes: Iterable[str] = (),
+        pretty: bool = False,
+        fsync: str = "batched",
+        fsync_interval: float = 1.0,
+    ):
+        """
+        Initialize journal storage
+
+        Args:
+            data_dir: Directory to store data files
+            filename: Name of the snapshot/journal files (without extension)
+            compact_interval: Seconds between background compactions
+                (0 disables the background thread)
+            indexes: Record fields to keep secondary indexes on for find()
+            unique_indexes: Record fields whose values must be unique
+            pretty: Indent the snapshot file; journal lines are always compact
+            fsync: When appends are flushed to disk: "always", "batched"
+                (within fsync_interval of the append, and at every
+                compaction) or "never". Snapshots are flushed unless the
+                policy is "never".
+            fsync_interval: Seconds between flushes with the batched policy
+        """
+        super().__init__(
+            data_dir,
+            filename,
+            cached=True,
+            indexes=indexes,
+            unique_indexes=unique_indexes,
+            pretty=pretty,
+            fsync=fsync,
+            fsync_interval=fsync_interval,
+        )
+        self.journal_path = self.data_dir / f"{filename}.journal"
+        self.compact_interval = compact_interval
+        self._pending_ops = 0
+
+        with self.lock:
+            self._cache = self._replay()
+            self._reindex(self._cache)
+            self._journal = open(self.journal_path, "ab")
+            # Fold any journal left over from the last run into the snapshot
+            if self._pending_ops:
+                self._compact()
+
+        self._compactor: Optional[threading.Thread] = None
+        if compact_interval > 0:
+            self._compactor = threading.Thread(
+                target=self._compaction_loop,
+                name=f"journal-compactor-{filename}",
+                daemon=True,
+            )
+            self._compactor.start()
+        atexit.register(self.close)
+
+    def _replay(self) -> Dict[str, Any]:
+        """Load the snapshot and re-apply the journal on top of it
+
+        Raises:
+            StorageCorruptedError: If the snapshot or a complete journal line
+                cannot be read
+        """
+        data = self._read_file()
+        if not self.journal_path.exists():
+            return data
+
+        complete = 0  # Bytes up to the end of the last complete line
+        with open(self.journal_path, "rb") as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.endswith(b"\n"):
+                    # A crash mid-append leaves a torn last line; that write
+                    # never finished, so it is dropped
+                    print(
+                        f"Dropping torn journal line {line_no} in {self.journal_path}"
+                    )
+                    break
+                complete += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = serialization.loads(line)
+                except serialization.JSONDecodeError as e:
+                    raise StorageCorruptedError(
+                        self.journal_path, f"unreadable entry on line {line_no}"
+                    ) from e
+                self._apply_entry(data, entry)
+                self._pending_ops += 1
+        if complete < self.journal_path.stat().st_size:
+            # Later appends would otherwise be glued onto the torn line
+            os.truncate(self.journal_path, complete)
+        return data
+
+    @staticmethod
+    def _apply_entry(data: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        """Apply a single journal entry to an in-memory dataset"""
+        op = entry.get("op")
+        if op == "put":
+            data[entry["key"]] = entry["value"]
+        elif op == "del":
+            data.pop(entry["key"], None)
+        elif op == "clear":
+            data.clear()
+
+    def _append(self, *entries: Dict[str, Any]) -> None:
+        """Append entries to the journal and flush them per the fsync policy"""
+        self._journal.write(serialization.dump_lines(entries))
+        self._journal.flush()
+        if self._sync_due():
+            os.fsync(self._journal.fileno())
+        self._pending_ops += len(entries)
+
+    def _load(self) -> Dict[str, Any]:
+        """Return the in-memory dataset"""
+        return self._cache
+
+    def count(self) -> int:
+        """Number of records in the in-memory dataset"""
+        with self.lock:
+            return len(self._cache)
+
+    def _commit(
+        self,
+        data: Dict[str, Any],
+        upserts: Dict[str, Any],
+        deletes: Tuple[str, ...] = (),
+    ) -> None:
+        """Journal record changes, then apply them in memory"""
+        if self._unique:
+            # Validate before journaling so rejected writes never hit the log
+            self._check_unique(data, upserts, deletes)
+        entries = [{"op": "del", "key": key} for key in deletes]
+        entries.extend(
+            {"op": "put", "key": key, "value": value} for key, value in upserts.items()
+        )
+        self._append(*entries)
+        self._apply(data, upserts, deletes)
+
+    def _write_snapshot(self) -> None:
+        """Write the dataset to the snapshot file via a temp file and rename"""
+        # The journal is truncated next, so the snapshot must reach the disk
+        write_atomic(
+            self.filepath,
+            serialization.dumps(self._cache, pretty=self.pretty),
+            sync=self.fsync != "never",
+        )
+
+    def _compact(self) -> None:
+        """Fold the journal into a fresh snapshot (caller holds the lock)"""
+        try:
+            self._write_snapshot()
+        except IOError as e:
+            # Keep the journal; it is still the source of truth
+            print(f"Error compacting journal {self.journal_path}: {e}")
+            return
+        self._journal.close()
+        self._journal = open(self.journal_path, "wb")
+        self._pending_ops = 0
+        self._unsynced = False
+
+    def sync(self) -> None:
+        """Flush appends left unflushed by the batched fsync policy to disk"""
+        with self.lock:
+            if self._unsynced and not self._journal.closed:
+                os.fsync(self._journal.fileno())
+                self._unsynced = False
+
+    def compact(self) -> None:
+        """Compact the journal into the snapshot now"""
+        with self.lock:
+            if self._pending_ops:
+                self._compact()
+
+    def _compaction_loop(self) -> None:
+        """Background loop that compacts the journal periodically"""
+        while not self._stop.wait(self.compact_interval):
+            self.compact()
+
+    def close(self) -> None:
+        """Stop the background threads and write a final snapshot"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        atexit.unregister(self.close)
+        if self._compactor is not None:
+            self._compactor.join(timeout=self.compact_interval)
+        if self._flusher is not None:
+            self._flusher.join(timeout=self.fsync_interval)
+        self.compact()
+        with self.lock:
+            self._journal.close()
+
+    def clear(self) -> None:
+        """Clear all data"""
+        with self.lock:
+            self._append({"op": "clear"})
+            self._cache.clear()
+            self._reindex(self._cache)
+
+    def initialize_with_data(self, initial_data: Dict[str, Any]) -> None:
+        """Initialize storage with data if it is empty"""
+        with self.lock:
+            if not self._cache:
+                self._commit(self._cache, initial_data)
@@ -0,0 +1,89 @@
+"""Cursor pagination and NDJSON export helpers for list endpoints"""
+
+import base64
+import json
+from typing import Any, Iterator, List, Optional, Tuple
+
+from . import serialization
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Records read from storage per chunk of an export stream
+EXPORT_BATCH_SIZE = 500
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor was not issued by this service"""
+
+
+def encode_cursor(position: Tuple[str, str]) -> str:
+    """Encode a storage sort position as an opaque, URL-safe cursor"""
+    raw = json.dumps(list(position), ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor back into the storage sort position it encodes"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw.decode("utf-8"))
+    except ValueError as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+    if not (
+        isinstance(position, list)
+        and len(position) == 2
+        and all(isinstance(part, str) for part in position)
+    ):
+        raise InvalidCursorError(f"Invalid cursor: {cursor}")
+    return (position[0], position[1])
+
+
+def fetch_page(
+    storage: Any, limit: int, cursor: Optional[str] = None, **filters: Any
+) -> Tuple[List[Any], Optional[str]]:
+    """Fetch one page of records and the cursor of the next page (None if last)
+
+    Raises:
+        InvalidCursorError: If the cursor cannot be decoded
+    """
+    after = decode_cursor(cursor) if cursor else None
+    records, next_position = storage.query(limit, after=after, **filters)
+    next_cursor = encode_cursor(next_position) if next_position else None
+    return list(records.values()), next_cursor
+
+
+async def afetch_page(
+    storage: Any, limit: int, cursor: Optional[str] = None, **filters: Any
+) -> Tuple[List[Any], Optional[str]]:
+    """Awaitable fetch_page that reads through the storage I/O pool
+
+    Raises:
+        InvalidCursorError: If the cursor cannot be decoded
+    """
+    after = decode_cursor(cursor) if cursor else None
+    records, next_position = await storage.aquery(limit, after=after, **filters)
+    next_cursor = encode_cursor(next_position) if next_position else None
+    return list(records.values()), next_cursor
+
+
+def iter_ndjson(
+    storage: Any, batch_size: int = EXPORT_BATCH_SIZE, **filters: Any
+) -> Iterator[bytes]:
+    """Yield all matching records as newline-delimited JSON, one batch per chunk
+
+    Records are read page by page in the same order as the list endpoints,
+    so only one batch is held in memory and no storage lock is held
+    between chunks.
+    """
+    after = None
+    while True:
+        records, after = storage.query(batch_size, after=after, **filters)
+        if records:
+            yield serialization.dump_lines(records.values())
+        if after is None:
+            return
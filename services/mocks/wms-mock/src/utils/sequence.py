@@ -0,0 +1,132 @@
+"""Persistent number sequences shared by every worker process"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+from ..config.settings import settings
+from .async_storage import run_io
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+
+class SequenceAllocator:
+    """Hands out increasing numbers in blocks reserved from a shared file
+
+    ``<name>.seq`` in the data directory holds the first number no process
+    has reserved yet. A process reserves ``block_size`` numbers at a time by
+    advancing it under an exclusive lock on ``<name>.seq.lock``, then serves
+    them from memory, so workers never hand out the same number. Numbers
+    reserved by a process that stops are skipped, leaving gaps. Async callers
+    use atake()/anext(), which run the reservation on the storage I/O pool.
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        name: str,
+        initial: Callable[[], int],
+        block_size: int = 100,
+    ):
+        """
+        Initialize the allocator
+
+        Args:
+            data_dir: Directory holding the sequence files
+            name: Sequence name (file name without extension)
+            initial: Returns the first number to hand out; only called when
+                the sequence file does not exist yet
+            block_size: Numbers reserved per trip to the sequence file
+        """
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.filepath = self.data_dir / f"{name}.seq"
+        self.lock_path = self.data_dir / f"{name}.seq.lock"
+        self.initial = initial
+        self.block_size = block_size
+        self.lock = threading.Lock()
+        self._next = 0
+        self._limit = 0  # End (exclusive) of the block reserved in memory
+
+    def _reserve(self, count: int) -> int:
+        """Advance the shared sequence by count; returns the first number"""
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    start = int(self.filepath.read_text(encoding="utf-8"))
+                except (FileNotFoundError, ValueError):
+                    start = self.initial()
+                # Replace atomically so a crash never leaves a torn value
+                tmp_path = self.filepath.with_suffix(".seq.tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(str(start + count))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.filepath)
+                return start
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def take(self, count: int = 1) -> int:
+        """Allocate count consecutive numbers and return the first"""
+        with self.lock:
+            if self._next + count > self._limit:
+                # Unused numbers of the current block are given up
+                self._next = self._reserve(max(count, self.block_size))
+                self._limit = self._next + max(count, self.block_size)
+            start = self._next
+            self._next += count
+            return start
+
+    def next(self) -> int:
+        """Allocate a single number"""
+        return self.take(1)
+
+    async def atake(self, count: int = 1) -> int:
+        """take() without blocking the event loop on the sequence file"""
+        with self.lock:
+            if self._next + count <= self._limit:
+                start = self._next
+                self._next += count
+                return start
+        # The block is used up: reserve the next one off the event loop
+        return await run_io(self.take, count)
+
+    async def anext(self) -> int:
+        """Allocate a single number without blocking the event loop"""
+        return await self.atake(1)
+
+
+_instances: Dict[Tuple[str, str], SequenceAllocator] = {}
+_instances_lock = threading.Lock()
+
+
+def create_sequence(
+    data_dir: str, name: str, initial: Callable[[], int]
+) -> SequenceAllocator:
+    """Return the shared allocator for a sequence in this process
+
+    Args:
+        data_dir: Directory holding the sequence files
+        name: Sequence name
+        initial: Returns the first number when the sequence is new, e.g. by
+            scanning existing records once
+    """
+    key = (str(Path(data_dir).resolve()), name)
+    with _instances_lock:
+        sequence = _instances.get(key)
+        if sequence is None:
+            sequence = SequenceAllocator(
+                data_dir, name, initial, block_size=settings.sequence_block_size
+            )
+            _instances[key] = sequence
+        return sequence
@@ -0,0 +1,75 @@
+"""JSON encoding for storage files and API responses
+
+orjson is used when it is installed; otherwise the standard library json
+module produces the same documents. Output is always compact UTF-8 bytes
+unless pretty printing is asked for.
+"""
+
+import json
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Iterable, Union
+
+from fastapi.responses import JSONResponse as BaseJSONResponse
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; fall back to the standard library
+    orjson = None
+
+# Raised by loads(); orjson's error subclasses the standard library's
+JSONDecodeError = json.JSONDecodeError
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+    _PRETTY_OPTIONS = _OPTIONS | orjson.OPT_INDENT_2
+
+
+def _default(value: Any) -> Any:
+    """Encode the non-JSON types orjson handles natively the way it does"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any, pretty: bool = False) -> bytes:
+    """Encode a value as JSON, indented by two spaces if pretty is set"""
+    if orjson is not None:
+        return orjson.dumps(value, option=_PRETTY_OPTIONS if pretty else _OPTIONS)
+    if pretty:
+        text = json.dumps(value, ensure_ascii=False, indent=2, default=_default)
+    else:
+        text = json.dumps(
+            value, ensure_ascii=False, separators=(",", ":"), default=_default
+        )
+    return text.encode("utf-8")
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Decode a JSON document
+
+    Raises:
+        JSONDecodeError: If the data is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if not isinstance(data, str):
+        try:
+            data = bytes(data).decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise JSONDecodeError(f"Invalid UTF-8: {e}", "", 0) from None
+    return json.loads(data)
+
+
+def dump_lines(values: Iterable[Any]) -> bytes:
+    """Encode values as newline-delimited JSON, one compact line each"""
+    return b"".join(dumps(value) + b"\n" for value in values)
+
+
+class JSONResponse(BaseJSONResponse):
+    """Default response class encoding route results with dumps()"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,502 @@
+"""SQLite storage backend for mock services"""
+
+import re
+import sqlite3
+import threading
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import serialization
+from .async_storage import AsyncStorageMixin
+from .file_storage import (
+    SORT_FIELD,
+    BatchChange,
+    DuplicateKeyError,
+    RecordChange,
+    StorageCorruptedError,
+    check_fsync_policy,
+)
+
+_TABLE_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Index named by SQLite in "UNIQUE constraint failed: index '<name>'"
+_FAILED_INDEX = re.compile(r"index '([A-Za-z0-9_]+)'")
+
+# Same ordering as FileStorage.query(): missing created_at sorts first
+_SORT_EXPR = f"COALESCE(json_extract(value, '$.{SORT_FIELD}'), '')"
+
+# Per-table row counts, kept current by triggers so count() never scans
+_COUNTS_TABLE = "record_counts"
+
+# PRAGMA synchronous per fsync policy; in WAL mode NORMAL syncs only at
+# checkpoints, which batches the flushes of many commits
+_SYNCHRONOUS = {"always": "FULL", "batched": "NORMAL", "never": "OFF"}
+
+
+def _encode(value: Any) -> str:
+    """Encode a record for the value column; json_extract() rejects BLOBs"""
+    return serialization.dumps(value).decode("utf-8")
+
+
+def _sql_value(value: Any) -> Any:
+    """Convert a filter value to what json_extract() returns for it"""
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+class SQLiteStorage(AsyncStorageMixin):
+    """Drop-in replacement for FileStorage backed by a WAL-mode SQLite file
+
+    Each entity gets its own table of ``(key, value)`` rows where ``value``
+    holds the record as JSON. Point lookups go through the primary key, and
+    readers use their own per-thread connection so they are never blocked by
+    the writer lock. Secondary indexes are expression indexes over
+    ``json_extract(value, '$.<field>')``; unique indexes are enforced by
+    SQLite itself and surface as DuplicateKeyError.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        table: str,
+        indexes: Iterable[str] = (),
+        unique_indexes: Iterable[str] = (),
+        fsync: str = "batched",
+    ):
+        """
+        Initialize SQLite storage
+
+        Args:
+            db_path: Path of the SQLite database file
+            table: Table holding this entity's records
+            indexes: Record fields to create secondary indexes on for find()
+            unique_indexes: Record fields whose values must be unique
+            fsync: "always" flushes every commit to disk, "batched" only at
+                WAL checkpoints and "never" leaves it to the OS
+
+        Raises:
+            DuplicateKeyError: If stored records already break a unique index
+            StorageCorruptedError: If the database file is damaged
+        """
+        if not _TABLE_NAME.match(table):
+            raise ValueError(f"Invalid table name: {table}")
+        indexes = tuple(indexes)
+        self.unique_indexes = tuple(unique_indexes)
+        for field in indexes + self.unique_indexes:
+            if not _TABLE_NAME.match(field):
+                raise ValueError(f"Invalid index field: {field}")
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        self.synchronous = _SYNCHRONOUS[check_fsync_policy(fsync)]
+        self.lock = threading.Lock()  # Serializes writers only
+        self._local = threading.local()
+
+        try:
+            self._create_schema(indexes)
+        except sqlite3.IntegrityError as e:
+            # Existing rows, e.g. imported ones, clash on a new unique index
+            field = self._unique_field(e)
+            if field is None:
+                raise
+            duplicate = self._duplicate_value(field)
+            self.close()
+            raise DuplicateKeyError(field, duplicate) from e
+        except sqlite3.OperationalError:
+            raise
+        except sqlite3.DatabaseError as e:
+            # "file is not a database", "database disk image is malformed"
+            self.close()
+            raise StorageCorruptedError(self.db_path, str(e)) from e
+
+    def _create_schema(self, indexes: Tuple[str, ...]) -> None:
+        """Create the table, its indexes and its row count if missing"""
+        table = self.table
+        with self.lock, self._conn() as conn:
+            conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" '
+                "(key TEXT PRIMARY KEY, value JSON NOT NULL)"
+            )
+            for field in indexes:
+                conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{table}_{field}_idx" '
+                    f"ON \"{table}\" (json_extract(value, '$.{field}'))"
+                )
+            conn.execute(
+                f'CREATE INDEX IF NOT EXISTS "{table}_order_idx" '
+                f'ON "{table}" ({_SORT_EXPR}, key)'
+            )
+            for field in self.unique_indexes:
+                conn.execute(
+                    f'CREATE UNIQUE INDEX IF NOT EXISTS "{table}_{field}_uidx" '
+                    f"ON \"{table}\" (json_extract(value, '$.{field}'))"
+                )
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {_COUNTS_TABLE} "
+                "(name TEXT PRIMARY KEY, records INTEGER NOT NULL)"
+            )
+            # Seeding opens the transaction, so rows written by other
+            # processes are either counted here or by the triggers
+            conn.execute(
+                f"INSERT OR IGNORE INTO {_COUNTS_TABLE} (name, records) "
+                f'SELECT ?, COUNT(*) FROM "{table}"',
+                (table,),
+            )
+            for event, delta in (("INSERT", "+ 1"), ("DELETE", "- 1")):
+                conn.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS "{table}_count_{event.lower()}" '
+                    f'AFTER {event} ON "{table}" BEGIN '
+                    f"UPDATE {_COUNTS_TABLE} SET records = records {delta} "
+                    f"WHERE name = '{table}'; END"
+                )
+
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            self._local.conn = conn
+        return conn
+
+    def get_all(self) -> Dict[str, Any]:
+        """Get all records"""
+        rows = self._conn().execute(f'SELECT key, value FROM "{self.table}"')
+        return {key: serialization.loads(value) for key, value in rows}
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a single record by key"""
+        row = (
+            self._conn()
+            .execute(f'SELECT value FROM "{self.table}" WHERE key = ?', (key,))
+            .fetchone()
+        )
+        return serialization.loads(row[0]) if row else None
+
+    @staticmethod
+    def _where(filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        """Build WHERE clauses and parameters for field equality filters"""
+        for field in filters:
+            if not _TABLE_NAME.match(field):
+                raise ValueError(f"Invalid filter field: {field}")
+        clauses = [f"json_extract(value, '$.{field}') IS ?" for field in filters]
+        return clauses, [_sql_value(value) for value in filters.values()]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get a batch of records by key; missing keys are left out"""
+        keys = list(keys)
+        conn = self._conn()
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = conn.execute(
+                f'SELECT key, value FROM "{self.table}" WHERE key IN ({placeholders})',
+                chunk,
+            )
+            found.update((key, serialization.loads(value)) for key, value in rows)
+        # Keep the caller's key order
+        return {key: found[key] for key in keys if key in found}
+
+    def find(self, **filters: Any) -> Dict[str, Any]:
+        """Get records whose fields equal all of the given values"""
+        clauses, params = self._where(filters)
+        query = f'SELECT key, value FROM "{self.table}"'
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        rows = self._conn().execute(query, params)
+        return {key: serialization.loads(value) for key, value in rows}
+
+    def query(
+        self, limit: int, after: Optional[Tuple[str, str]] = None, **filters: Any
+    ) -> Tuple[Dict[str, Any], Optional[Tuple[str, str]]]:
+        """Get one page of matching records in (created_at, key) order
+
+        The page is read with a keyset query over the ordering index, so
+        earlier pages are never scanned.
+        """
+        clauses, params = self._where(filters)
+        if after:
+            # The leading range term lets SQLite seek the ordering index
+            # instead of scanning it from the start
+            clauses.append(f"{_SORT_EXPR} >= ? AND ({_SORT_EXPR}, key) > (?, ?)")
+            params.extend((after[0], *after))
+        query = f'SELECT key, value, {_SORT_EXPR} FROM "{self.table}"'
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += f" ORDER BY {_SORT_EXPR}, key LIMIT ?"
+        # Fetch one extra row to tell whether another page follows
+        rows = self._conn().execute(query, (*params, limit + 1)).fetchall()
+        page = {key: serialization.loads(value) for key, value, _ in rows[:limit]}
+        if len(rows) <= limit:
+            return page, None
+        key, _, sorted_by = rows[limit - 1]
+        return page, (str(sorted_by), key)
+
+    def find_many(self, field: str, values: Iterable[Any]) -> Dict[Any, Any]:
+        """Get the records for a batch of unique field values, keyed by value
+
+        Values without a matching record are left out of the result.
+        """
+        if not _TABLE_NAME.match(field):
+            raise ValueError(f"Invalid filter field: {field}")
+        values = list(values)
+        conn = self._conn()
+        found = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(values), 500):
+            chunk = values[start : start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT json_extract(value, '$.{field}'), value "
+                f'FROM "{self.table}" '
+                f"WHERE json_extract(value, '$.{field}') IN ({placeholders})",
+                tuple(_sql_value(value) for value in chunk),
+            )
+            by_value = {match: record for match, record in rows}
+            for value in chunk:
+                record = by_value.get(_sql_value(value))
+                if record is not None:
+                    found[value] = serialization.loads(record)
+        return found
+
+    def find_one(self, field: str, value: Any) -> Optional[Any]:
+        """Get the record whose unique field equals value"""
+        return self.find_many(field, (value,)).get(value)
+
+    def _unique_field(self, error: sqlite3.IntegrityError) -> Optional[str]:
+        """Return the unique field whose index the error names, if any"""
+        match = _FAILED_INDEX.search(str(error))
+        if match:
+            for field in self.unique_indexes:
+                if match.group(1) == f"{self.table}_{field}_uidx":
+                    return field
+        return None
+
+    def _duplicate_value(self, field: str) -> Any:
+        """Return a value of field that more than one stored record holds"""
+        row = (
+            self._conn()
+            .execute(
+                f"SELECT json_extract(value, '$.{field}') AS v "
+                f'FROM "{self.table}" WHERE v IS NOT NULL '
+                "GROUP BY v HAVING COUNT(*) > 1 LIMIT 1"
+            )
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def _raise_duplicate(self, value: Any, error: sqlite3.IntegrityError) -> None:
+        """Translate a unique index violation into DuplicateKeyError"""
+        field = self._unique_field(error)
+        if field is None:
+            raise error
+        raise DuplicateKeyError(field, value.get(field)) from error
+
+    def create(self, key: str, value: Any) -> Any:
+        """Create a new record"""
+        try:
+            with self.lock, self._conn() as conn:
+                # Upsert rather than INSERT OR REPLACE, which would silently
+                # delete other rows that clash on a unique index
+                conn.execute(
+                    f'INSERT INTO "{self.table}" (key, value) VALUES (?, ?) '
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (key, _encode(value)),
+                )
+        except sqlite3.IntegrityError as e:
+            self._raise_duplicate(value, e)
+        return value
+
+    def create_many(self, records: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a batch of records in one transaction"""
+        try:
+            with self.lock, self._conn() as conn:
+                conn.executemany(
+                    f'INSERT INTO "{self.table}" (key, value) VALUES (?, ?) '
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (
+                        (key, _encode(value))
+                        for key, value in records.items()
+                    ),
+                )
+        except sqlite3.IntegrityError as e:
+            self._raise_duplicate({}, e)
+        return records
+
+    def update(self, key: str, value: Any) -> Optional[Any]:
+        """Update an existing record"""
+        try:
+            with self.lock, self._conn() as conn:
+                cursor = conn.execute(
+                    f'UPDATE "{self.table}" SET value = ? WHERE key = ?',
+                    (_encode(value), key),
+                )
+        except sqlite3.IntegrityError as e:
+            self._raise_duplicate(value, e)
+        return value if cursor.rowcount else None
+
+    def update_many(self, records: Dict[str, Any]) -> Dict[str, Any]:
+        """Update a batch of existing records in one transaction
+
+        Keys that no longer exist are skipped. Returns the records that were
+        updated.
+        """
+        updated = {}
+        try:
+            with self.lock, self._conn() as conn:
+                for key, value in records.items():
+                    cursor = conn.execute(
+                        f'UPDATE "{self.table}" SET value = ? WHERE key = ?',
+                        (_encode(value), key),
+                    )
+                    if cursor.rowcount:
+                        updated[key] = value
+        except sqlite3.IntegrityError as e:
+            self._raise_duplicate({}, e)
+        return updated
+
+    def update_with(self, key: str, change: RecordChange) -> Optional[Any]:
+        """Read, change and save one record as a single atomic step
+
+        change gets the stored record and returns the record to save, or
+        None to keep it as it is. Returns the record as saved, or None
+        without calling change if the key does not exist.
+        """
+
+        def change_one(records: Dict[str, Any]) -> Dict[str, Any]:
+            if key not in records:
+                return {}
+            value = change(records[key])
+            return {} if value is None else {key: value}
+
+        return self.update_many_with((key,), change_one).get(key)
+
+    def update_many_with(
+        self, keys: Iterable[str], change: BatchChange
+    ) -> Dict[str, Any]:
+        """Read, change and save a batch of records as a single atomic step
+
+        change gets the stored records among keys (missing keys are left
+        out) and returns the records to save. The transaction takes the
+        database write lock before reading, so no other connection writes
+        in between; an exception from change rolls the update back. Returns
+        the records found, as saved.
+        """
+        updates: Dict[str, Any] = {}
+        try:
+            with self.lock, self._conn() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                records = {}
+                for key in keys:
+                    row = conn.execute(
+                        f'SELECT value FROM "{self.table}" WHERE key = ?', (key,)
+                    ).fetchone()
+                    if row is not None:
+                        records[key] = serialization.loads(row[0])
+                updates = change(records)
+                conn.executemany(
+                    f'UPDATE "{self.table}" SET value = ? WHERE key = ?',
+                    ((_encode(value), key) for key, value in updates.items()),
+                )
+        except sqlite3.IntegrityError as e:
+            self._raise_duplicate(next(iter(updates.values()), {}), e)
+        records.update(updates)
+        return records
+
+    def delete(self, key: str) -> bool:
+        """Delete a record"""
+        with self.lock, self._conn() as conn:
+            cursor = conn.execute(f'DELETE FROM "{self.table}" WHERE key = ?', (key,))
+        return cursor.rowcount > 0
+
+    def count(self) -> int:
+        """Number of records, from the trigger-maintained row count"""
+        row = (
+            self._conn()
+            .execute(
+                f"SELECT records FROM {_COUNTS_TABLE} WHERE name = ?", (self.table,)
+            )
+            .fetchone()
+        )
+        return row[0] if row else 0
+
+    def warm_up(self) -> None:
+        """Open the database ahead of the first request"""
+        self.count()
+
+    def exists(self, key: str) -> bool:
+        """Check if a record exists"""
+        row = (
+            self._conn()
+            .execute(f'SELECT 1 FROM "{self.table}" WHERE key = ?', (key,))
+            .fetchone()
+        )
+        return row is not None
+
+    def clear(self) -> None:
+        """Clear all data"""
+        with self.lock, self._conn() as conn:
+            conn.execute(f'DELETE FROM "{self.table}"')
+
+    def initialize_with_data(self, initial_data: Dict[str, Any]) -> None:
+        """Initialize table with data if it is empty"""
+        with self.lock, self._conn() as conn:
+            if conn.execute(f'SELECT 1 FROM "{self.table}" LIMIT 1').fetchone():
+                return
+            conn.executemany(
+                f'INSERT INTO "{self.table}" (key, value) VALUES (?, ?)',
+                (
+                    (key, _encode(value))
+                    for key, value in initial_data.items()
+                ),
+            )
+
+    def close(self) -> None:
+        """Close this thread's connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def import_json_files(data_dir: str, db_path: str) -> Dict[str, int]:
+    """Import every ``<entity>.json`` file in data_dir into its own table
+
+    Existing rows with the same key are replaced, so the import can be re-run.
+    Returns the number of records imported per table.
+    """
+    imported = {}
+    for json_file in sorted(Path(data_dir).glob("*.json")):
+        table = json_file.stem
+        if not _TABLE_NAME.match(table):
+            print(f"Skipping {json_file}: not a valid table name")
+            continue
+        try:
+            with open(json_file, "rb") as f:
+                records = serialization.loads(f.read())
+        except (serialization.JSONDecodeError, IOError) as e:
+            print(f"Skipping {json_file}: {e}")
+            continue
+        if not isinstance(records, dict):
+            print(f"Skipping {json_file}: expected an object of records")
+            continue
+
+        storage = SQLiteStorage(db_path, table)
+        with storage.lock, storage._conn() as conn:
+            conn.executemany(
+                f'INSERT INTO "{table}" (key, value) VALUES (?, ?) '
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (
+                    (key, _encode(value))
+                    for key, value in records.items()
+                ),
+            )
+        storage.close()
+        imported[table] = len(records)
+    return imported
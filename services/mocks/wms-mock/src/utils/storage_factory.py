@@ -0,0 +1,102 @@
+"""Storage backend selection for mock services"""
+
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Tuple, Union
+
+from ..config.settings import settings
+from .file_storage import FileStorage
+from .journal_storage import JournalStorage
+from .sqlite_storage import SQLiteStorage
+
+Storage = Union[FileStorage, SQLiteStorage]
+
+# One storage object per data file and process, so every service instance
+# touching the same file shares one in-memory view (and one journal writer)
+_instances: Dict[Tuple[str, str], Storage] = {}
+_instances_lock = threading.Lock()
+
+
+def _build_storage(
+    data_dir: str,
+    filename: str,
+    indexes: Iterable[str],
+    unique_indexes: Iterable[str],
+) -> Storage:
+    """Construct the storage backend selected by ``settings.storage_backend``"""
+    backend = settings.storage_backend.lower()
+    if backend == "file":
+        return FileStorage(
+            data_dir,
+            filename,
+            cached=settings.storage_cache,
+            indexes=indexes,
+            unique_indexes=unique_indexes,
+            shared=settings.workers > 1,
+            pretty=settings.storage_pretty_json,
+            fsync=settings.storage_fsync,
+            fsync_interval=settings.storage_fsync_interval,
+        )
+    if backend == "journal":
+        if settings.workers > 1:
+            # Each process would keep its own copy of the data and journal
+            raise ValueError(
+                "The journal backend supports a single worker; "
+                "use the file or sqlite backend with WORKERS > 1"
+            )
+        return JournalStorage(
+            data_dir,
+            filename,
+            compact_interval=settings.journal_compact_interval,
+            indexes=indexes,
+            unique_indexes=unique_indexes,
+            pretty=settings.storage_pretty_json,
+            fsync=settings.storage_fsync,
+            fsync_interval=settings.storage_fsync_interval,
+        )
+    if backend == "sqlite":
+        return SQLiteStorage(
+            str(Path(data_dir) / settings.sqlite_filename),
+            filename,
+            indexes=indexes,
+            unique_indexes=unique_indexes,
+            fsync=settings.storage_fsync,
+        )
+    raise ValueError(f"Unknown storage backend: {settings.storage_backend}")
+
+
+def close_storages() -> None:
+    """Close every shared storage backend and forget them
+
+    Called on shutdown, after the services using them are closed; storage
+    created afterwards starts from the data on disk.
+    """
+    with _instances_lock:
+        storages = list(_instances.values())
+        _instances.clear()
+    for storage in storages:
+        storage.close()
+
+
+def create_storage(
+    data_dir: str,
+    filename: str,
+    indexes: Iterable[str] = (),
+    unique_indexes: Iterable[str] = (),
+) -> Storage:
+    """Return the shared storage backend for a data file
+
+    Args:
+        data_dir: Directory to store data files
+        filename: Name of the data file / table (without extension)
+        indexes: Record fields to maintain secondary indexes on for find()
+        unique_indexes: Record fields whose values must be unique; violating
+            writes raise DuplicateKeyError
+    """
+    key = (str(Path(data_dir).resolve()), filename)
+    with _instances_lock:
+        storage = _instances.get(key)
+        if storage is None:
+            storage = _build_storage(data_dir, filename, indexes, unique_indexes)
+            _instances[key] = storage
+        return storage